@@ -0,0 +1,300 @@
+"""Time the hot paths at fabric scale and compare against a baseline.
+
+Benchmarks (each at every selected scale point, ``n`` ports / ``m``
+sub-interfaces / ``k`` circuits, see ``synthetic.py``):
+
+  * ``arista.parse_evpn_circuits`` — ``AristaConfigParser`` on a running-config
+  * ``ocnos.parse_config``         — ``OcnosConfigXMLParser`` on get-config XML
+  * ``arista.render_evpn`` / ``ocnos.render_evpn`` — all ``k`` circuits (no cache)
+  * ``registry.allocate``          — 100 ``JsonFileRegistry.allocate`` calls on a
+                                     registry already holding ``k`` VNIs
+  * ``plan_reconcile``             — ``k`` intended vs a read-back with ~5%
+                                     drifted, ~2% missing and ~2% extra circuits
+  * ``fabric.audit`` / ``fabric.reconcile`` — ``FabricAuditor.audit`` and
+                                     ``FabricReconciler.plan`` over a simulated
+                                     fabric (``netauto.simulation``) of ``k // 20``
+                                     leaves with ``k // 100``..``k // 20``
+                                     circuits each, 10% of them drifted
+
+Each is run ``--repeat`` times after one warm-up call; the JSON report carries
+min / median / mean seconds. With ``--baseline`` the medians are compared to an
+earlier report, and anything slower by more than ``--threshold`` (and by at
+least ``--min-delta`` seconds, to ignore timer noise on tiny cases) is flagged;
+the exit status is 1 if any benchmark regressed.
+
+Usage:
+    python benchmarks/run_benchmarks.py --out bench.json
+    python benchmarks/run_benchmarks.py --scale small,medium --baseline bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import NamedTuple
+
+from synthetic import arista_running_config, circuits, ocnos_config_xml, service_key
+
+from netauto.allocation import JsonFileRegistry
+from netauto.evpn import plan_reconcile
+from netauto.fabric import FabricAuditor, FabricReconciler
+from netauto.models import Interface
+from netauto.parsers import AristaConfigParser, OcnosConfigXMLParser
+from netauto.render import AristaDeviceRenderer, OcnosDeviceRenderer
+from netauto.simulation import build_fabric
+
+# name -> (ports, sub-interfaces, circuits)
+SCALES: dict[str, tuple[int, int, int]] = {
+    "small": (48, 64, 100),
+    "medium": (96, 512, 1000),
+    "large": (192, 2048, 3900),
+}
+
+ALLOCATIONS = 100  # registry.allocate calls per run
+
+
+class Case(NamedTuple):
+    run: Callable[[], object]
+    ops: int  # work items per run, for the per-op figure
+    reset: Callable[[], None] | None = None  # untimed, between runs
+
+
+# --------------------------------------------------------------------------- #
+# Benchmarks: setup(n, m, k, workdir) -> Case
+# --------------------------------------------------------------------------- #
+def bench_arista_parse(n: int, m: int, k: int, workdir: Path) -> Case:
+    config = arista_running_config(n, m, k)
+    return Case(lambda: AristaConfigParser(config).parse_evpn_circuits(), k)
+
+
+def bench_ocnos_parse(n: int, m: int, k: int, workdir: Path) -> Case:
+    config = ocnos_config_xml(n, m, k)
+    return Case(lambda: OcnosConfigXMLParser(config).parse_config(), k)
+
+
+def _render_case(renderer, k: int, n: int) -> Case:
+    pairs = [(Interface(name=c.interface), c.evpn) for c in circuits(k, n)]
+
+    def run():
+        for interface, evpn in pairs:
+            renderer.render_evpn(interface, evpn)
+
+    return Case(run, k)
+
+
+def bench_arista_render(n: int, m: int, k: int, workdir: Path) -> Case:
+    return _render_case(AristaDeviceRenderer(), k, n)
+
+
+def bench_ocnos_render(n: int, m: int, k: int, workdir: Path) -> Case:
+    return _render_case(OcnosDeviceRenderer(), k, n)
+
+
+def bench_registry_allocate(n: int, m: int, k: int, workdir: Path) -> Case:
+    registry = JsonFileRegistry(workdir / f"vni-{k}.json")
+    registry.allocate_many([(service_key(i), None) for i in range(k)])
+    keys = [f"bench-{i}" for i in range(ALLOCATIONS)]
+
+    def run():
+        for key in keys:
+            registry.allocate(key)
+
+    return Case(run, ALLOCATIONS, reset=lambda: registry.release_many(keys))
+
+
+def bench_plan_reconcile(n: int, m: int, k: int, workdir: Path) -> Case:
+    intended = circuits(k, n)
+    actual = []
+    for i, c in enumerate(intended):
+        if i % 50 == 7:
+            continue  # missing on the device -> to_create
+        if i % 20 == 3:
+            c = c.model_copy(deep=True)
+            c.evpn.vlan.vlan_id = 4094 - i % 100  # drifted -> to_update
+        actual.append(c)
+    actual += circuits(k + k // 50, n)[k:]  # extras -> to_delete
+    return Case(lambda: plan_reconcile(intended, actual), k)
+
+
+@functools.lru_cache(maxsize=1)  # shared by both fabric cases; they only read
+def _fabric(k: int):
+    fabric = build_fabric(devices=max(2, k // 20), circuits=(k // 100, k // 20))
+    fabric.drift(0.1)
+    return fabric
+
+
+def bench_fabric_audit(n: int, m: int, k: int, workdir: Path) -> Case:
+    fabric = _fabric(k)
+    return Case(lambda: FabricAuditor(fabric.devices).audit(), fabric.circuit_count)
+
+
+def bench_fabric_reconcile(n: int, m: int, k: int, workdir: Path) -> Case:
+    fabric = _fabric(k)
+    return Case(
+        lambda: FabricReconciler(fabric.devices, fabric.intended).plan(),
+        fabric.circuit_count,
+    )
+
+
+BENCHMARKS: dict[str, Callable[..., Case]] = {
+    "arista.parse_evpn_circuits": bench_arista_parse,
+    "ocnos.parse_config": bench_ocnos_parse,
+    "arista.render_evpn": bench_arista_render,
+    "ocnos.render_evpn": bench_ocnos_render,
+    "registry.allocate": bench_registry_allocate,
+    "plan_reconcile": bench_plan_reconcile,
+    "fabric.audit": bench_fabric_audit,
+    "fabric.reconcile": bench_fabric_reconcile,
+}
+
+
+# --------------------------------------------------------------------------- #
+# Running and comparing
+# --------------------------------------------------------------------------- #
+def time_case(case: Case, repeat: int) -> list[float]:
+    case.run()  # warm-up (imports, template compilation, first-touch caches)
+    if case.reset:
+        case.reset()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        case.run()
+        samples.append(time.perf_counter() - started)
+        if case.reset:
+            case.reset()
+    return samples
+
+
+def run(scales: list[str], names: list[str], repeat: int, log=print) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            n, m, k = SCALES[scale]
+            for name in names:
+                case = BENCHMARKS[name](n, m, k, Path(tmp))
+                samples = time_case(case, repeat)
+                median = statistics.median(samples)
+                results.append(
+                    {
+                        "name": name,
+                        "scale": scale,
+                        "n": n,
+                        "m": m,
+                        "k": k,
+                        "ops": case.ops,
+                        "runs": repeat,
+                        "min": min(samples),
+                        "median": median,
+                        "mean": statistics.fmean(samples),
+                        "per_op": median / case.ops if case.ops else None,
+                    }
+                )
+                log(f"{name:<28} {scale:<7} median {median * 1000:10.2f} ms")
+    return {
+        "meta": {
+            "created": datetime.now(UTC).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    current: dict, baseline: dict, threshold: float = 0.2, min_delta: float = 0.001
+) -> list[dict]:
+    """Median-vs-median verdict per ``(name, scale)`` present in ``current``:
+    ``regression`` / ``improvement`` beyond ``threshold`` (a fraction) and
+    ``min_delta`` seconds, else ``ok``; ``new`` when the baseline lacks it."""
+    before = {(r["name"], r["scale"]): r for r in baseline["results"]}
+    verdicts = []
+    for r in current["results"]:
+        old = before.get((r["name"], r["scale"]))
+        verdict = {"name": r["name"], "scale": r["scale"], "current": r["median"]}
+        if old is None:
+            verdict.update(baseline=None, ratio=None, status="new")
+        else:
+            ratio = r["median"] / old["median"] if old["median"] else float("inf")
+            delta = r["median"] - old["median"]
+            status = "ok"
+            if ratio > 1 + threshold and delta > min_delta:
+                status = "regression"
+            elif ratio < 1 / (1 + threshold) and -delta > min_delta:
+                status = "improvement"
+            verdict.update(baseline=old["median"], ratio=ratio, status=status)
+        verdicts.append(verdict)
+    return verdicts
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--scale",
+        default="small,medium,large",
+        help=f"comma-separated subset of {', '.join(SCALES)}",
+    )
+    parser.add_argument("--only", help="comma-separated benchmark names")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="slowdown fraction flagged as a regression (default 0.2)",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=0.001,
+        help="ignore changes smaller than this many seconds",
+    )
+    args = parser.parse_args(argv)
+
+    scales = args.scale.split(",")
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [s for s in scales if s not in SCALES] + [
+        b for b in names if b not in BENCHMARKS
+    ]
+    if unknown:
+        parser.error(f"unknown scale/benchmark: {', '.join(unknown)}")
+
+    def log(line: str) -> None:
+        print(line, file=sys.stderr)
+
+    report = run(scales, names, args.repeat, log=log)
+
+    regressions = 0
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        report["comparison"] = compare(report, baseline, args.threshold, args.min_delta)
+        for v in report["comparison"]:
+            if v["status"] == "new":
+                continue
+            log(
+                f"{v['status'].upper():<12} {v['name']:<28} {v['scale']:<7} "
+                f"x{v['ratio']:.2f} ({v['baseline'] * 1000:.2f} -> "
+                f"{v['current'] * 1000:.2f} ms)"
+            )
+        regressions = sum(v["status"] == "regression" for v in report["comparison"])
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+    else:
+        print(text)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""Synthetic device configs at fabric scale, for the benchmark suite.
+
+``arista_running_config(n, m, k)`` and ``ocnos_config_xml(n, m, k)`` build the
+payload ``driver.get_config()`` would return from a switch with ``n`` physical
+ports, ``m`` plain dot1q sub-interfaces and ``k`` EVPN circuits, each circuit
+with its own mac-vrf. The Arista text is laid out like ``show running-config``;
+the OcNOS XML is the repo's own rendered payloads merged into one ``<data>``
+tree, as a get-config reply presents them. Both parse back to the ``k``
+circuits of ``circuits(k)`` (OcNOS exactly; Arista with the VNI, VLAN and
+RD/RT, since a plain Arista circuit's port isn't recoverable from config).
+
+Everything is deterministic: the same arguments give byte-identical output.
+"""
+
+from __future__ import annotations
+
+from lxml import etree
+
+from netauto.models import Asn, Evpn, EvpnCircuit, Interface, RoutingInstance, Vlan
+from netauto.render import OcnosDeviceRenderer
+
+ASN = 65001
+RT_ASN = 37195
+BASE_VNI = 10000
+FIRST_VLAN = 100  # circuit VLANs: FIRST_VLAN .. FIRST_VLAN + k - 1
+MAX_CIRCUITS = 4094 - FIRST_VLAN + 1
+
+
+def service_key(i: int) -> str:
+    return f"SO{100000 + i}"
+
+
+def _port(i: int, n: int, prefix: str) -> str:
+    return f"{prefix}{i % n + 1}"
+
+
+def _subif_tag(s: int, n: int, m: int) -> int:
+    """dot1q tag of plain sub-interface ``s``: unique per parent port and below
+    the circuit VLANs (a circuit is a sub-interface too on OcNOS)."""
+    if m > (FIRST_VLAN - 2) * n:
+        raise ValueError(f"at most {(FIRST_VLAN - 2) * n} sub-interfaces on {n} ports")
+    return 2 + s // n
+
+
+def circuits(k: int, n: int = 48, prefix: str = "eth") -> list[EvpnCircuit]:
+    """The ``k`` intended circuits the generated configs carry, spread over
+    ``n`` ports (``prefix`` + number)."""
+    if not 0 <= k <= MAX_CIRCUITS:
+        raise ValueError(f"k must be between 0 and {MAX_CIRCUITS}")
+    out = []
+    for i in range(k):
+        key = service_key(i)
+        num = key[2:]
+        out.append(
+            EvpnCircuit(
+                interface=_port(i, n, prefix),
+                evpn=Evpn(
+                    vlan=Vlan(vlan_id=FIRST_VLAN + i, name=key),
+                    asn=ASN,
+                    vni=BASE_VNI + i,
+                    description=key,
+                ),
+                routing_instance=RoutingInstance(
+                    instance_name=key,
+                    instance_type="mac-vrf",
+                    rd=f"{ASN}:{num}",
+                    rt_rd=f"{RT_ASN}:{num}",
+                ),
+            )
+        )
+    return out
+
+
+# --------------------------------------------------------------------------- #
+# Arista running-config
+# --------------------------------------------------------------------------- #
+def arista_running_config(n: int, m: int, k: int) -> str:
+    """``show running-config`` of an Arista leaf (see module docstring)."""
+    specs = circuits(k, n, prefix="Ethernet")
+    vlans_on: dict[str, list[int]] = {}
+    for c in specs:
+        vlans_on.setdefault(c.interface, []).append(c.evpn.vlan.vlan_id)
+
+    out = [
+        "! device: synthetic (DCS-7280SR3, EOS-4.30.1F)",
+        "!",
+        "hostname synthetic-leaf",
+        "!",
+    ]
+    for c in specs:
+        out += [f"vlan {c.evpn.vlan.vlan_id}", f"   name {c.evpn.vlan.name}", "!"]
+    for p in range(1, n + 1):
+        name = f"Ethernet{p}"
+        out += [f"interface {name}", f"   description port-{p}", "   mtu 9214"]
+        if name in vlans_on:
+            allowed = ",".join(str(v) for v in vlans_on[name])
+            out += [
+                "   switchport mode trunk",
+                f"   switchport trunk allowed vlan {allowed}",
+            ]
+        else:
+            out += ["   no switchport"]
+        out.append("!")
+    for s in range(m):
+        parent = _port(s, n, "Ethernet")
+        tag = _subif_tag(s, n, m)
+        out += [
+            f"interface {parent}.{tag}",
+            f"   description subif-{s}",
+            f"   encapsulation dot1q vlan {tag}",
+            "!",
+        ]
+    out += ["interface Loopback0", "   ip address 10.0.0.1/32", "!"]
+    out += [
+        "interface Vxlan1",
+        "   vxlan source-interface Loopback0",
+        "   vxlan udp-port 4789",
+    ]
+    out += [f"   vxlan vlan {c.evpn.vlan.vlan_id} vni {c.evpn.vni}" for c in specs]
+    out += ["!", f"router bgp {ASN}", "   router-id 10.0.0.1"]
+    for c in specs:
+        ri = c.routing_instance
+        out += [
+            f"   vlan-aware-bundle {ri.instance_name}",
+            f"      rd {ri.rd}",
+            f"      route-target both {ri.rt_rd}",
+            "      redistribute learned",
+            f"      vlan {c.evpn.vlan.vlan_id}",
+        ]
+    out += ["!", "end", ""]
+    return "\n".join(out)
+
+
+# --------------------------------------------------------------------------- #
+# OcNOS get-config XML
+# --------------------------------------------------------------------------- #
+NC_OPERATION = "{urn:ietf:params:xml:ns:netconf:base:1.0}operation"
+
+
+def _is_container(element: etree._Element) -> bool:
+    """A container's children are all entries of one list (``<interfaces>`` of
+    ``<interface>``); merging descends into containers and appends entries."""
+    tags = {child.tag for child in element}
+    return len(tags) == 1
+
+
+def _merge(dest: etree._Element, src: etree._Element) -> None:
+    for child in list(src):
+        existing = dest.find(child.tag) if _is_container(child) else None
+        if existing is not None:
+            _merge(existing, child)
+        else:
+            dest.append(child)
+
+
+def merge_payloads(payloads: list[str]) -> etree._Element:
+    """Merge rendered ``<config>`` payloads into one get-config ``<data>`` tree."""
+    data = etree.Element("data")
+    for xml in payloads:
+        _merge(data, etree.fromstring(xml.encode()))
+    for element in data.iter():
+        element.attrib.pop(NC_OPERATION, None)
+    return data
+
+
+def ocnos_config_xml(n: int, m: int, k: int) -> str:
+    """NETCONF get-config ``<data>`` of an OcNOS leaf (see module docstring)."""
+    r = OcnosDeviceRenderer()
+    payloads = [
+        r.render_interface(Interface(name=f"eth{p}", description=f"port-{p}", mtu=9216))
+        for p in range(1, n + 1)
+    ]
+    for s in range(m):
+        # a sub-interface shaped exactly like a circuit's, minus the EVPN binding
+        tag = _subif_tag(s, n, m)
+        sub = etree.fromstring(
+            r.render_evpn(
+                Interface(name=_port(s, n, "eth")),
+                Evpn(
+                    vlan=Vlan(vlan_id=tag, name=f"subif-{s}"),
+                    asn=ASN,
+                    vni=1,
+                    description=f"subif-{s}",
+                ),
+            ).encode()
+        )
+        for child in list(sub):
+            if not child.tag.endswith("}interfaces"):
+                sub.remove(child)
+        payloads.append(etree.tostring(sub).decode())
+    for c in circuits(k, n):
+        payloads.append(r.render_routing_instance(Asn(asn=ASN), c.routing_instance))
+        payloads.append(r.render_evpn(Interface(name=c.interface), c.evpn))
+    return etree.tostring(merge_payloads(payloads), pretty_print=True).decode()
@@ -27,12 +27,13 @@ from prefect import flow, task, get_run_logger
 from prefect.blocks.system import Secret
 
 import os
-from collections import defaultdict
 
-from netauto.allocation import JsonFileRegistry, make_routing_instance
+from netauto.allocation import JsonFileRegistry, SqliteRegistry, make_routing_instance
+from netauto.registry_service import RemoteRegistry
 from netauto.drivers import AristaDriver, OcnosDriver
 from netauto.drivers.base import DeviceDriver
 from netauto.evpn import EvpnManager, plan_reconcile
+from netauto.fabric import FabricAuditor
 from netauto.models import AzureEvpn, Evpn, EvpnCircuit, RoutingInstance, Vlan
 
 # Route-target prefixes from the reference templates (see docs/evpn_service.md).
@@ -72,9 +73,18 @@ def _connect(platform: str, host: str) -> DeviceDriver:
 # The fabric-wide VNI registry is the source of truth for allocation: a VNI
 # must be globally unique across all 20+ switches, so it cannot be picked by
 # scanning only a circuit's two endpoints. The JSON-file registry is the
-# illustrative default; production swaps a DB-backed VniRegistry. (The per-device
-# get_vnis() check inside EvpnManager stays as a safety net against drift.)
-REGISTRY = JsonFileRegistry(os.getenv("VNI_REGISTRY", "vni_registry.json"))
+# single-process default; a ``*.db`` path selects SqliteRegistry, which is safe
+# when many Prefect workers allocate at once, and VNI_REGISTRY_SOCKET points the
+# workers at a shared ``python -m netauto.registry_service`` daemon instead.
+# (The per-device get_vnis() check inside EvpnManager stays as a safety net
+# against drift.)
+_REGISTRY_PATH = os.getenv("VNI_REGISTRY", "vni_registry.json")
+if os.getenv("VNI_REGISTRY_SOCKET"):
+    REGISTRY = RemoteRegistry(socket_path=os.environ["VNI_REGISTRY_SOCKET"])
+elif _REGISTRY_PATH.endswith(".db"):
+    REGISTRY = SqliteRegistry(_REGISTRY_PATH)
+else:
+    REGISTRY = JsonFileRegistry(_REGISTRY_PATH)
 
 
 def _routing_instance(service_key: str, asn: int, rt_prefix: int) -> RoutingInstance:
@@ -88,6 +98,12 @@ def allocate_vni(service_key: str, rt: str) -> int:
     return REGISTRY.allocate(service_key, rt=rt)
 
 
+@task
+def allocate_vnis(requests: list[tuple[str, str]]) -> list[int]:
+    """Reserve several VNIs at once, all or nothing (one registry transaction)."""
+    return REGISTRY.allocate_many(requests)
+
+
 # --------------------------------------------------------------------------- #
 # Per-endpoint building-block tasks (one device each)
 # --------------------------------------------------------------------------- #
@@ -236,27 +252,8 @@ def decommission_evpn_circuit(
     return {ep["host"]: f.result() for ep, f in zip(endpoints, futures)}
 
 
-@task(retries=2, retry_delay_seconds=10)
-def read_circuits(platform: str, host: str) -> list[dict]:
-    """Read a device's EVPN circuits back into plain dicts (JSON-serializable)."""
-    driver = _connect(platform, host)
-    try:
-        rows = []
-        for c in EvpnManager(driver).get_circuits():
-            rows.append({
-                "host": host,
-                "vni": c.evpn.vni,
-                "interface": c.interface,
-                "description": c.evpn.description,
-                "rt": c.routing_instance.rt_rd if c.routing_instance else None,
-            })
-        return rows
-    finally:
-        driver.disconnect()
-
-
 @flow(name="audit-fabric-evpn")
-def audit_fabric(devices: list[Endpoint]) -> dict:
+def audit_fabric(devices: list[Endpoint], timeout: float = 60.0) -> dict:
     """Read every device's circuits and flag fabric-wide hazards.
 
     This is the concrete follow-through on the global-VNI-uniqueness rule: a VNI
@@ -265,39 +262,32 @@ def audit_fabric(devices: list[Endpoint]) -> dict:
     as they share the same route-target*. The same VNI with **different** RTs is
     a collision (two unrelated services reusing a VNI), which read-back catches.
 
+    The sweep is :class:`~netauto.fabric.FabricAuditor` (as in
+    ``scripts/inspect_evpn.py --all``): devices are read concurrently, a hung box
+    is reported in ``errors`` after ``timeout`` seconds instead of stalling the
+    flow, and the collision audit is streamed as devices answer.
+
     devices: ``[{"platform": ..., "host": ...}, ...]``
     """
     logger = get_run_logger()
-    circuits: list[dict] = []
-    for dev in devices:
-        circuits.extend(read_circuits(dev["platform"], dev["host"]))
-
-    # Same collision logic as netauto.allocation.find_conflicts (a VNI/RT used by
-    # >1 distinct service key), computed here on the serializable dict rows.
-    by_vni: dict[int, set] = defaultdict(set)
-    by_rt: dict[str, set] = defaultdict(set)
-    by_vni_ends: dict[int, list] = defaultdict(list)
-    for c in circuits:
-        by_vni[c["vni"]].add(c["description"])
-        by_vni_ends[c["vni"]].append(c)
-        if c["rt"]:
-            by_rt[c["rt"]].add(c["description"])
-
-    vni_collisions = {v: sorted(s) for v, s in by_vni.items() if len(s) > 1}
-    rt_collisions = {r: sorted(s) for r, s in by_rt.items() if len(s) > 1}
+    auditor = FabricAuditor(
+        {
+            dev["host"]: (lambda p=dev["platform"], h=dev["host"]: _connect(p, h))
+            for dev in devices
+        },
+        timeout=timeout,
+    )
+    audit = auditor.audit()
+    for host, error in audit.errors.items():
+        logger.warning("%s: %s", host, error)
+    if audit.vni_collisions or audit.rt_collisions:
+        logger.error("fabric collisions — vni: %s  rt: %s",
+                     audit.vni_collisions, audit.rt_collisions)
     # one end only: half-deleted, or the far end is a cloud CNI / outside the sweep.
-    single_ended = {v: ends for v, ends in by_vni_ends.items() if len(ends) == 1}
-
-    if vni_collisions or rt_collisions:
-        logger.error("fabric collisions — vni: %s  rt: %s", vni_collisions, rt_collisions)
     logger.info("audited %d circuits across %d devices; %d single-ended",
-                len(circuits), len(devices), len(single_ended))
-    return {
-        "circuits": circuits,
-        "vni_collisions": vni_collisions,
-        "rt_collisions": rt_collisions,
-        "single_ended": single_ended,
-    }
+                sum(len(c) for c in audit.circuits.values()), len(devices),
+                len(audit.single_ended))
+    return audit.model_dump(mode="json")  # JSON-serializable flow result
 
 
 @task
@@ -332,7 +322,10 @@ def reconcile_fabric(devices_with_intent: list[dict]) -> dict:
     """Report drift of each device vs its intended inventory (declarative audit).
 
     devices_with_intent: ``[{platform, host, intended: [spec, ...]}, ...]``.
-    Report-only — feed the plan's to_create/to_update into ensure_circuit to apply.
+    Sequential, one task per device, to show the Prefect shape; outside Prefect
+    ``netauto.fabric.FabricReconciler`` reads the devices concurrently.
+    Report-only — apply a plan with ``netauto.evpn.apply_plan`` (one device) or
+    ``apply_plans`` (many devices, concurrently).
     """
     logger = get_run_logger()
     plans: dict[str, dict] = {}
@@ -365,8 +358,10 @@ def provision_azure_circuit(
     logger = get_run_logger()
     num = service_key[2:]
     # Two circuits => two registry entries => two fabric-unique VNIs.
-    vni_primary = allocate_vni(f"{service_key}-primary", rt=f"{AZURE_RT}:{num}-P")
-    vni_secondary = allocate_vni(f"{service_key}-secondary", rt=f"{AZURE_RT}:{num}-S")
+    vni_primary, vni_secondary = allocate_vnis([
+        (f"{service_key}-primary", f"{AZURE_RT}:{num}-P"),
+        (f"{service_key}-secondary", f"{AZURE_RT}:{num}-S"),
+    ])
     logger.info("Azure VNIs: primary=%s secondary=%s", vni_primary, vni_secondary)
 
     results: dict[str, str] = {}
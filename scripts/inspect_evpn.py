@@ -6,13 +6,14 @@ box / did my push land".
 
     uv run python scripts/inspect_evpn.py 172.20.30.4 arista
     uv run python scripts/inspect_evpn.py 172.20.30.6 ocnos
-    uv run python scripts/inspect_evpn.py --all          # sweep the lab fabric
+    uv run python scripts/inspect_evpn.py --all          # sweep the lab fabric (concurrent)
 """
 
 import sys
 
 from netauto.drivers import AristaDriver, OcnosDriver
 from netauto.evpn import EvpnManager
+from netauto.fabric import FabricAuditor
 from netauto.models import AzureEvpn
 
 LAB = [
@@ -53,25 +54,43 @@ def describe(circuit) -> str:
     )
 
 
+def show(label: str, circuits) -> None:
+    print(f"== {label} — {len(circuits)} circuit(s)")
+    for circuit in sorted(circuits, key=lambda c: c.evpn.vni):
+        print(describe(circuit))
+
+
 def inspect(host: str, platform: str, name: str = "") -> None:
     driver = connect(host, platform)
     try:
-        circuits = EvpnManager(driver).get_circuits()
-        print(f"== {name or host} ({host}) — {len(circuits)} circuit(s)")
-        for circuit in sorted(circuits, key=lambda c: c.evpn.vni):
-            print(describe(circuit))
+        show(f"{name or host} ({host})", EvpnManager(driver).get_circuits())
     finally:
         driver.disconnect()
 
 
+def sweep(timeout: float = 30.0) -> None:
+    """Read the whole lab concurrently; a hung box is reported, not waited on."""
+    hosts = {name: host for host, _, name in LAB}
+    auditor = FabricAuditor(
+        {
+            name: (lambda h=host, p=platform: connect(h, p))
+            for host, platform, name in LAB
+        },
+        timeout=timeout,
+    )
+    audit = auditor.audit(
+        on_device=lambda name, circuits: show(f"{name} ({hosts[name]})", circuits)
+    )
+    for name, error in audit.errors.items():
+        print(f"== {name} ({hosts[name]}) ERROR: {error}")
+    if audit.vni_collisions or audit.rt_collisions:
+        print(f"!! collisions — vni: {audit.vni_collisions} rt: {audit.rt_collisions}")
+
+
 def main() -> None:
     args = sys.argv[1:]
     if args and args[0] == "--all":
-        for host, platform, name in LAB:
-            try:
-                inspect(host, platform, name)
-            except Exception as exc:  # keep sweeping the rest of the fabric
-                print(f"== {name} ({host}) ERROR: {exc}")
+        sweep()
     else:
         host = args[0] if args else "172.20.30.4"
         platform = args[1] if len(args) > 1 else "arista"
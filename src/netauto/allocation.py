@@ -9,22 +9,36 @@ Contents:
   * ``service_number`` / ``make_routing_instance`` — the RD/RT conventions,
     centralised (they were copy-pasted across scripts/examples).
   * ``find_conflicts`` — pure audit over read-back circuits (duplicate VNI / RT
-    across *different* services), used by the Prefect ``audit_fabric`` flow.
-  * ``VniRegistry`` ABC + ``JsonFileRegistry`` — allocate fabric-unique VNIs and
-    track assignments. Pluggable so production swaps a DB-backed implementation.
+    across *different* services), used by the Prefect ``audit_fabric`` flow;
+    ``ConflictAccumulator`` is its streaming form for concurrent sweeps.
+  * ``VniRegistry`` ABC + ``JsonFileRegistry`` / ``SqliteRegistry`` — allocate
+    fabric-unique VNIs and track assignments. Pluggable: the JSON file is the
+    single-process default, SQLite is safe across worker processes, and
+    ``JournalRegistry`` appends one fsync'd line per mutation. Backends
+    share the indexed in-memory core in :mod:`netauto.allocator`.
+  * ``PooledRegistry`` — named per-product / per-region VNI pools, one backend
+    (independently locked shard) per pool, with utilization metrics.
 """
 
 from __future__ import annotations
 
 import json
+import logging
 import os
+import sqlite3
 import threading
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Callable, Iterable, Iterator, Mapping, Optional
 
-from .exceptions import RtCollision, VniInUse
-from .models import RoutingInstance
+from .allocator import MAX_VNI, VniAllocator
+from .exceptions import ContiguousUnsupported, RtCollision, SeedConflict, VniExhausted
+from .index import CircuitIndex
+from .index import service_key as _service_key
+from .models import PoolStats, RoutingInstance
+
+logger = logging.getLogger(__name__)
 
 
 # --------------------------------------------------------------------------- #
@@ -58,22 +72,6 @@ def make_routing_instance(
 # --------------------------------------------------------------------------- #
 # Fabric audit (pure; operates on read-back circuits)
 # --------------------------------------------------------------------------- #
-def _service_key(c) -> str:
-    """Service identity used to group circuits for collision detection.
-
-    Prefer the routing-instance (VRF) name: it is read back authoritatively from
-    the device (the VXLAN tenant -> VRF mapping) and is the same on both ends of a
-    circuit. Fall back to ``evpn.description`` — the access-port label — only when
-    no VRF is bound; that label can be blank when a sub-interface has no
-    ``description`` configured, which would otherwise make one end of a normal
-    circuit look like a *different* service and raise a spurious collision.
-    """
-    ri = c.routing_instance
-    if ri is not None and ri.instance_name:
-        return ri.instance_name
-    return c.evpn.description
-
-
 def find_conflicts(circuits: Iterable) -> dict:
     """Flag fabric-wide identifier hazards across read-back ``EvpnCircuit``s.
 
@@ -81,30 +79,81 @@ def find_conflicts(circuits: Iterable) -> dict:
     ends of one circuit — *only if it is the same service*. The same VNI/RT used
     by **different** services (different service key) is a collision that breaks
     the one-VNI-one-service invariant (and customer isolation for RT).
-    """
-    by_vni: dict[int, set[str]] = {}
-    by_rt: dict[str, set[str]] = {}
-    for c in circuits:
-        key = _service_key(c)
-        by_vni.setdefault(c.evpn.vni, set()).add(key)
-        if c.routing_instance is not None:
-            by_rt.setdefault(c.routing_instance.rt_rd, set()).add(key)
 
+    Accepts a list of circuits or an already-built :class:`CircuitIndex`.
+    """
+    index = circuits if isinstance(circuits, CircuitIndex) else CircuitIndex(circuits)
     return {
-        "vni_collisions": {
-            vni: sorted(keys) for vni, keys in by_vni.items() if len(keys) > 1
-        },
-        "rt_collisions": {
-            rt: sorted(keys) for rt, keys in by_rt.items() if len(keys) > 1
-        },
+        "vni_collisions": index.vni_collisions(),
+        "rt_collisions": index.rt_collisions(),
     }
 
 
+class ConflictAccumulator:
+    """Streaming form of :func:`find_conflicts` for fabric sweeps.
+
+    Feed each device's read-back as it arrives (:meth:`add`); the collision
+    sets are updated per circuit, so the report is complete as soon as the last
+    device is added. Also counts endpoints per VNI to flag single-ended
+    circuits (half-deleted, or the far end outside the sweep).
+    """
+
+    def __init__(self):
+        self._vni_keys: dict[int, set[str]] = {}
+        self._rt_keys: dict[str, set[str]] = {}
+        self._vni_ends: dict[int, list[str]] = {}  # vni -> device per endpoint
+        self._vni_collisions: set[int] = set()
+        self._rt_collisions: set[str] = set()
+
+    def add(self, circuits: Iterable, device: str = "") -> None:
+        for c in circuits:
+            key = _service_key(c)
+            vni = c.evpn.vni
+            keys = self._vni_keys.setdefault(vni, set())
+            keys.add(key)
+            if len(keys) > 1:
+                self._vni_collisions.add(vni)
+            self._vni_ends.setdefault(vni, []).append(device)
+            if c.routing_instance is not None:
+                rt = c.routing_instance.rt_rd
+                keys = self._rt_keys.setdefault(rt, set())
+                keys.add(key)
+                if len(keys) > 1:
+                    self._rt_collisions.add(rt)
+
+    @property
+    def vni_collisions(self) -> dict[int, list[str]]:
+        return {vni: sorted(self._vni_keys[vni]) for vni in self._vni_collisions}
+
+    @property
+    def rt_collisions(self) -> dict[str, list[str]]:
+        return {rt: sorted(self._rt_keys[rt]) for rt in self._rt_collisions}
+
+    @property
+    def single_ended(self) -> dict[int, str]:
+        """VNIs seen on exactly one endpoint -> the device carrying it."""
+        return {vni: ends[0] for vni, ends in self._vni_ends.items() if len(ends) == 1}
+
+    def conflicts(self) -> dict:
+        """The :func:`find_conflicts` report for everything added so far."""
+        return {
+            "vni_collisions": self.vni_collisions,
+            "rt_collisions": self.rt_collisions,
+        }
+
+
 # --------------------------------------------------------------------------- #
 # VNI registry
 # --------------------------------------------------------------------------- #
 class VniRegistry(ABC):
-    """Allocates fabric-unique VNIs and tracks service -> (vni, rt) assignments."""
+    """Allocates fabric-unique VNIs and tracks service -> (vni, rt) assignments.
+
+    ``base_vni`` / ``max_vni`` are the first and last VNI it hands out;
+    :class:`PooledRegistry` reads them as a pool's range.
+    """
+
+    base_vni: int
+    max_vni: int = MAX_VNI
 
     @abstractmethod
     def allocate(self, service_key: str, rt: Optional[str] = None) -> int:
@@ -117,6 +166,41 @@ class VniRegistry(ABC):
     def release(self, service_key: str) -> None:
         """Free a service's VNI. No-op if not allocated."""
 
+    def allocate_many(
+        self,
+        requests: Iterable[tuple[str, Optional[str]]],
+        contiguous: bool = False,
+    ) -> list[int]:
+        """Allocate a batch of ``(service_key, rt)`` requests, all or nothing;
+        returns the VNIs in request order. With ``contiguous=True`` the newly
+        allocated services get one consecutive block.
+
+        The built-in backends do this in one storage transaction. This default
+        allocates one by one and releases what it allocated if a request
+        fails; it cannot promise a contiguous block, so ``contiguous=True``
+        raises :class:`ContiguousUnsupported` up front, allocating nothing.
+        """
+        if contiguous:
+            raise ContiguousUnsupported(
+                f"{type(self).__name__} does not support contiguous allocation"
+            )
+        allocated, vnis = [], []
+        try:
+            for service_key, rt in requests:
+                if self.get(service_key) is None:
+                    allocated.append(service_key)
+                vnis.append(self.allocate(service_key, rt))
+        except Exception:
+            for service_key in allocated:
+                self.release(service_key)
+            raise
+        return vnis
+
+    def release_many(self, service_keys: Iterable[str]) -> None:
+        """Free several services' VNIs. Unknown keys are ignored."""
+        for service_key in service_keys:
+            self.release(service_key)
+
     @abstractmethod
     def get(self, service_key: str) -> Optional[int]:
         """The VNI assigned to ``service_key``, or ``None``."""
@@ -129,34 +213,64 @@ class VniRegistry(ABC):
         """Import live read-back circuits as assignments (audit/bootstrap).
 
         Raises :class:`VniInUse` if a VNI is already assigned to a *different*
-        service — a real fabric collision worth surfacing loudly.
+        service — a real fabric collision worth surfacing loudly. The built-in
+        backends check the whole read-back first and raise one
+        :class:`~netauto.exceptions.SeedConflict` listing every collision
+        (VNI or RT), recording nothing; this default records one by one.
         """
-        for c in circuits:
-            self.record(
-                _service_key(c),
-                c.evpn.vni,
-                c.routing_instance.rt_rd if c.routing_instance else None,
-            )
+        for row in _seed_rows(circuits):
+            self.record(*row)
 
     @abstractmethod
     def record(self, service_key: str, vni: int, rt: Optional[str]) -> None:
         """Assert an existing assignment (used by seeding); detect collisions."""
 
 
+def _seed_rows(circuits: Iterable) -> Iterator[tuple[str, int, Optional[str]]]:
+    """``(service_key, vni, rt)`` for each read-back circuit."""
+    for c in circuits:
+        rt = c.routing_instance.rt_rd if c.routing_instance else None
+        yield _service_key(c), c.evpn.vni, rt
+
+
 class JsonFileRegistry(VniRegistry):
     """A simple JSON-file-backed registry — fabric-unique VNIs for one fabric.
 
-    In-process safe via a lock + atomic replace. For concurrent *processes* a
-    real lock (or a DB-backed ``VniRegistry``) is required; the JSON impl is the
-    illustrative default.
+    Lookups and allocation run against an in-memory :class:`VniAllocator`;
+    every mutation is written through to the file. The image is revalidated on
+    each call by the file's ``(mtime, size, inode)`` stamp — one ``stat`` — and
+    re-parsed only when another writer has replaced the file, so ``get()`` in a
+    hot loop is a dict lookup. In-process safe via a lock + atomic replace. For
+    concurrent *processes* a real lock (or a DB-backed ``VniRegistry``) is
+    required; the JSON impl is the illustrative default.
     """
 
-    def __init__(self, path: str | Path, base_vni: int = 10000):
+    def __init__(self, path: str | Path, base_vni: int = 10000, max_vni: int = MAX_VNI):
         self.path = Path(path)
         self.base_vni = base_vni
+        self.max_vni = max_vni
         self._lock = threading.Lock()
+        self._allocator = VniAllocator(base_vni=base_vni, max_vni=max_vni)
+        self._stamp: Optional[tuple] = None  # stat of the file the image matches
         if not self.path.exists():
             self._write({})
+        else:
+            self._revalidate()
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[tuple]:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _revalidate(self) -> None:
+        """Re-parse the file only if it changed since we last read or wrote it."""
+        stamp = self._stat(self.path)  # before the read: a racing write reloads next time
+        if stamp != self._stamp:
+            self._allocator.load(self._read())
+            self._stamp = stamp
 
     def _read(self) -> dict[str, dict]:
         if not self.path.exists():
@@ -166,62 +280,781 @@ class JsonFileRegistry(VniRegistry):
     def _write(self, data: dict[str, dict]) -> None:
         tmp = self.path.with_suffix(self.path.suffix + ".tmp")
         tmp.write_text(json.dumps(data, indent=2, sort_keys=True))
+        stamp = self._stat(tmp)  # rename keeps inode and mtime
         os.replace(tmp, self.path)  # atomic
+        self._stamp = stamp
+
+    def _flush(self) -> None:
+        try:
+            self._write(self._allocator.assignments())
+        except BaseException:
+            self._stamp = None  # keep memory in step with the file
+            self._revalidate()
+            raise
 
     def allocate(self, service_key: str, rt: Optional[str] = None) -> int:
         with self._lock:
-            data = self._read()
-            if service_key in data:
-                return data[service_key]["vni"]
+            self._revalidate()
+            existing = self._allocator.get(service_key)
+            if existing is not None:
+                return existing
+            vni = self._allocator.allocate(service_key, rt)
+            self._flush()
+            return vni
+
+    def allocate_many(
+        self,
+        requests: Iterable[tuple[str, Optional[str]]],
+        contiguous: bool = False,
+    ) -> list[int]:
+        requests = list(requests)
+        with self._lock:
+            self._revalidate()
+            before = len(self._allocator)
+            vnis = self._allocator.allocate_many(requests, contiguous=contiguous)
+            if len(self._allocator) != before:
+                self._flush()
+            return vnis
+
+    def release(self, service_key: str) -> None:
+        with self._lock:
+            self._revalidate()
+            if self._allocator.release(service_key) is not None:
+                self._flush()
+
+    def seed_from_circuits(self, circuits: Iterable) -> None:
+        """Check every circuit in memory, then write the file once."""
+        with self._lock:
+            self._revalidate()
+            self._allocator.seed(_seed_rows(circuits))
+            self._flush()
 
-            if rt is not None:
-                clash = next(
-                    (k for k, v in data.items() if v.get("rt") == rt), None
+    def release_many(self, service_keys: Iterable[str]) -> None:
+        with self._lock:
+            self._revalidate()
+            if self._allocator.release_many(service_keys):
+                self._flush()
+
+    def get(self, service_key: str) -> Optional[int]:
+        with self._lock:
+            self._revalidate()
+            return self._allocator.get(service_key)
+
+    def assignments(self) -> dict[str, dict]:
+        with self._lock:
+            self._revalidate()
+            return self._allocator.assignments()
+
+    def record(self, service_key: str, vni: int, rt: Optional[str]) -> None:
+        with self._lock:
+            self._revalidate()
+            self._allocator.record(service_key, vni, rt)
+            self._flush()
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vni_assignments (
+    service_key TEXT PRIMARY KEY,
+    vni         INTEGER NOT NULL,
+    rt          TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS vni_assignments_vni ON vni_assignments (vni);
+CREATE UNIQUE INDEX IF NOT EXISTS vni_assignments_rt ON vni_assignments (rt);
+CREATE TABLE IF NOT EXISTS registry_meta (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO registry_meta (key, value) VALUES ('version', 0);
+"""
+
+_UPSERT = (
+    "INSERT INTO vni_assignments (service_key, vni, rt) VALUES (?, ?, ?) "
+    "ON CONFLICT (service_key) DO UPDATE SET rt = excluded.rt"
+)
+
+
+class SqliteRegistry(VniRegistry):
+    """SQLite-backed registry, safe for many worker processes on one host.
+
+    The database runs in WAL mode, so reads never block behind a writer, and
+    unique indexes on ``vni`` and ``rt`` make a double assignment impossible
+    whatever the callers do. Every mutation is one ``BEGIN IMMEDIATE``
+    transaction: it takes the write lock up front, so two workers can't both
+    pick the same free VNI, and commits one row rather than rewriting a file.
+
+    Allocation and reads run against the shared :class:`VniAllocator` core. A
+    version counter in ``registry_meta`` is bumped by every write; the core is
+    reloaded only when it moved, i.e. another process (or registry instance)
+    committed since this one last looked. Reads first ask the connection's
+    ``PRAGMA data_version`` — answered from the WAL index, no table access —
+    so ``get()`` with no foreign writes is a dict lookup.
+
+    Unlike the JSON registry, :meth:`record` also refuses an RT already bound
+    to another service (:class:`RtCollision`) — the unique index enforces it.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        base_vni: int = 10000,
+        max_vni: int = MAX_VNI,
+        timeout: float = 30.0,
+    ):
+        self.path = str(path)
+        self.base_vni = base_vni
+        self.max_vni = max_vni
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._allocator = VniAllocator(base_vni=base_vni, max_vni=max_vni)
+        self._version: Optional[int] = None
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SQLITE_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection (sqlite3 connections are per-thread)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: no implicit transactions, we issue BEGIN
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Close the calling thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._conn()
+        with self._lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._refresh(conn)
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                self._version = None  # the core may be half-updated; reload
+                raise
+
+    def _refresh(self, conn: sqlite3.Connection) -> None:
+        (version,) = conn.execute(
+            "SELECT value FROM registry_meta WHERE key = 'version'"
+        ).fetchone()
+        if version != self._version:
+            self._allocator.load({
+                key: {"vni": vni, "rt": rt}
+                for key, vni, rt in conn.execute(
+                    "SELECT service_key, vni, rt FROM vni_assignments"
                 )
-                if clash is not None:
-                    raise RtCollision(
-                        f"route-target {rt} already assigned to {clash}"
-                    )
-
-            used = {v["vni"] for v in data.values()}
-            vni = self.base_vni
-            while vni in used:
-                vni += 1
-
-            data[service_key] = {"vni": vni, "rt": rt}
-            self._write(data)
+            })
+            self._version = version
+
+    def _sync(self) -> None:
+        """Bring the core up to date for a read (caller holds the lock)."""
+        conn = self._conn()
+        (data_version,) = conn.execute("PRAGMA data_version").fetchone()
+        if self._version is not None and data_version == getattr(
+            self._local, "data_version", None
+        ):
+            return  # no commit by any other connection since our last look
+        self._local.data_version = data_version
+        conn.execute("BEGIN")  # version + rows from one snapshot
+        try:
+            self._refresh(conn)
+        finally:
+            conn.execute("COMMIT")
+
+    def _bump(self, conn: sqlite3.Connection) -> None:
+        conn.execute("UPDATE registry_meta SET value = value + 1 WHERE key = 'version'")
+        (self._version,) = conn.execute(
+            "SELECT value FROM registry_meta WHERE key = 'version'"
+        ).fetchone()
+
+    def _upsert(self, conn: sqlite3.Connection, rows: list) -> None:
+        try:
+            conn.executemany(_UPSERT, rows)
+        except sqlite3.IntegrityError as e:
+            raise RtCollision(f"route-target already assigned to another service: {e}") from e
+
+    def allocate(self, service_key: str, rt: Optional[str] = None) -> int:
+        existing = self.get(service_key)  # cached read: no write lock taken
+        if existing is not None:
+            return existing
+        with self._transaction() as conn:
+            existing = self._allocator.get(service_key)
+            if existing is not None:  # allocated by another worker meanwhile
+                return existing
+            vni = self._allocator.allocate(service_key, rt)
+            conn.execute(
+                "INSERT INTO vni_assignments (service_key, vni, rt) VALUES (?, ?, ?)",
+                (service_key, vni, rt),
+            )
+            self._bump(conn)
+            return vni
+
+    def allocate_many(
+        self,
+        requests: Iterable[tuple[str, Optional[str]]],
+        contiguous: bool = False,
+    ) -> list[int]:
+        """One ``BEGIN IMMEDIATE`` transaction and one bulk insert per batch."""
+        requests = list(requests)
+        with self._transaction() as conn:
+            new = [
+                (key, rt) for key, rt in requests if key not in self._allocator
+            ]
+            vnis = self._allocator.allocate_many(requests, contiguous=contiguous)
+            rows: dict[str, tuple] = {}
+            for key, rt in new:  # first request for a key wins, as in the core
+                rows.setdefault(key, (key, self._allocator.get(key), rt))
+            if rows:
+                conn.executemany(
+                    "INSERT INTO vni_assignments (service_key, vni, rt) VALUES (?, ?, ?)",
+                    list(rows.values()),
+                )
+                self._bump(conn)
+            return vnis
+
+    def release(self, service_key: str) -> None:
+        self.release_many([service_key])
+
+    def release_many(self, service_keys: Iterable[str]) -> None:
+        with self._transaction() as conn:
+            freed = [key for key in service_keys if self._allocator.release(key) is not None]
+            if freed:
+                conn.executemany(
+                    "DELETE FROM vni_assignments WHERE service_key = ?",
+                    [(key,) for key in freed],
+                )
+                self._bump(conn)
+
+    def get(self, service_key: str) -> Optional[int]:
+        with self._lock:
+            self._sync()
+            return self._allocator.get(service_key)
+
+    def assignments(self) -> dict[str, dict]:
+        with self._lock:
+            self._sync()
+            return self._allocator.assignments()
+
+    def record(self, service_key: str, vni: int, rt: Optional[str]) -> None:
+        with self._transaction() as conn:
+            self._allocator.record(service_key, vni, rt)
+            self._upsert(conn, [(service_key, vni, rt)])
+            self._bump(conn)
+
+    def seed_from_circuits(self, circuits: Iterable) -> None:
+        """Check every circuit in memory, then one transaction and one bulk
+        upsert."""
+        with self._transaction() as conn:
+            staged = self._allocator.seed(_seed_rows(circuits))
+            self._upsert(conn, [(key, vni, rt) for key, (vni, rt) in staged.items()])
+            self._bump(conn)
+
+
+def _fsync_dir(path: Path) -> None:
+    """Flush a directory entry change (a rename into ``path``) to disk."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class JournalRegistry(VniRegistry):
+    """Append-only journal registry: O(1) disk work per mutation.
+
+    ``path`` is a directory holding ``snapshot.json`` (the full assignment map
+    as of a sequence number) and ``journal.log`` (one JSON line per mutation
+    after it). Each mutation — an allocation, a whole ``allocate_many`` batch,
+    a seed — is one line, written and ``fsync``'d before the call returns, so
+    a batch is atomic on disk too. Opening the registry loads the snapshot and
+    replays the journal tail; a torn last line from a crash mid-write is
+    dropped, which is exact because that call never returned.
+
+    Once ``compact_every`` lines have accumulated, the next mutation writes a
+    fresh snapshot (temp file + ``fsync`` + atomic replace) and truncates the
+    journal; :meth:`compact` does it on demand (e.g. from a timer). A crash
+    between the two steps is harmless: replay skips lines the snapshot already
+    covers. Single-writer, like :class:`JsonFileRegistry`.
+    """
+
+    SNAPSHOT = "snapshot.json"
+    JOURNAL = "journal.log"
+
+    def __init__(
+        self,
+        path: str | Path,
+        base_vni: int = 10000,
+        max_vni: int = MAX_VNI,
+        compact_every: int = 10000,
+    ):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.base_vni = base_vni
+        self.max_vni = max_vni
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._allocator = VniAllocator(base_vni=base_vni, max_vni=max_vni)
+        self._seq = 0  # last sequence number applied
+        self._tail = 0  # journal lines since the snapshot
+        self._recover()
+        self._log = open(self.path / self.JOURNAL, "ab")  # noqa: SIM115
+
+    # ------------------------------------------------------------------ #
+    # Storage
+    # ------------------------------------------------------------------ #
+    def _recover(self) -> None:
+        self._allocator.clear()
+        self._seq = self._tail = 0
+        snapshot = self.path / self.SNAPSHOT
+        if snapshot.exists():
+            data = json.loads(snapshot.read_text())
+            self._allocator.load(data["assignments"])
+            self._seq = data["seq"]
+        journal = self.path / self.JOURNAL
+        if not journal.exists():
+            return
+        good = 0
+        with open(journal, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(raw)
+                except ValueError:
+                    break
+                good += len(raw)
+                if entry["seq"] <= self._seq:
+                    continue  # already in the snapshot
+                self._apply(entry)
+                self._seq = entry["seq"]
+                self._tail += 1
+        if good < journal.stat().st_size:
+            logger.warning("%s: dropping torn journal tail after byte %d", journal, good)
+            with open(journal, "r+b") as f:
+                f.truncate(good)
+                os.fsync(f.fileno())
+
+    def _apply(self, entry: dict) -> None:
+        for key in entry.get("del", ()):
+            self._allocator.release(key)
+        for key, (vni, rt) in entry.get("set", {}).items():
+            self._allocator.record(key, vni, rt)
+
+    def _commit(self, set_: Optional[dict] = None, delete: Optional[list] = None) -> None:
+        """Append one fsync'd journal line for a mutation already applied in
+        memory; on failure drop the partial line and reload from disk."""
+        entry: dict = {"seq": self._seq + 1}
+        if set_:
+            entry["set"] = set_
+        if delete:
+            entry["del"] = delete
+        # the file size, not tell(): appends land at the end whatever the
+        # handle's position says
+        offset = os.fstat(self._log.fileno()).st_size
+        try:
+            self._log.write(json.dumps(entry, separators=(",", ":")).encode() + b"\n")
+            self._log.flush()
+            os.fsync(self._log.fileno())
+        except BaseException:
+            self._log.truncate(offset)
+            self._log.seek(offset)
+            self._recover()
+            raise
+        self._seq += 1
+        self._tail += 1
+        if self.compact_every and self._tail >= self.compact_every:
+            self._compact()
+
+    def _compact(self) -> None:
+        snapshot = self.path / self.SNAPSHOT
+        tmp = snapshot.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"seq": self._seq, "assignments": self._allocator.assignments()}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, snapshot)
+        # The rename must be durable before the journal is emptied: otherwise a
+        # crash can leave the old snapshot next to an empty journal.
+        _fsync_dir(self.path)
+        self._log.truncate(0)
+        self._log.seek(0)
+        os.fsync(self._log.fileno())
+        self._tail = 0
+        logger.info("%s: compacted at seq %d", self.path, self._seq)
+
+    def compact(self) -> None:
+        """Write a snapshot now and empty the journal."""
+        with self._lock:
+            self._compact()
+
+    def close(self) -> None:
+        self._log.close()
+
+    # ------------------------------------------------------------------ #
+    # VniRegistry
+    # ------------------------------------------------------------------ #
+    def allocate(self, service_key: str, rt: Optional[str] = None) -> int:
+        with self._lock:
+            existing = self._allocator.get(service_key)
+            if existing is not None:
+                return existing
+            vni = self._allocator.allocate(service_key, rt)
+            self._commit(set_={service_key: [vni, rt]})
             return vni
 
+    def allocate_many(
+        self,
+        requests: Iterable[tuple[str, Optional[str]]],
+        contiguous: bool = False,
+    ) -> list[int]:
+        requests = list(requests)
+        with self._lock:
+            new: dict[str, Optional[str]] = {}
+            for key, rt in requests:
+                if key not in self._allocator:
+                    new.setdefault(key, rt)
+            vnis = self._allocator.allocate_many(requests, contiguous=contiguous)
+            if new:
+                self._commit(
+                    set_={key: [self._allocator.get(key), rt] for key, rt in new.items()}
+                )
+            return vnis
+
     def release(self, service_key: str) -> None:
+        self.release_many([service_key])
+
+    def release_many(self, service_keys: Iterable[str]) -> None:
         with self._lock:
-            data = self._read()
-            if data.pop(service_key, None) is not None:
-                self._write(data)
+            freed = [k for k in service_keys if self._allocator.release(k) is not None]
+            if freed:
+                self._commit(delete=freed)
 
     def get(self, service_key: str) -> Optional[int]:
-        entry = self._read().get(service_key)
-        return entry["vni"] if entry else None
+        with self._lock:
+            return self._allocator.get(service_key)
 
     def assignments(self) -> dict[str, dict]:
-        return self._read()
+        with self._lock:
+            return self._allocator.assignments()
 
     def record(self, service_key: str, vni: int, rt: Optional[str]) -> None:
         with self._lock:
-            data = self._read()
-            owner = next(
-                (k for k, v in data.items() if v["vni"] == vni and k != service_key),
-                None,
+            self._allocator.record(service_key, vni, rt)
+            self._commit(set_={service_key: [vni, rt]})
+
+    def seed_from_circuits(self, circuits: Iterable) -> None:
+        """Check every circuit in memory, then append one journal line."""
+        with self._lock:
+            staged = self._allocator.seed(_seed_rows(circuits))
+            if staged:
+                self._commit(set_={k: [vni, rt] for k, (vni, rt) in staged.items()})
+
+
+class PooledRegistry(VniRegistry):
+    """Named VNI pools, one independent registry (shard) per pool.
+
+    ``pools`` maps a pool name — by convention ``"<service_type>/<region>"``,
+    e.g. ``"cloud_vc/eu"`` — to its own backend, whose ``base_vni`` /
+    ``max_vni`` give the pool's range. Ranges must not overlap, which keeps
+    VNIs fabric-unique across pools. Each backend has its own lock and file /
+    database, so allocations in different pools never contend.
+
+    Allocation goes to the ``pool`` named on the call (or ``default_pool``);
+    a service already allocated in any pool keeps its VNI. :meth:`record` and
+    seeding route by VNI to the pool whose range holds it; a VNI outside every
+    range goes to ``default_pool``.
+
+    The registry keeps its own service -> pool owner map and a fabric-wide
+    route-target index, loaded from the pools when it is opened: lookups go
+    straight to the owning pool, and an RT already bound to a service in *any*
+    pool raises :class:`RtCollision`. Both are held under a short registry-level
+    lock that is never held across a backend call. Mutate the pools through one
+    ``PooledRegistry`` (e.g. behind ``RegistryServer``), not directly.
+    """
+
+    def __init__(
+        self,
+        pools: Mapping[str, VniRegistry],
+        default_pool: Optional[str] = None,
+    ):
+        if not pools:
+            raise ValueError("at least one pool is required")
+        if default_pool is not None and default_pool not in pools:
+            raise ValueError(f"unknown default pool: {default_pool}")
+        self.pools = dict(pools)
+        self.default_pool = default_pool
+        self._ranges = sorted(
+            (reg.base_vni, reg.max_vni, name) for name, reg in self.pools.items()
+        )
+        for (_, hi, a), (lo, _, b) in zip(self._ranges, self._ranges[1:]):
+            if lo <= hi:
+                raise ValueError(f"VNI ranges of pools {a} and {b} overlap")
+        self.base_vni = self._ranges[0][0]
+        self.max_vni = max(hi for _, hi, _ in self._ranges)
+        self._exhaustions = {name: 0 for name in self.pools}
+        self._counter_lock = threading.Lock()
+        self._lock = threading.Lock()  # guards _owners / _rts only
+        self._owners: dict[str, tuple[str, Optional[str]]] = {}  # key -> (pool, rt)
+        self._rts: dict[str, str] = {}  # rt -> key, across every pool
+        for name, reg in self.pools.items():
+            for key, a in reg.assignments().items():
+                self._claim(key, name, a["rt"])
+
+    @classmethod
+    def from_ranges(
+        cls,
+        ranges: Mapping[str, tuple[int, int]],
+        factory: Callable[[str, int, int], VniRegistry],
+        default_pool: Optional[str] = None,
+    ) -> PooledRegistry:
+        """Build the pools from ``{name: (first_vni, last_vni)}``;
+        ``factory(name, first, last)`` opens each backend, e.g.
+        ``lambda n, lo, hi: SqliteRegistry(f"vni-{n.replace('/', '-')}.db", lo, hi)``.
+        """
+        return cls(
+            {name: factory(name, lo, hi) for name, (lo, hi) in ranges.items()},
+            default_pool=default_pool,
+        )
+
+    def _pool_name(self, pool: Optional[str]) -> str:
+        name = pool or self.default_pool
+        if name is None:
+            raise ValueError("no pool given and no default_pool configured")
+        if name not in self.pools:
+            raise ValueError(f"unknown VNI pool: {name}")
+        return name
+
+    def _pool_for_vni(self, vni: int) -> str:
+        for lo, hi, name in self._ranges:
+            if lo <= vni <= hi:
+                return name
+        if self.default_pool is None:
+            raise ValueError(f"VNI {vni} is outside every pool and no default_pool is set")
+        return self.default_pool
+
+    def _count_exhaustion(self, name: str) -> None:
+        with self._counter_lock:
+            self._exhaustions[name] += 1
+
+    # Owner map / RT index; callers hold self._lock (or are __init__).
+    def _check_rt(self, rt: Optional[str], service_key: str) -> None:
+        if rt is not None and self._rts.get(rt, service_key) != service_key:
+            raise RtCollision(f"route-target {rt} already assigned to {self._rts[rt]}")
+
+    def _claim(self, service_key: str, pool: str, rt: Optional[str]) -> None:
+        self._owners[service_key] = (pool, rt)
+        if rt is not None:
+            self._rts[rt] = service_key
+
+    def _unclaim(self, service_key: str) -> None:
+        _, rt = self._owners.pop(service_key, (None, None))
+        if rt is not None and self._rts.get(rt) == service_key:
+            del self._rts[rt]
+
+    def pool_of(self, service_key: str) -> Optional[str]:
+        """The pool holding ``service_key``, or ``None``."""
+        with self._lock:
+            owner = self._owners.get(service_key)
+        return owner[0] if owner else None
+
+    def allocate(
+        self, service_key: str, rt: Optional[str] = None, pool: Optional[str] = None
+    ) -> int:
+        name = self._pool_name(pool)
+        with self._lock:
+            owner = self._owners.get(service_key)
+            if owner is None:
+                self._check_rt(rt, service_key)
+                self._claim(service_key, name, rt)
+        if owner is not None:
+            return self._allocate_held(service_key, owner)
+        try:
+            return self.pools[name].allocate(service_key, rt)
+        except BaseException as e:
+            with self._lock:
+                self._unclaim(service_key)
+            if isinstance(e, VniExhausted):
+                self._count_exhaustion(name)
+            raise
+
+    def _allocate_held(self, service_key: str, owner: tuple[str, Optional[str]]) -> int:
+        # held already (or being allocated by another thread): the owning
+        # pool's allocate is idempotent per key
+        vni = self.pools[owner[0]].allocate(service_key, owner[1])
+        with self._lock:
+            if service_key not in self._owners:  # the first caller failed
+                self._claim(service_key, *owner)
+        return vni
+
+    def allocate_many(
+        self,
+        requests: Iterable[tuple[str, Optional[str]]],
+        contiguous: bool = False,
+        pool: Optional[str] = None,
+    ) -> list[int]:
+        """As :meth:`allocate`, a service already held in another pool keeps
+        its VNI; the rest of the batch is allocated atomically in ``pool``."""
+        requests = list(requests)
+        target = self._pool_name(pool)
+        with self._lock:
+            held = {
+                key: self._owners[key]
+                for key, _ in requests
+                if self._owners.get(key, (target,))[0] != target
+            }
+            new: dict[str, Optional[str]] = {}
+            for key, rt in requests:
+                if key not in self._owners and key not in new:
+                    self._check_rt(rt, key)
+                    if rt is not None and rt in new.values():
+                        raise RtCollision(f"route-target {rt} requested twice in the batch")
+                    new[key] = rt
+            for key, rt in new.items():
+                self._claim(key, target, rt)
+        local = [(key, rt) for key, rt in requests if key not in held]
+        try:
+            vnis = iter(
+                self.pools[target].allocate_many(local, contiguous=contiguous)
+                if local
+                else ()
             )
-            if owner is not None:
-                raise VniInUse(
-                    f"VNI {vni} already assigned to {owner}, cannot also assign "
-                    f"to {service_key}"
-                )
-            existing = data.get(service_key)
-            if existing and existing["vni"] != vni:
-                raise VniInUse(
-                    f"{service_key} already has VNI {existing['vni']}, "
-                    f"cannot reassign to {vni}"
+        except BaseException as e:
+            with self._lock:
+                for key in new:
+                    self._unclaim(key)
+            if isinstance(e, VniExhausted):
+                self._count_exhaustion(target)
+            raise
+        return [
+            self._allocate_held(key, held[key]) if key in held else next(vnis)
+            for key, _ in requests
+        ]
+
+    def release(self, service_key: str) -> None:
+        self.release_many([service_key])
+
+    def release_many(self, service_keys: Iterable[str]) -> None:
+        by_pool: dict[str, list[str]] = {}
+        with self._lock:
+            for key in service_keys:
+                owner = self._owners.get(key)
+                if owner is not None:
+                    by_pool.setdefault(owner[0], []).append(key)
+        for name, keys in by_pool.items():
+            self.pools[name].release_many(keys)
+            with self._lock:
+                for key in keys:
+                    self._unclaim(key)
+
+    def get(self, service_key: str) -> Optional[int]:
+        name = self.pool_of(service_key)
+        return self.pools[name].get(service_key) if name is not None else None
+
+    def assignments(self) -> dict[str, dict]:
+        merged: dict[str, dict] = {}
+        for reg in self.pools.values():
+            merged.update(reg.assignments())
+        return merged
+
+    def record(self, service_key: str, vni: int, rt: Optional[str]) -> None:
+        name = self._pool_for_vni(vni)
+        with self._lock:
+            previous = self._owners.get(service_key)
+            if previous is not None and previous[0] != name:
+                raise ValueError(
+                    f"{service_key} is already allocated in pool {previous[0]}"
                 )
-            data[service_key] = {"vni": vni, "rt": rt}
-            self._write(data)
+            self._check_rt(rt, service_key)
+            self._unclaim(service_key)
+            self._claim(service_key, name, rt)
+        try:
+            self.pools[name].record(service_key, vni, rt)
+        except BaseException:
+            with self._lock:
+                self._unclaim(service_key)
+                if previous is not None:
+                    self._claim(service_key, *previous)
+            raise
+
+    def seed_from_circuits(self, circuits: Iterable) -> None:
+        """Seed each pool with the circuits whose VNI falls in its range.
+
+        All or nothing across pools: a service already held in another pool
+        (as :meth:`record` refuses) and route-targets bound elsewhere are
+        checked first; then each pool is seeded, and if any pool reports a
+        conflict the pools already seeded are rolled back. Every conflict is
+        raised together as one :class:`SeedConflict`.
+        """
+        by_pool: dict[str, list] = {}
+        rows: dict[str, tuple[str, Optional[str]]] = {}  # key -> (pool, rt)
+        seen: dict[str, str] = {}  # rt -> key within this seed
+        conflicts: list[str] = []
+        for c in circuits:
+            key, vni, rt = next(_seed_rows([c]))
+            name = self._pool_for_vni(vni)
+            by_pool.setdefault(name, []).append(c)
+            if rows.setdefault(key, (name, rt))[0] != name:
+                conflicts.append(f"{key} seeded into pools {rows[key][0]} and {name}")
+            if rt is not None and seen.setdefault(rt, key) != key:
+                conflicts.append(f"route-target {rt} used by {seen[rt]} and {key}")
+        with self._lock:
+            for key, (name, _) in rows.items():
+                owner = self._owners.get(key)
+                if owner is not None and owner[0] != name:
+                    conflicts.append(f"{key} is already allocated in pool {owner[0]}")
+            conflicts.extend(
+                f"route-target {rt} already assigned to {self._rts[rt]}"
+                for rt, key in seen.items()
+                if self._rts.get(rt, key) != key
+            )
+            if conflicts:
+                raise SeedConflict(conflicts)
+            new = [key for key in rows if key not in self._owners]
+            for key in new:
+                self._claim(key, *rows[key])
+
+        seeded: list[str] = []
+        for name, group in by_pool.items():
+            try:
+                self.pools[name].seed_from_circuits(group)
+            except SeedConflict as e:
+                conflicts.extend(f"[{name}] {c}" for c in e.conflicts)
+            else:
+                seeded.append(name)
+        if conflicts:
+            for name in seeded:
+                self.pools[name].release_many(k for k in new if rows[k][0] == name)
+            with self._lock:
+                for key in new:
+                    self._unclaim(key)
+            raise SeedConflict(conflicts)
+        with self._lock:
+            for key, (name, rt) in rows.items():
+                self._unclaim(key)
+                self._claim(key, name, rt)
+
+    def stats(self) -> dict[str, PoolStats]:
+        """Utilization and exhaustion per pool."""
+        out = {}
+        for lo, hi, name in self._ranges:
+            allocated = sum(
+                1 for a in self.pools[name].assignments().values() if lo <= a["vni"] <= hi
+            )
+            out[name] = PoolStats(
+                pool=name,
+                first_vni=lo,
+                last_vni=hi,
+                allocated=allocated,
+                free=hi - lo + 1 - allocated,
+                exhaustions=self._exhaustions[name],
+            )
+        return out
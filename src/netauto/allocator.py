@@ -0,0 +1,340 @@
+"""In-memory VNI allocator core shared by the ``VniRegistry`` backends.
+
+A registry used to answer every question by scanning all assignments: first
+free VNI by probing up from ``base_vni``, RT clash by walking every entry, VNI
+owner by another walk — O(n) per allocation, O(n²) for a bulk run.
+:class:`VniAllocator` keeps three indexes instead:
+
+  * service -> ``(vni, rt)``;
+  * VNI -> service and RT -> services (reverse lookups, O(1));
+  * :class:`FreeRanges`, the free part of ``[base_vni, max_vni]`` as sorted,
+    disjoint intervals — the lowest free VNI is the first interval's start,
+    and taking / freeing one VNI is a bisect plus a split or merge.
+
+It is storage-agnostic: a backend loads it from its store, asks it what to do,
+and persists the change it reports. It is not thread-safe on its own; the
+backends call it under their lock.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator, Mapping
+
+from .exceptions import RtCollision, SeedConflict, VniExhausted, VniInUse
+
+MAX_VNI = 2**24 - 1  # 24-bit VXLAN network identifier
+
+
+class FreeRanges:
+    """The free VNIs of ``[lo, hi]`` as sorted, disjoint, inclusive intervals.
+
+    A dense allocator leaves few holes, so the interval list stays short even
+    for millions of VNIs; lookups are a bisect over the interval starts.
+    """
+
+    def __init__(self, lo: int, hi: int):
+        if lo > hi:
+            raise ValueError(f"empty VNI range {lo}-{hi}")
+        self.lo = lo
+        self.hi = hi
+        self._starts = [lo]
+        self._ends = [hi]
+
+    def __contains__(self, vni: int) -> bool:
+        i = bisect_right(self._starts, vni) - 1
+        return i >= 0 and vni <= self._ends[i]
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        return zip(self._starts, self._ends)
+
+    def __len__(self) -> int:
+        """Number of free VNIs."""
+        return sum(e - s + 1 for s, e in self)
+
+    def first(self) -> int | None:
+        """The lowest free VNI, or ``None`` when the range is exhausted."""
+        return self._starts[0] if self._starts else None
+
+    def first_fit(self, count: int) -> int | None:
+        """Start of the lowest run of ``count`` consecutive free VNIs."""
+        return next((s for s, e in self if e - s + 1 >= count), None)
+
+    def take(self, vni: int) -> bool:
+        """Mark ``vni`` used. ``False`` if it was not free (or out of range)."""
+        i = bisect_right(self._starts, vni) - 1
+        if i < 0 or vni > self._ends[i]:
+            return False
+        start, end = self._starts[i], self._ends[i]
+        if start == end:
+            del self._starts[i], self._ends[i]
+        elif vni == start:
+            self._starts[i] = vni + 1
+        elif vni == end:
+            self._ends[i] = vni - 1
+        else:
+            self._ends[i] = vni - 1
+            self._starts.insert(i + 1, vni + 1)
+            self._ends.insert(i + 1, end)
+        return True
+
+    def give(self, vni: int) -> bool:
+        """Mark ``vni`` free again, merging with its neighbours. ``False`` if it
+        was already free or lies outside the range."""
+        if not self.lo <= vni <= self.hi:
+            return False
+        i = bisect_right(self._starts, vni) - 1
+        if i >= 0 and vni <= self._ends[i]:
+            return False
+        joins_left = i >= 0 and self._ends[i] == vni - 1
+        joins_right = i + 1 < len(self._starts) and self._starts[i + 1] == vni + 1
+        if joins_left and joins_right:
+            self._ends[i] = self._ends[i + 1]
+            del self._starts[i + 1], self._ends[i + 1]
+        elif joins_left:
+            self._ends[i] = vni
+        elif joins_right:
+            self._starts[i + 1] = vni
+        else:
+            self._starts.insert(i + 1, vni)
+            self._ends.insert(i + 1, vni)
+        return True
+
+
+class VniAllocator:
+    """Service -> ``(vni, rt)`` assignments with indexed allocate / release /
+    record. Same rules as :class:`~netauto.allocation.VniRegistry`: allocation is
+    idempotent per service, an RT bound to another service raises
+    :class:`RtCollision`, and recording a VNI owned by another service (or
+    moving a service to a new VNI) raises :class:`VniInUse`.
+
+    Recorded VNIs outside ``[base_vni, max_vni]`` (e.g. seeded from a device)
+    are tracked for ownership but never handed out.
+    """
+
+    def __init__(
+        self,
+        base_vni: int = 10000,
+        max_vni: int = MAX_VNI,
+        assignments: Mapping[str, Mapping] | None = None,
+    ):
+        self.base_vni = base_vni
+        self.max_vni = max_vni
+        self.clear()
+        if assignments:
+            self.load(assignments)
+
+    def clear(self) -> None:
+        self._services: dict[str, tuple[int, str | None]] = {}
+        self._vni_owner: dict[int, str] = {}
+        self._rt_owners: dict[str, set[str]] = {}
+        self._free = FreeRanges(self.base_vni, self.max_vni)
+
+    def load(self, assignments: Mapping[str, Mapping]) -> None:
+        """Replace the state with a ``{service: {"vni", "rt"}}`` snapshot."""
+        self.clear()
+        for service_key, entry in assignments.items():
+            self.record(service_key, entry["vni"], entry.get("rt"))
+
+    # ------------------------------------------------------------------ #
+    # Queries
+    # ------------------------------------------------------------------ #
+    def __len__(self) -> int:
+        return len(self._services)
+
+    def __contains__(self, service_key: str) -> bool:
+        return service_key in self._services
+
+    def get(self, service_key: str) -> int | None:
+        entry = self._services.get(service_key)
+        return entry[0] if entry else None
+
+    def owner(self, vni: int) -> str | None:
+        """The service holding ``vni``, or ``None``."""
+        return self._vni_owner.get(vni)
+
+    def rt_owner(self, rt: str, exclude: str | None = None) -> str | None:
+        """A service other than ``exclude`` bound to ``rt``, or ``None``."""
+        owners = self._rt_owners.get(rt, ())
+        return next((k for k in sorted(owners) if k != exclude), None)
+
+    def free_ranges(self) -> FreeRanges:
+        return self._free
+
+    def assignments(self) -> dict[str, dict]:
+        """``{service_key: {"vni": int, "rt": str | None}}`` snapshot."""
+        return {k: {"vni": v, "rt": rt} for k, (v, rt) in self._services.items()}
+
+    # ------------------------------------------------------------------ #
+    # Mutations
+    # ------------------------------------------------------------------ #
+    def allocate(self, service_key: str, rt: str | None = None) -> int:
+        """The service's VNI, assigning the lowest free one if it has none."""
+        existing = self.get(service_key)
+        if existing is not None:
+            return existing
+        if rt is not None:
+            clash = self.rt_owner(rt, exclude=service_key)
+            if clash is not None:
+                raise RtCollision(f"route-target {rt} already assigned to {clash}")
+        vni = self._free.first()
+        if vni is None:
+            raise VniExhausted(f"no free VNI left in {self.base_vni}-{self.max_vni}")
+        self._bind(service_key, vni, rt)
+        return vni
+
+    def allocate_many(
+        self,
+        requests: Iterable[tuple[str, str | None]],
+        contiguous: bool = False,
+    ) -> list[int]:
+        """Allocate a batch of ``(service_key, rt)`` requests, all or nothing.
+
+        Returns the VNIs in request order. Services that already hold a VNI
+        keep it; a service repeated in the batch gets one VNI. Every check
+        (RT owned by another service or repeated in the batch, not enough free
+        VNIs) runs before anything is assigned, so a failure leaves the
+        allocator untouched. With ``contiguous=True`` the *new* services get one
+        consecutive block, the lowest that fits.
+        """
+        requests = list(requests)
+        new: dict[str, str | None] = {}
+        batch_rts: dict[str, str] = {}
+        for service_key, rt in requests:
+            if service_key in self._services or service_key in new:
+                continue
+            if rt is not None:
+                clash = self.rt_owner(rt, exclude=service_key) or batch_rts.get(rt)
+                if clash is not None:
+                    raise RtCollision(f"route-target {rt} already assigned to {clash}")
+                batch_rts[rt] = service_key
+            new[service_key] = rt
+
+        if contiguous and new:
+            start = self._free.first_fit(len(new))
+            if start is None:
+                raise VniExhausted(
+                    f"no block of {len(new)} free VNIs in {self.base_vni}-{self.max_vni}"
+                )
+            vnis = range(start, start + len(new))
+        else:
+            vnis = []
+            for start, end in self._free:
+                vnis.extend(
+                    range(start, min(end, start + len(new) - len(vnis) - 1) + 1)
+                )
+                if len(vnis) == len(new):
+                    break
+            if len(vnis) < len(new):
+                raise VniExhausted(
+                    f"{len(new)} VNIs requested, {len(vnis)} free in "
+                    f"{self.base_vni}-{self.max_vni}"
+                )
+        for (service_key, rt), vni in zip(new.items(), vnis):
+            self._bind(service_key, vni, rt)
+        return [self._services[service_key][0] for service_key, _ in requests]
+
+    def release_many(self, service_keys: Iterable[str]) -> list[int]:
+        """Release each service; returns the VNIs actually freed."""
+        freed = (self.release(key) for key in service_keys)
+        return [vni for vni in freed if vni is not None]
+
+    def record(self, service_key: str, vni: int, rt: str | None) -> None:
+        """Assert an existing assignment (seeding / loading a store)."""
+        owner = self._vni_owner.get(vni)
+        if owner is not None and owner != service_key:
+            raise VniInUse(
+                f"VNI {vni} already assigned to {owner}, cannot also assign "
+                f"to {service_key}"
+            )
+        existing = self._services.get(service_key)
+        if existing is not None and existing[0] != vni:
+            raise VniInUse(
+                f"{service_key} already has VNI {existing[0]}, cannot reassign to {vni}"
+            )
+        if existing is not None:
+            self._unbind_rt(service_key, existing[1])
+        self._bind(service_key, vni, rt)
+
+    def seed(
+        self, rows: Iterable[tuple[str, int, str | None]]
+    ) -> dict[str, tuple[int, str | None]]:
+        """Record many ``(service_key, vni, rt)`` assignments in one pass.
+
+        Each row is checked against the current state and the rows before it
+        (VNI held by another service, service moving to a new VNI, RT bound to
+        another service). Every conflict is collected and raised together as
+        :class:`SeedConflict`, with nothing recorded; otherwise all rows are
+        applied. A service repeated with the same VNI (both ends of a circuit)
+        is recorded once. Returns the ``{service_key: (vni, rt)}`` applied.
+        """
+        staged: dict[str, tuple[int, str | None]] = {}
+        vni_owner: dict[int, str] = {}
+        rt_owner: dict[str, str] = {}
+        conflicts: list[str] = []
+        for service_key, vni, rt in rows:
+            held = (
+                staged[service_key][0]
+                if service_key in staged
+                else self.get(service_key)
+            )
+            if held is not None and held != vni:
+                conflicts.append(
+                    f"{service_key} already has VNI {held}, cannot reassign to {vni}"
+                )
+                continue
+            if service_key in staged:
+                continue
+            owner = vni_owner.get(vni) or self._vni_owner.get(vni)
+            if owner is not None and owner != service_key:
+                conflicts.append(
+                    f"VNI {vni} already assigned to {owner}, cannot also assign "
+                    f"to {service_key}"
+                )
+                continue
+            if rt is not None:
+                clash = rt_owner.get(rt) or self.rt_owner(rt, exclude=service_key)
+                if clash is not None and clash != service_key:
+                    conflicts.append(
+                        f"route-target {rt} already assigned to {clash}, cannot "
+                        f"also assign to {service_key}"
+                    )
+                    continue
+                rt_owner[rt] = service_key
+            staged[service_key] = (vni, rt)
+            vni_owner[vni] = service_key
+        if conflicts:
+            raise SeedConflict(conflicts)
+        for service_key, (vni, rt) in staged.items():
+            existing = self._services.get(service_key)
+            if existing is not None:
+                self._unbind_rt(service_key, existing[1])
+            self._bind(service_key, vni, rt)
+        return staged
+
+    def release(self, service_key: str) -> int | None:
+        """Free a service's VNI; returns it, or ``None`` if none was held."""
+        entry = self._services.pop(service_key, None)
+        if entry is None:
+            return None
+        vni, rt = entry
+        del self._vni_owner[vni]
+        self._unbind_rt(service_key, rt)
+        self._free.give(vni)
+        return vni
+
+    def _bind(self, service_key: str, vni: int, rt: str | None) -> None:
+        self._services[service_key] = (vni, rt)
+        self._vni_owner[vni] = service_key
+        if rt is not None:
+            self._rt_owners.setdefault(rt, set()).add(service_key)
+        self._free.take(vni)
+
+    def _unbind_rt(self, service_key: str, rt: str | None) -> None:
+        if rt is None:
+            return
+        owners = self._rt_owners.get(rt)
+        if owners is not None:
+            owners.discard(service_key)
+            if not owners:
+                del self._rt_owners[rt]
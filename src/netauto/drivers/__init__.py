@@ -2,5 +2,12 @@ from .base import DeviceDriver
 from .arista import AristaDriver
 from .ocnos import OcnosDriver
 from .mock import MockDriver
+from .simulated import SimulatedDevice
 
-__all__ = ["DeviceDriver", "AristaDriver", "OcnosDriver", "MockDriver"]
+__all__ = [
+    "DeviceDriver",
+    "AristaDriver",
+    "OcnosDriver",
+    "MockDriver",
+    "SimulatedDevice",
+]
@@ -3,6 +3,8 @@ import pyeapi
 from netauto.models import Interface, Vlan, Lag, Evpn
 from netauto.exceptions import NetAutoException, PushFailed
 from netauto.render import AristaDeviceRenderer
+from netauto.metrics import count_bytes, count_error
+from netauto.timing import phase
 from typing import List, Dict, Any
 import logging
 
@@ -11,6 +13,10 @@ logger = logging.getLogger(__name__)
 
 
 class AristaDriver(DeviceDriver):
+    # "show interfaces" carries description, mtu and interfaceStatus ("disabled"
+    # when admin-down)
+    interface_fields = ("description", "mtu", "enabled")
+
     def __init__(
         self, host: str, user: str, password: str, enable_password: str | None = None
     ):
@@ -48,11 +54,17 @@ class AristaDriver(DeviceDriver):
         # eAPI is stateless, nothing to close
         pass
 
+    def _enable(self, commands, **kwargs):
+        """``node.enable`` with the eAPI payload sizes counted (netauto.metrics)."""
+        response = self.node.enable(commands, **kwargs)
+        count_bytes(sent=commands, received=response)
+        return response
+
     def get_config(self, config_type: str = "running", format: str = "text") -> str:
         # we'll use the command output rather than node.running_config or startup_config properties
         # becuse we don't need all the defaults included in the output
 
-        response = self.node.enable(f"show {config_type}-config", encoding=format)
+        response = self._enable(f"show {config_type}-config", encoding=format)
 
         if format == "json":
             return response[0].get("result", {})
@@ -69,10 +81,11 @@ class AristaDriver(DeviceDriver):
         """
         # Get base interface info
         try:
-            response = self.node.enable("show interfaces")
+            response = self._enable("show interfaces")
             data = response[0].get("result", {})
         except Exception as e:
             logger.error(f"Failed to retrieve interfaces: {e}")
+            count_error()
             return {}
 
         # switchports = data_sw.get("switchports", {})
@@ -107,6 +120,9 @@ class AristaDriver(DeviceDriver):
                 interfaces.append(
                     Lag(
                         name=name,
+                        description=intf_data.get("description") or None,
+                        enabled=intf_data.get("interfaceStatus") != "disabled",
+                        mtu=intf_data.get("mtu"),
                         mode="routed",
                         members=members,
                         lacp_mode="active",
@@ -117,6 +133,9 @@ class AristaDriver(DeviceDriver):
                 interfaces.append(
                     Interface(
                         name=name,
+                        description=intf_data.get("description") or None,
+                        enabled=intf_data.get("interfaceStatus") != "disabled",
+                        mtu=intf_data.get("mtu"),
                         mode="routed",
                         lag_member_of=member_to_lag.get(name),
                     )
@@ -126,10 +145,11 @@ class AristaDriver(DeviceDriver):
 
     def get_vlans(self) -> Dict[int, Vlan]:
         try:
-            response = self.node.enable({"cmd": "show vlan"})
+            response = self._enable({"cmd": "show vlan"})
             data = response[0]
         except Exception as e:
             logger.error(f"Failed to retrieve VLANs: {e}")
+            count_error()
             return {}
 
         vlans = {}
@@ -165,10 +185,11 @@ class AristaDriver(DeviceDriver):
     def get_switchports(self) -> Dict[str, Interface]:
         """Per-port switchport state via 'show interfaces switchport'."""
         try:
-            response = self.node.enable("show interfaces switchport")
+            response = self._enable("show interfaces switchport")
             data = response[0].get("result", {})
         except Exception as e:
             logger.error(f"Failed to retrieve switchports: {e}")
+            count_error()
             return {}
 
         switchports: Dict[str, Interface] = {}
@@ -206,10 +227,11 @@ class AristaDriver(DeviceDriver):
 
     def get_vnis(self) -> Dict[int, Dict[str, Any]]:
         try:
-            response = self.node.enable({"cmd": "show vxlan vni"})
+            response = self._enable({"cmd": "show vxlan vni"})
             data = response[0]
         except Exception as e:
             logger.error(f"Failed to retrieve VNIs: {e}")
+            count_error()
             return {}
 
         vnis = {}
@@ -249,14 +271,19 @@ class AristaDriver(DeviceDriver):
         return self.push_config(commands, dry_run=dry_run)
 
     def push_config(self, commands: List[str], dry_run: bool = False):
-        self.node.configure_session()
+        with phase("session"):
+            self.node.configure_session()
         logger.info(f"started config session {self.node._session_name} on {self.host}")
         try:
-            self.node.config(commands)
+            with phase("edit"):
+                self.node.config(commands)
+            count_bytes(sent=commands)
             logger.info(
                 f"sending config commands to session {self.node._session_name} on {self.host}:\n{commands}"
             )
-            diff = self.node.diff()
+            with phase("diff"):
+                diff = self.node.diff()
+            count_bytes(received=diff)
             logger.info(
                 f"config diff for session {self.node._session_name} on {self.host}:\n{diff}"
             )
@@ -273,13 +300,16 @@ class AristaDriver(DeviceDriver):
             logger.info(
                 f"dry run enabled, aborting config session {self.node._session_name} on {self.host}"
             )
-            self.node.abort()
+            with phase("abort"):
+                self.node.abort()
         else:
             logger.info(
                 f"committing config session {self.node._session_name} on {self.host}"
             )
-            self.node.commit()
+            with phase("commit"):
+                self.node.commit()
             # save the running-config
-            self.node.enable("copy running-config startup-config")
+            with phase("save"):
+                self._enable("copy running-config startup-config")
 
         return diff
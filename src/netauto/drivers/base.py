@@ -1,9 +1,53 @@
+import functools
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any
+from netauto.metrics import DriverMetrics, size_result
 from netauto.models import Interface, Vlan
+from netauto.timing import phase
+
+# Device round-trips, timed as a phase of the surrounding manager operation and
+# recorded in ``DeviceDriver.metrics`` when instrumented (see netauto.metrics).
+RPC_METHODS = (
+    "connect",
+    "get_config",
+    "get_interfaces",
+    "get_vlans",
+    "get_switchports",
+    "get_vnis",
+    "push_config",
+    "get_config_fingerprint",
+)
+
+
+def _timed_rpc(name, method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        metrics = self.metrics
+        with phase(name):
+            if metrics is None:
+                return method(self, *args, **kwargs)
+            with metrics.measure(self, name, args):
+                result = method(self, *args, **kwargs)
+                size_result(result)
+                return result
+
+    wrapper.__timed_rpc__ = True
+    return wrapper
 
 
 class DeviceDriver(ABC):
+    metrics: DriverMetrics | None = None  # set by netauto.metrics.instrument()
+    # Interface fields get_interfaces() reads back from the device. Anything
+    # else is reported as the model default, so InterfaceEditor always pushes it.
+    interface_fields: tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in RPC_METHODS:
+            method = cls.__dict__.get(name)
+            if callable(method) and not getattr(method, "__timed_rpc__", False):
+                setattr(cls, name, _timed_rpc(name, method))
+
     @property
     @abstractmethod
     def platform(self) -> str:
@@ -66,3 +110,13 @@ class DeviceDriver(ABC):
             str: The configuration diff after applying the commands. Or the intended changes in dry-run mode.
         """
         pass
+
+    def get_config_fingerprint(self) -> str | None:
+        """A cheap token that changes whenever the running config changes.
+
+        Incremental reconcile (``FabricReconciler(incremental=True)``) compares
+        it between passes to skip unchanged devices. ``None`` (the default)
+        means the platform has no cheaper source than the config itself, and
+        the caller hashes ``get_config()`` instead.
+        """
+        return None
@@ -11,6 +11,8 @@ class MockDriver(DeviceDriver):
     the renderer matching ``platform`` so a single Mock can exercise both vendors.
     """
 
+    interface_fields = ("description", "mtu", "enabled")
+
     def __init__(
         self,
         initial_interfaces: List[Interface] = None,
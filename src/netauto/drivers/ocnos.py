@@ -10,6 +10,8 @@ from ncclient.operations.retrieve import GetReply
 from netauto.models import Interface, Vlan, Lag, Evpn, RoutingInstance
 from netauto.exceptions import NetAutoException, PushFailed
 from netauto.render import OcnosDeviceRenderer
+from netauto.metrics import count_bytes, count_error, lock_wait
+from netauto.timing import phase
 from netmiko import ConnectHandler
 
 
@@ -28,7 +30,13 @@ OCNOS_NS: dict[str, str] = {
 
 
 class OcnosDriver(DeviceDriver):
+    # _extract_interfaces doesn't read MTU or admin state (yet)
+    interface_fields = ("description",)
+    # the last get_interfaces() read, handed to the next get_switchports()
+    _interfaces: list[Interface | Lag] | None = None
+
     def __init__(self, host: str, user: str, password: str | None = None, key_file: str = "~/.ssh/id_rsa") -> None:
+        self.host = host
         self.connection_data = {
             "host": host,
             "port": 830,
@@ -61,6 +69,7 @@ class OcnosDriver(DeviceDriver):
         return conn
 
     def disconnect(self) -> None:
+        self._interfaces = None
         if self.conn is not None:
             self.conn.close_session()
 
@@ -240,17 +249,21 @@ class OcnosDriver(DeviceDriver):
                 }
                 with ConnectHandler(**conn_data) as conn:
                     config = conn.send_command(f"show {config_type}-config")
+                count_bytes(received=config)
                 return config or ""
             else:
                 reply = self.conn.get_config(source=config_type)
+                count_bytes(received=reply.xml)
                 return reply.data_xml or ""
 
         except RPCError as e:
             # NETCONF server returned an <rpc-error>
             logger.error("NETCONF RPC error while getting config: %s", e)
+            count_error()
             return ""
         except Exception as e:
             logger.exception("Failed to get configuration: %s", e)
+            count_error()
             return ""
 
     def _extract_system_macs(self, evpn_data: GetReply) -> dict[str, str] | None:
@@ -316,6 +329,8 @@ class OcnosDriver(DeviceDriver):
 
             interfaces_reply: GetReply = self.conn.get(filter=interfaces_filter)
             evpn_reply: GetReply = self.conn.get(filter=evpn_filter)
+            count_bytes(received=interfaces_reply.xml)
+            count_bytes(received=evpn_reply.xml)
             interfaces = self._extract_interfaces(interfaces_reply)
             system_macs = self._extract_system_macs(evpn_reply) or {}
 
@@ -327,13 +342,13 @@ class OcnosDriver(DeviceDriver):
                 if mac:
                     iface.system_mac = mac
 
+            self._interfaces = interfaces
             return interfaces
 
         except Exception as e:
             logger.exception(f"Failed to get interfaces: {e}")
             raise
 
-    # This could cause additional calls of get_interfaces, we could do a cache of it locally?
     def get_vlans(self) -> list[Vlan]:
         return [
             vlan
@@ -349,8 +364,16 @@ class OcnosDriver(DeviceDriver):
         ``_extract_interfaces`` already folds those sub-interfaces into each
         parent interface's ``trunk_vlans``, so we expose that per-port view here
         (keyed by interface name) for VLAN migration onto a LAG.
+
+        Callers usually read ``get_interfaces()`` just before (LagManager does),
+        so the interface read since the last push is reused once instead of
+        fetching the same NETCONF subtrees again.
         """
-        return {intf.name: intf for intf in self.get_interfaces()}
+        interfaces, self._interfaces = self._interfaces, None
+        if interfaces is None:
+            interfaces = self.get_interfaces()
+            self._interfaces = None
+        return {intf.name: intf for intf in interfaces}
 
     def get_network_instances(self) -> list[RoutingInstance]:
         if (
@@ -464,10 +487,12 @@ class OcnosDriver(DeviceDriver):
         try:
             vxlan_filter: tuple[str, str] = ("subtree", vxlan_subtree)
             vxlan_reply: GetReply = self.conn.get(filter=vxlan_filter)
+            count_bytes(received=vxlan_reply.xml)
             return self._extract_vnis(vxlan_reply)
 
         except Exception as e:  # i dont like this, revise it when ive got more data
             logger.exception("Failed to get VNIs: %s", e)
+            count_error()
             return []
 
     def push_config(self, commands: list[str], dry_run: bool = False) -> str:
@@ -481,14 +506,18 @@ class OcnosDriver(DeviceDriver):
             logger.info("No commands to push")
             return ""
 
+        self._interfaces = None  # the device is about to change
         locked = False
         try:
-            running_reply = self.conn.get_config(source="running")
+            with phase("read"):
+                running_reply = self.conn.get_config(source="running")
             logger.debug("retrieved running config")
             running_xml = getattr(running_reply, "data_xml", None) or running_reply.xml
+            count_bytes(received=running_reply.xml)
 
             logger.info("locking candidate config")
-            self.conn.lock(target="candidate")
+            with phase("lock"), lock_wait():
+                self.conn.lock(target="candidate")
             locked = True
 
             # NOTE: OcNOS keeps a candidate datastore that is not refreshed from
@@ -499,29 +528,35 @@ class OcnosDriver(DeviceDriver):
             # -- commit only applies the explicit edits below.
             for cmd in commands:
                 logger.info("applying config to candidate '%s'", cmd)
-                edit_reply = self.conn.edit_config(target="candidate", config=cmd)
+                with phase("edit"):
+                    edit_reply = self.conn.edit_config(target="candidate", config=cmd)
+                count_bytes(sent=cmd, received=edit_reply.xml)
 
                 if hasattr(edit_reply, "ok") and edit_reply.ok is False:
                     raise RPCError(edit_reply.xml)
 
-            candidate_reply = self.conn.get_config(source="candidate")
-            candidate_xml = (
-                getattr(candidate_reply, "data_xml", None) or candidate_reply.xml
-            )
-
-            diff = self._compute_diff(running_xml, candidate_xml)
+            with phase("diff"):
+                candidate_reply = self.conn.get_config(source="candidate")
+                candidate_xml = (
+                    getattr(candidate_reply, "data_xml", None) or candidate_reply.xml
+                )
+                count_bytes(received=candidate_reply.xml)
+                diff = self._compute_diff(running_xml, candidate_xml)
 
             if dry_run:
                 logger.info("dry run enabled, discarding changes")
-                self.conn.discard_changes()
+                with phase("discard"):
+                    self.conn.discard_changes()
                 return diff
 
             logger.info("committing candidate config")
-            self.conn.commit()
+            with phase("commit"):
+                self.conn.commit()
 
             try:
                 logger.info("copying running to startup")
-                self.conn.copy_config(source="running", target="startup")
+                with phase("save"):
+                    self.conn.copy_config(source="running", target="startup")
             except RPCError as e:
                 logger.warning("copy_config running->startup failed on '%s'", e)
 
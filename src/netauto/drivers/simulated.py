@@ -0,0 +1,463 @@
+"""Stateful simulated switch for offline load tests.
+
+:class:`MockDriver` records pushes and answers from static seed data;
+:class:`SimulatedDevice` behaves like the device instead. It holds the
+configuration itself — an Arista running-config or an OcNOS get-config
+``<data>`` tree — applies every rendered payload pushed to it (Arista CLI
+lines, OcNOS edit-config XML), and answers ``get_config`` / ``get_interfaces``
+/ ``get_switchports`` / ``get_vlans`` / ``get_vnis`` from that state, through
+the same parsers the real read-back uses. Managers, ``plan_reconcile``,
+``FabricReconciler`` and ``FabricAuditor`` therefore run end to end against it,
+and what they push is what they read back.
+
+Each RPC sleeps for ``latency`` seconds (a number, or a ``(low, high)`` range
+drawn per call), so fan-out and timeouts can be exercised at fleet scale.
+
+The configuration model is deliberately small: enough of EOS CLI semantics
+(nested blocks, ``no`` forms, single-valued settings replaced,
+``allowed vlan add/remove`` lists) and of NETCONF merge (list entries matched
+on their key leaf, ``nc:operation`` delete/remove/replace) for everything the
+renderers emit. It is not a device emulator.
+"""
+
+from __future__ import annotations
+
+import copy
+import difflib
+import random
+import re
+import threading
+import time
+from typing import Any
+
+from lxml import etree
+
+from netauto.models import Config, Interface, Lag, Vlan
+from netauto.parsers import AristaConfigParser, OcnosConfigXMLParser
+from netauto.render import AristaDeviceRenderer, OcnosDeviceRenderer
+
+from .base import DeviceDriver
+
+PLATFORMS = ("arista_eos", "ipinfusion_ocnos")
+
+NC_OPERATION = "{urn:ietf:params:xml:ns:netconf:base:1.0}operation"
+VXLAN_NS = "http://www.ipinfusion.com/yang/ocnos/ipi-vxlan"
+
+
+# --------------------------------------------------------------------------- #
+# Arista: running-config as a tree of CLI blocks
+# --------------------------------------------------------------------------- #
+# Settings that take one value: a new line replaces the old one.
+_SINGLE_VALUED = re.compile(
+    r"^(description|mtu|name|rd|router-id|ip address|switchport mode"
+    r"|switchport access vlan|channel-group|encapsulation dot1q vlan"
+    r"|vxlan source-interface|vxlan udp-port|vxlan vlan \d+)\b"
+)
+# Id-list settings, per enclosing block: "<list> add N", "<list> remove N",
+# "<list> N" (replace) and "no <list> N".
+_ID_LISTS = {"interface": "switchport trunk allowed vlan", "vlan-aware-bundle": "vlan"}
+
+
+def _ids(text: str) -> set[int]:
+    ids: set[int] = set()
+    for token in text.split(","):
+        token = token.strip()
+        if not token or token == "none":
+            continue
+        low, _, high = token.partition("-")
+        ids.update(range(int(low), int(high or low) + 1))
+    return ids
+
+
+def _id_text(ids: set[int]) -> str:
+    if not ids:
+        return "none"
+    ordered, runs = sorted(ids), []
+    start = prev = ordered[0]
+    for i in ordered[1:] + [None]:
+        if i is not None and i == prev + 1:
+            prev = i
+            continue
+        runs.append(str(start) if start == prev else f"{start}-{prev}")
+        if i is not None:
+            start = prev = i
+    return ",".join(runs)
+
+
+def _natural(text: str) -> list:
+    return [int(t) if t.isdigit() else t for t in re.split(r"(\d+)", text)]
+
+
+class _Block:
+    __slots__ = ("children", "ids", "line", "settings")
+
+    def __init__(self, line: str):
+        self.line = line
+        self.children: dict[str, _Block] = {}
+        self.ids: set[int] | None = None  # set for id-list lines
+        self.settings: dict[str, str] = {}  # single-valued setting -> its line
+
+    def _id_list(self) -> str | None:
+        return _ID_LISTS.get(self.line.split(" ", 1)[0])
+
+    def apply(self, line: str) -> _Block | None:
+        """Apply one config-mode command inside this block; returns the block
+        a following, deeper-indented line applies to."""
+        id_list = self._id_list()
+        negate = line.startswith("no ")
+        body = line[3:] if negate else line
+
+        if id_list and (body == id_list or body.startswith(id_list + " ")):
+            return self._apply_ids(id_list, body[len(id_list) :].strip(), negate)
+        if negate:
+            for key in [
+                k for k in self.children if k == body or k.startswith(body + " ")
+            ]:
+                del self.children[key]
+            self.settings = {
+                s: k for s, k in self.settings.items() if k in self.children
+            }
+            return None
+        single = _SINGLE_VALUED.match(line)
+        if single:
+            previous = self.settings.get(single.group(0))
+            if previous is not None and previous != line:
+                del self.children[previous]
+            self.settings[single.group(0)] = line
+        if line == "shutdown":
+            self.children.pop("no shutdown", None)
+        child = self.children.get(line)
+        if child is None:
+            child = self.children[line] = _Block(line)
+        return child
+
+    def _apply_ids(self, prefix: str, arg: str, negate: bool) -> None:
+        child = self.children.get(prefix)
+        if child is None:
+            child = _Block(prefix)
+            child.ids = set()
+        verb, _, rest = arg.partition(" ")
+        if negate:
+            child.ids = child.ids - _ids(arg) if arg else set()
+        elif verb == "add":
+            child.ids |= _ids(rest)
+        elif verb == "remove":
+            child.ids -= _ids(rest)
+        else:
+            child.ids = _ids(arg)
+        if child.ids or prefix.startswith("switchport"):
+            self.children[prefix] = child
+        else:
+            self.children.pop(prefix, None)  # a bundle with no VLANs left
+
+    def render(self, depth: int, out: list[str]) -> None:
+        for child in self.children.values():
+            line = (
+                child.line
+                if child.ids is None
+                else f"{child.line} {_id_text(child.ids)}"
+            )
+            out.append("   " * depth + line)
+            child.render(depth + 1, out)
+
+
+_SECTION_ORDER = ("hostname", "vlan", "interface", "router")
+
+
+class _AristaState:
+    def __init__(self, running_config: str = ""):
+        self.root = _Block("")
+        self.apply(running_config.splitlines())
+
+    def apply(self, lines: list[str]) -> None:
+        stack: list[tuple[int, _Block]] = [(-1, self.root)]
+        for raw in lines:
+            text = raw.strip()
+            if not text or text.startswith("!") or text == "end":
+                continue
+            indent = len(raw) - len(raw.lstrip())
+            while stack[-1][0] >= indent:
+                stack.pop()
+            if text == "exit":
+                if len(stack) > 1:
+                    stack.pop()
+                continue
+            block = stack[-1][1].apply(text)
+            if block is not None:
+                stack.append((indent, block))
+
+    def text(self) -> str:
+        def order(block: _Block) -> tuple:
+            kind = block.line.split(" ", 1)[0]
+            rank = _SECTION_ORDER.index(kind) if kind in _SECTION_ORDER else 1.5
+            return (rank, _natural(block.line))
+
+        out: list[str] = ["!"]
+        for block in sorted(self.root.children.values(), key=order):
+            out.append(block.line)
+            block.render(1, out)
+            out.append("!")
+        out.append("end")
+        return "\n".join(out) + "\n"
+
+    def vnis(self) -> dict[int, dict[str, Any]]:
+        vxlan = self.root.children.get("interface Vxlan1")
+        out: dict[int, dict[str, Any]] = {}
+        for line in vxlan.children if vxlan else ():
+            m = re.match(r"vxlan vlan (\d+) vni (\d+)$", line)
+            if m:
+                out[int(m.group(2))] = {"vlan_id": int(m.group(1))}
+        return out
+
+
+# --------------------------------------------------------------------------- #
+# OcNOS: get-config <data> tree with NETCONF merge
+# --------------------------------------------------------------------------- #
+def _is_leaf(element: etree._Element) -> bool:
+    return len(element) == 0
+
+
+def _entry_key(element: etree._Element, siblings_tag: str | None) -> tuple | None:
+    """List entries are the same-tag children of a list container; they are
+    matched on their first leaf (``<name>``, ``<vxlan-identifier>``, …)."""
+    if _is_leaf(element) or siblings_tag != element.tag:
+        return None
+    first = element[0]
+    if not _is_leaf(first):
+        return None
+    return (first.tag, (first.text or "").strip())
+
+
+def _index(parent: etree._Element, tag: str) -> dict[tuple, etree._Element]:
+    return {
+        (entry[0].tag, (entry[0].text or "").strip()): entry
+        for entry in parent.iterchildren(tag)
+        if len(entry)
+    }
+
+
+def _strip_operations(element: etree._Element) -> etree._Element:
+    for e in element.iter():
+        e.attrib.pop(NC_OPERATION, None)
+    return element
+
+
+def _merge(dest: etree._Element, src: etree._Element) -> None:
+    children = [child for child in src if isinstance(child.tag, str)]  # no comments
+    tags = {child.tag for child in children}
+    siblings_tag = next(iter(tags)) if len(tags) == 1 else None
+    index: dict[tuple, etree._Element] | None = None  # built on first entry
+    for child in children:
+        operation = child.get(NC_OPERATION)
+        key = _entry_key(child, siblings_tag)
+        if key is None:
+            existing = dest.find(child.tag)
+        else:
+            if index is None:
+                index = _index(dest, child.tag)
+            existing = index.get(key)
+        if operation in ("delete", "remove"):
+            if existing is not None:
+                dest.remove(existing)
+                if key is not None:
+                    del index[key]
+            continue
+        if existing is not None and operation != "replace" and not _is_leaf(child):
+            _merge(existing, child)
+            continue
+        new = _strip_operations(copy.deepcopy(child))
+        if existing is None:
+            dest.append(new)
+        else:
+            dest.replace(existing, new)
+        if key is not None:
+            index[key] = new
+
+
+class _OcnosState:
+    _parser = etree.XMLParser(remove_blank_text=True)
+
+    def __init__(self, data: str | None = None):
+        self.root = (
+            etree.fromstring(data.encode(), self._parser)
+            if data
+            else etree.Element("data")
+        )
+
+    def apply(self, payloads: list[str]) -> None:
+        for payload in payloads:
+            _merge(self.root, etree.fromstring(payload.encode(), self._parser))
+
+    def text(self) -> str:
+        for element in self.root.iter():
+            if (
+                len(element) == 0
+                and element.text is not None
+                and not element.text.strip()
+            ):
+                element.text = None  # left over from a removed entry's indent
+        etree.indent(self.root)
+        return etree.tostring(self.root, pretty_print=True).decode()
+
+    def vnis(self) -> list[int]:
+        return sorted(
+            int(e.text)
+            for e in self.root.iter(f"{{{VXLAN_NS}}}vxlan-identifier")
+            if e.getparent().tag == f"{{{VXLAN_NS}}}vxlan-tenant"
+        )
+
+
+# --------------------------------------------------------------------------- #
+# The driver
+# --------------------------------------------------------------------------- #
+class SimulatedDevice(DeviceDriver):
+    """A switch that keeps and applies its own configuration (see module doc).
+
+    ``running_config`` seeds the state: an Arista running-config, or an OcNOS
+    get-config ``<data>`` document; :attr:`config` is that state parsed.
+    ``latency`` / ``push_latency`` are seconds per read / push RPC (a number or
+    a ``(low, high)`` range; ``push_latency`` defaults to ``latency``); ``seed``
+    makes drawn latencies reproducible.
+    """
+
+    interface_fields = ("description", "mtu", "enabled")  # both parsers read them
+
+    def __init__(
+        self,
+        name: str,
+        platform: str = "arista_eos",
+        running_config: str | None = None,
+        latency: float | tuple[float, float] = 0.0,
+        push_latency: float | tuple[float, float] | None = None,
+        seed: int | None = None,
+    ):
+        if platform not in PLATFORMS:
+            raise ValueError(f"unsupported platform: {platform}")
+        self.host = name
+        self._platform = platform
+        self.latency = latency
+        self.push_latency = latency if push_latency is None else push_latency
+        self.renderer = (
+            OcnosDeviceRenderer()
+            if platform == "ipinfusion_ocnos"
+            else AristaDeviceRenderer()
+        )
+        self._state = (
+            _OcnosState(running_config)
+            if platform == "ipinfusion_ocnos"
+            else _AristaState(running_config or "")
+        )
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._revision = 0
+        self._parsed: tuple[int, Config] | None = None
+        self.pushes = 0
+        self.connected = False
+
+    @property
+    def platform(self) -> str:
+        return self._platform
+
+    @property
+    def lag_prefix(self) -> str:
+        return "po" if self._platform == "ipinfusion_ocnos" else "Port-Channel"
+
+    def _wait(self, latency: float | tuple[float, float]) -> None:
+        if isinstance(latency, tuple):
+            with self._lock:
+                latency = self._random.uniform(*latency)
+        if latency > 0:
+            time.sleep(latency)
+
+    # ------------------------------------------------------------------ #
+    # State
+    # ------------------------------------------------------------------ #
+    @property
+    def config(self) -> Config:
+        """The current state parsed into a :class:`Config` (cached until the
+        next push)."""
+        with self._lock:
+            if self._parsed is None or self._parsed[0] != self._revision:
+                if self._platform == "arista_eos":
+                    parsed = AristaConfigParser(self._state.text()).parse_config()
+                else:
+                    parsed = OcnosConfigXMLParser(self._state.root).parse_config()
+                self._parsed = (self._revision, parsed)
+            return self._parsed[1]
+
+    def _interfaces(self) -> dict[str, Interface]:
+        config = self.config
+        out: dict[str, Interface] = {i.name: i for i in config.interfaces}
+        out.update({lag.name: lag for lag in config.lags})
+        return out
+
+    # ------------------------------------------------------------------ #
+    # DeviceDriver
+    # ------------------------------------------------------------------ #
+    def connect(self):
+        self._wait(self.latency)
+        self.connected = True
+        return self
+
+    def disconnect(self):
+        self.connected = False
+
+    def get_config(
+        self, config_type: str = "running", format: str | None = None
+    ) -> str:
+        self._wait(self.latency)
+        with self._lock:
+            return self._state.text()
+
+    def get_config_fingerprint(self) -> str:
+        self._wait(self.latency)
+        return f"{self.host}@{self._revision}"
+
+    def get_interfaces(self) -> dict[str, Interface | Lag]:
+        self._wait(self.latency)
+        return self._interfaces()
+
+    def get_switchports(self) -> dict[str, Interface]:
+        self._wait(self.latency)
+        return {
+            name: intf
+            for name, intf in self._interfaces().items()
+            if not isinstance(intf, Lag) and intf.mode != "routed"
+        }
+
+    def get_vlans(self) -> dict[int, Vlan]:
+        self._wait(self.latency)
+        return {v.vlan_id: v for v in self.config.vlans}
+
+    def get_vnis(self) -> dict[int, dict[str, Any]] | list[int]:
+        self._wait(self.latency)
+        with self._lock:
+            return self._state.vnis()
+
+    def push_config(self, commands: list[str], dry_run: bool = False) -> str:
+        self._wait(self.push_latency)
+        with self._lock:
+            before = self._state.text()
+            target = copy.deepcopy(self._state) if dry_run else self._state
+            target.apply(commands)
+            after = target.text()
+            if not dry_run and after != before:
+                self._revision += 1
+            self.pushes += 1
+        return "".join(
+            difflib.unified_diff(
+                before.splitlines(keepends=True),
+                after.splitlines(keepends=True),
+                "running-config",
+                "session-config",
+            )
+        )
+
+    def push_lag(self, lag: Lag, delete: bool = False, dry_run: bool = False) -> str:
+        rendered = (
+            self.renderer.render_lag_delete(lag)
+            if delete
+            else self.renderer.render_lag(lag)
+        )
+        commands = rendered if isinstance(rendered, list) else [rendered]
+        return self.push_config(commands, dry_run=dry_run)
@@ -1,21 +1,36 @@
 import logging
-from typing import List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
 
 from .models import (
+    ApplyResult,
     Asn,
     AzureEvpn,
+    BatchResult,
     CircuitDiff,
+    CircuitResult,
+    CircuitSpec,
+    EnsureBatchResult,
     EnsureResult,
     Evpn,
     EvpnCircuit,
     Interface,
+    OperationTrace,
     ReconcilePlan,
     RoutingInstance,
 )
 from .drivers import DeviceDriver
-from .exceptions import InterfaceNotFound, NetAutoException, VniInUse
+from .exceptions import (
+    CircuitConflict,
+    InterfaceNotFound,
+    NetAutoException,
+    VniInUse,
+)
+from .index import CircuitIndex, circuit_bindings
 from .logic import _as_interface_map
 from .parsers import AristaConfigParser, OcnosConfigXMLParser
+from .timing import phase, traced_operation
 
 logger = logging.getLogger(__name__)
 
@@ -34,10 +49,15 @@ class EvpnManager:
     The VNI is allocated by an external process and passed in whole on the model;
     it is used verbatim (never derived from the VLAN). ``get_circuits`` /
     ``verify_circuit`` read configured state back into the models for inspection.
+
+    Every public operation records an :class:`OperationTrace` (see
+    :mod:`netauto.timing`) on its result, where the result has a ``trace``
+    field, and always on :attr:`last_trace`.
     """
 
     def __init__(self, driver: DeviceDriver):
         self.driver = driver
+        self.last_trace: Optional[OperationTrace] = None
 
     def _normalise(self, rendered) -> List[str]:
         """Renderers return a CLI line list (Arista) or one XML string (OcNOS)."""
@@ -70,6 +90,7 @@ class EvpnManager:
                 detail = f" (mapped to VLAN {mapped.get('vlan_id', 'unknown')})"
             raise VniInUse(f"VNI {vni} is already in use{detail}")
 
+    @traced_operation
     def create_circuit(
         self,
         interface_name: str,
@@ -137,6 +158,7 @@ class EvpnManager:
         )
         return "\n".join(d for d in diffs if d)
 
+    @traced_operation
     def delete_circuit(
         self,
         interface_name: str,
@@ -190,6 +212,7 @@ class EvpnManager:
 
         return "\n".join(d for d in diffs if d)
 
+    @traced_operation
     def create_azure_circuit(
         self,
         interface_name: str,
@@ -252,6 +275,7 @@ class EvpnManager:
         )
         return "\n".join(d for d in diffs if d)
 
+    @traced_operation
     def delete_azure_circuit(
         self,
         interface_name: str,
@@ -297,9 +321,141 @@ class EvpnManager:
 
         return "\n".join(d for d in diffs if d)
 
+    # ----------------------------------------------------------------- #
+    # Bulk provisioning (many circuits, one device)
+    # ----------------------------------------------------------------- #
+    @traced_operation
+    def create_circuits(
+        self,
+        circuits: List[CircuitSpec],
+        dry_run: bool = False,
+        max_per_push: int = 200,
+    ) -> BatchResult:
+        """Provision many circuit endpoints on this device in a few transactions.
+
+        Device state is read once (interface inventory and VNIs) and the whole
+        batch is validated against it and against itself: unknown interface,
+        VNI already on the device or repeated in the batch, the same
+        interface/VLAN binding twice, VRF name not matching the service key.
+        Rejected circuits are reported and skipped; the rest are rendered with
+        ``render_evpn_many`` (VRFs and circuits together) and pushed
+        ``max_per_push`` circuits per transaction.
+
+        Returns a :class:`BatchResult` with one :class:`CircuitResult` per input
+        circuit, in order. A transaction the device refuses marks its circuits
+        ``failed``; the remaining transactions are still attempted.
+        """
+        if max_per_push < 1:
+            raise NetAutoException("max_per_push must be at least 1")
+
+        results = [
+            CircuitResult(interface=spec.interface, vni=spec.evpn.vni, action="created")
+            for spec in circuits
+        ]
+        accepted = self._validate_batch(circuits, results)
+
+        batch = BatchResult(circuits=results)
+        logger.info(
+            "creating %d EVPN circuits (%d rejected) in %d transaction(s)",
+            len(accepted),
+            len(circuits) - len(accepted),
+            -(-len(accepted) // max_per_push),
+        )
+        for start in range(0, len(accepted), max_per_push):
+            chunk = accepted[start:start + max_per_push]
+            try:
+                rendered = self.driver.renderer.render_evpn_many(
+                    [
+                        (Interface(name=circuits[i].interface), circuits[i].evpn,
+                         circuits[i].routing_instance)
+                        for i in chunk
+                    ]
+                )
+                diff = self.driver.push_config(
+                    self._normalise(rendered), dry_run=dry_run
+                )
+            except (NetAutoException, ValueError) as e:
+                logger.warning("batch transaction failed: %s", e)
+                for i in chunk:
+                    results[i].action = "failed"
+                    results[i].error = f"{type(e).__name__}: {e}"
+                continue
+            for i in chunk:
+                results[i].transaction = len(batch.config_diffs)
+            batch.config_diffs.append(diff)
+        return batch
+
+    def _validate_batch(
+        self, circuits: List[CircuitSpec], results: List[CircuitResult]
+    ) -> List[int]:
+        """Check a batch against one read of device state and against itself.
+
+        Marks rejected entries in ``results`` and returns the indexes of the
+        circuits that may be pushed. Within the batch the first claim on a VNI
+        or interface/VLAN binding wins; later duplicates are rejected.
+        """
+        known = self._known_interfaces(spec.interface for spec in circuits)
+        existing_vnis = self.driver.get_vnis()
+        on_device = set(existing_vnis)
+
+        seen_vnis: dict[int, int] = {}
+        seen_bindings: dict[tuple[str, int], int] = {}
+        accepted: List[int] = []
+
+        def reject(i: int, error: NetAutoException) -> None:
+            results[i].action = "rejected"
+            results[i].error = f"{type(error).__name__}: {error}"
+
+        for i, spec in enumerate(circuits):
+            evpn, name = spec.evpn, spec.interface
+            if name not in known:
+                reject(i, InterfaceNotFound(
+                    f"Interface {name} does not exist on device."
+                ))
+                continue
+            if evpn.vni in on_device:
+                reject(i, VniInUse(f"VNI {evpn.vni} is already in use"))
+                continue
+            if evpn.vni in seen_vnis:
+                reject(i, VniInUse(
+                    f"VNI {evpn.vni} is repeated in the batch "
+                    f"(first used by circuit {seen_vnis[evpn.vni]})"
+                ))
+                continue
+            ri = spec.routing_instance
+            if ri is not None and ri.instance_name != evpn.description:
+                reject(i, NetAutoException(
+                    f"routing_instance.instance_name ({ri.instance_name!r}) must "
+                    f"match the service description ({evpn.description!r})"
+                ))
+                continue
+            bindings = circuit_bindings(spec.interface, spec.evpn)
+            clash = next((b for b in bindings if b in seen_bindings), None)
+            if clash is not None:
+                reject(i, CircuitConflict(
+                    f"{clash[0]} VLAN {clash[1]} is repeated in the batch "
+                    f"(first used by circuit {seen_bindings[clash]})"
+                ))
+                continue
+
+            seen_vnis[evpn.vni] = i
+            seen_bindings.update((b, i) for b in bindings)
+            accepted.append(i)
+        return accepted
+
+    def _known_interfaces(self, names: Iterable[str]) -> set[str]:
+        """Which of ``names`` exist on the device: one inventory read, plus
+        get_switchports() only when the inventory misses one."""
+        names = set(names)
+        missing = names - set(_as_interface_map(self.driver.get_interfaces()))
+        if missing:
+            missing -= set(_as_interface_map(self.driver.get_switchports()))
+        return names - missing
+
     # ----------------------------------------------------------------- #
     # Inspection / read-back (configured state)
     # ----------------------------------------------------------------- #
+    @traced_operation
     def get_circuits(self) -> List[EvpnCircuit]:
         """Read the EVPN circuits configured on this device back into models.
 
@@ -308,22 +464,30 @@ class EvpnManager:
         (running-config for Arista, NETCONF get-config XML for OcNOS). Configured
         state only — see the docs for the (deferred) operational-health layer.
         """
-        config = self.driver.get_config()
+        return self.circuits_from_config(self.driver.get_config())
+
+    def circuits_from_config(self, config: str) -> List[EvpnCircuit]:
+        """Parse an already-fetched ``get_config()`` payload into circuits (see
+        :meth:`get_circuits`)."""
         if not config or not str(config).strip():
             return []  # no config => no circuits
         if self.driver.platform == "arista_eos":
-            return AristaConfigParser(config).parse_evpn_circuits()
+            with phase("parse"):
+                return AristaConfigParser(config).parse_evpn_circuits()
         if self.driver.platform == "ipinfusion_ocnos":
-            return OcnosConfigXMLParser(config).parse_evpn_circuits()
+            with phase("parse"):
+                return OcnosConfigXMLParser(config).parse_evpn_circuits()
         raise NetAutoException(
             f"get_circuits not supported for platform {self.driver.platform}"
         )
 
+    @traced_operation
     def verify_circuit(
         self,
         interface_name: str,
         evpn: Evpn | AzureEvpn,
         routing_instance: Optional[RoutingInstance] = None,
+        index: Optional[CircuitIndex] = None,
     ) -> CircuitDiff:
         """Compare an intended circuit against what is live on the device.
 
@@ -331,18 +495,28 @@ class EvpnManager:
         intended VNI, and reports field-level differences — the core debugging
         primitive for "did my push land / has config drifted". More trustworthy
         than the push diff (OcNOS dry-run over-reports removals).
+
+        Pass a :class:`CircuitIndex` of an earlier read-back to check many
+        circuits against one read instead of re-reading per call.
         """
-        candidates = [c for c in self.get_circuits() if c.evpn.vni == evpn.vni]
-        if not candidates:
+        if index is None:
+            index = CircuitIndex(self.get_circuits())
+        return self._verify_against(index, interface_name, evpn, routing_instance)
+
+    def _verify_against(
+        self,
+        index: CircuitIndex,
+        interface_name: str,
+        evpn: Evpn | AzureEvpn,
+        routing_instance: Optional[RoutingInstance],
+    ) -> CircuitDiff:
+        circuit = index.find(evpn.vni, interface_name)
+        if circuit is None:
             return CircuitDiff(
                 present=False,
                 matches=False,
                 differences=[f"no circuit found with vni {evpn.vni}"],
             )
-        # Prefer one on the intended interface when the binding is known.
-        circuit = next(
-            (c for c in candidates if c.interface == interface_name), candidates[0]
-        )
         differences = self._diff_circuit(interface_name, evpn, routing_instance, circuit)
         return CircuitDiff(
             present=True, matches=not differences, differences=differences
@@ -351,6 +525,7 @@ class EvpnManager:
     # ----------------------------------------------------------------- #
     # Declarative ensure (idempotent: read -> diff -> converge)
     # ----------------------------------------------------------------- #
+    @traced_operation
     def ensure_circuit(
         self,
         interface_name: str,
@@ -372,6 +547,7 @@ class EvpnManager:
             ),
         )
 
+    @traced_operation
     def ensure_azure_circuit(
         self,
         interface_name: str,
@@ -388,6 +564,82 @@ class EvpnManager:
             ),
         )
 
+    @traced_operation
+    def ensure_circuits(
+        self, intents: List[CircuitSpec], dry_run: bool = False
+    ) -> EnsureBatchResult:
+        """Idempotently converge many circuits with one read-back and one push.
+
+        Reads the device back once into a :class:`CircuitIndex`, diffs every
+        intent against it exactly as :meth:`ensure_circuit` does, and pushes only the
+        absent and drifted circuits (with their VRFs, when ``routing_instance``
+        is given) as a single ``render_evpn_many`` transaction. Unchanged
+        circuits cost nothing beyond the shared read.
+
+        Intents must have distinct VNIs; endpoints that would be created must
+        exist on the device. Either problem raises before anything is pushed.
+        The result's ``trace`` times the read (``get_circuits``), the ``diff``,
+        the ``render`` and the ``push_config``.
+        """
+        seen: Dict[int, str] = {}
+        for spec in intents:
+            if spec.evpn.vni in seen:
+                raise CircuitConflict(
+                    f"VNI {spec.evpn.vni} is intended on both "
+                    f"{seen[spec.evpn.vni]} and {spec.interface}"
+                )
+            seen[spec.evpn.vni] = spec.interface
+
+        index = CircuitIndex(self.get_circuits())
+
+        results: List[EnsureResult] = []
+        to_push: List[CircuitSpec] = []
+        with phase("diff"):
+            for spec in intents:
+                diff = self._verify_against(
+                    index, spec.interface, spec.evpn, spec.routing_instance
+                )
+                if not diff.present:
+                    results.append(EnsureResult(action="created"))
+                    to_push.append(spec)
+                elif diff.matches:
+                    results.append(EnsureResult(action="unchanged"))
+                else:
+                    results.append(
+                        EnsureResult(action="updated", differences=diff.differences)
+                    )
+                    to_push.append(spec)
+
+        created = [
+            spec.interface
+            for spec, result in zip(intents, results)
+            if result.action == "created"
+        ]
+        missing = sorted(set(created) - self._known_interfaces(created))
+        if missing:
+            raise InterfaceNotFound(
+                f"Interface(s) {', '.join(missing)} do not exist on device."
+            )
+
+        config_diff = ""
+        if to_push:
+            logger.info(
+                "converging %d of %d EVPN circuits in one transaction",
+                len(to_push),
+                len(intents),
+            )
+            rendered = self.driver.renderer.render_evpn_many(
+                [
+                    (Interface(name=s.interface), s.evpn, s.routing_instance)
+                    for s in to_push
+                ]
+            )
+            config_diff = self.driver.push_config(
+                self._normalise(rendered), dry_run=dry_run
+            )
+
+        return EnsureBatchResult(results=results, config_diff=config_diff)
+
     def _ensure(self, interface_name, intended, routing_instance, dry_run, apply):
         diff = self.verify_circuit(interface_name, intended, routing_instance)
         if not diff.present:
@@ -440,7 +692,7 @@ class EvpnManager:
 
 
 def plan_reconcile(
-    intended: List[EvpnCircuit], actual: List[EvpnCircuit]
+    intended: List[EvpnCircuit], actual: List[EvpnCircuit] | CircuitIndex
 ) -> ReconcilePlan:
     """Diff an intended circuit inventory against live read-back, keyed by VNI.
 
@@ -448,13 +700,15 @@ def plan_reconcile(
     the fabric-wide service identifier, so it is the natural match key:
     ``to_create`` (intended, absent), ``to_update`` (present but drifted),
     ``to_delete`` (on device, not intended — orphans/extras), ``in_sync``.
+    ``actual`` may be a list or an already-built :class:`CircuitIndex`; a VNI
+    present more than once is matched on the intended interface first.
     """
+    index = actual if isinstance(actual, CircuitIndex) else CircuitIndex(actual)
     intended_by_vni = {c.evpn.vni: c for c in intended}
-    actual_by_vni = {c.evpn.vni: c for c in actual}
 
     plan = ReconcilePlan()
     for vni, want in intended_by_vni.items():
-        have = actual_by_vni.get(vni)
+        have = index.find(vni, want.interface)
         if have is None:
             plan.to_create.append(vni)
             continue
@@ -469,7 +723,185 @@ def plan_reconcile(
         else:
             plan.in_sync.append(vni)
 
-    plan.to_delete = sorted(set(actual_by_vni) - set(intended_by_vni))
+    plan.to_delete = sorted(index.vnis() - set(intended_by_vni))
     plan.to_create.sort()
     plan.in_sync.sort()
     return plan
+
+
+def apply_plan(
+    plan: ReconcilePlan,
+    intended: List[EvpnCircuit],
+    driver: DeviceDriver,
+    actual: Optional[List[EvpnCircuit] | CircuitIndex] = None,
+    dry_run: bool = False,
+    stop_on_error: bool = True,
+    delete_vrfs: bool = True,
+) -> ApplyResult:
+    """Apply a :class:`ReconcilePlan` to one device in grouped transactions.
+
+    At most three pushes, in order:
+
+    1. every ``to_create`` and ``to_update`` circuit from ``intended`` (with its
+       VRF when it carries a ``routing_instance``), via ``render_evpn_many``;
+    2. every ``to_delete`` circuit;
+    3. with ``delete_vrfs``, the VRFs that only the deleted circuits used —
+       after the circuits, as in :meth:`EvpnManager.delete_circuit`.
+
+    Deletes are rendered from the live circuits: pass the read-back the plan was
+    built from as ``actual`` (list or :class:`CircuitIndex`), otherwise it is
+    read once from the device. A refused transaction marks its VNIs ``failed``;
+    with ``stop_on_error`` the remaining transactions are ``skipped`` (and the
+    device is not read back for deletes), otherwise they are still attempted.
+    The VRF push only runs if the circuit deletes went through.
+    """
+    mgr = EvpnManager(driver)
+    renderer = driver.renderer
+    result = ApplyResult()
+    stopped = False
+
+    intended_by_vni = {c.evpn.vni: c for c in intended}
+    upserts = plan.to_create + sorted(plan.to_update)
+    unknown = [vni for vni in upserts if vni not in intended_by_vni]
+    if unknown:
+        raise NetAutoException(
+            f"plan references VNIs missing from the intended inventory: {unknown}"
+        )
+
+    def run(vnis: List[int], build: Callable[[], List[str]]) -> bool:
+        nonlocal stopped
+        if stopped:
+            result.skipped.extend(vnis)
+            return False
+        try:
+            diff = driver.push_config(build(), dry_run=dry_run)
+        except (NetAutoException, ValueError) as e:
+            logger.warning("plan transaction for vnis %s failed: %s", vnis, e)
+            for vni in vnis:
+                result.failed[vni] = f"{type(e).__name__}: {e}"
+            stopped = stop_on_error
+            return False
+        result.config_diffs.append(diff)
+        return True
+
+    if upserts:
+        def render_upserts() -> List[str]:
+            items = []
+            for vni in upserts:
+                c = intended_by_vni[vni]
+                if c.interface is None:
+                    raise NetAutoException(f"intended circuit {vni} has no interface")
+                items.append((Interface(name=c.interface), c.evpn, c.routing_instance))
+            return mgr._normalise(renderer.render_evpn_many(items))
+
+        if run(upserts, render_upserts):
+            result.created.extend(plan.to_create)
+            result.updated.extend(sorted(plan.to_update))
+
+    if not plan.to_delete:
+        return result
+    if stopped:
+        # don't even read the device back: nothing more is pushed
+        result.skipped.extend(sorted(plan.to_delete))
+        return result
+
+    if actual is None:
+        actual = mgr.get_circuits()
+    index = actual if isinstance(actual, CircuitIndex) else CircuitIndex(actual)
+    doomed: List[EvpnCircuit] = []
+    for vni in plan.to_delete:
+        found = [c for c in index.by_vni(vni) if c.interface is not None]
+        if found:
+            doomed.extend(found)
+        else:
+            result.failed[vni] = "no circuit with an access interface in read-back"
+    delete_vnis = sorted({c.evpn.vni for c in doomed})
+    if not delete_vnis:
+        return result
+
+    def render_deletes() -> List[str]:
+        payload: List[str] = []
+        for c in doomed:
+            interface = Interface(name=c.interface)
+            payload += mgr._normalise(
+                renderer.render_azure_evpn_delete(interface, c.evpn)
+                if isinstance(c.evpn, AzureEvpn)
+                else renderer.render_evpn_delete(interface, c.evpn)
+            )
+        return payload
+
+    if not run(delete_vnis, render_deletes):
+        return result
+    result.deleted.extend(delete_vnis)
+
+    if not delete_vrfs:
+        return result
+    # A VRF goes only when every circuit on it is being deleted and no intended
+    # circuit still wants it.
+    keep = {
+        c.routing_instance.instance_name
+        for c in intended
+        if c.routing_instance is not None
+    }
+    doomed_ids = {id(c) for c in doomed}
+    vrfs: Dict[str, tuple[Asn, RoutingInstance, List[int]]] = {}
+    for c in doomed:
+        ri = c.routing_instance
+        if ri is None or ri.instance_name in keep:
+            continue
+        users = index.by_instance(ri.instance_name)
+        if all(id(u) in doomed_ids for u in users):
+            entry = vrfs.setdefault(
+                ri.instance_name, (Asn(asn=c.evpn.asn), ri, [])
+            )
+            entry[2].append(c.evpn.vni)
+    if vrfs:
+        run(
+            sorted({vni for _, _, vnis in vrfs.values() for vni in vnis}),
+            lambda: [
+                line
+                for asn, ri, _ in vrfs.values()
+                for line in mgr._normalise(
+                    renderer.render_routing_instance_delete(asn, ri)
+                )
+            ],
+        )
+    return result
+
+
+def apply_plans(
+    jobs: Sequence[tuple],
+    concurrency: int = 8,
+    dry_run: bool = False,
+    stop_on_error: bool = True,
+) -> List[ApplyResult]:
+    """Apply per-device plans concurrently, ``concurrency`` devices at a time.
+
+    Each job is ``(plan, intended, driver)`` or ``(plan, intended, driver,
+    actual)`` and goes through :func:`apply_plan`; transactions on one device
+    stay sequential. Results come back in job order. With ``stop_on_error`` the
+    first device with a failure stops devices that have not started yet (all
+    their VNIs reported ``skipped``); devices already running finish.
+    """
+    if concurrency < 1:
+        raise NetAutoException("concurrency must be at least 1")
+    abort = threading.Event()
+
+    def run(job: tuple) -> ApplyResult:
+        plan, intended, driver, *rest = job
+        if abort.is_set():
+            return ApplyResult(
+                skipped=plan.to_create + sorted(plan.to_update) + plan.to_delete
+            )
+        result = apply_plan(
+            plan, intended, driver,
+            actual=rest[0] if rest else None,
+            dry_run=dry_run,
+            stop_on_error=stop_on_error,
+        )
+        if stop_on_error and result.failed:
+            abort.set()
+        return result
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(run, jobs))
@@ -16,6 +16,10 @@ class VniInUse(NetAutoException):
     """The requested VNI is already mapped on the device / fabric."""
 
 
+class VniExhausted(NetAutoException):
+    """No free VNI is left in the allocator's range."""
+
+
 class RtCollision(NetAutoException):
     """A route-target (or VNI) is already assigned to a different service.
 
@@ -24,6 +28,31 @@ class RtCollision(NetAutoException):
     """
 
 
+class SeedConflict(VniInUse, RtCollision):
+    """Seeding the registry found assignments that collide.
+
+    Lists every conflict of the batch in ``conflicts`` (nothing is recorded).
+    Subclasses both :class:`VniInUse` and :class:`RtCollision`, so handlers
+    written for single-record seeding keep catching it.
+    """
+
+    def __init__(self, conflicts: list[str]):
+        self.conflicts = conflicts
+        super().__init__(
+            f"{len(conflicts)} conflicting assignment(s): " + "; ".join(conflicts)
+        )
+
+
+class ContiguousUnsupported(NetAutoException):
+    """The registry backend cannot hand out a contiguous VNI block.
+
+    Raised before anything is allocated. ``JsonFileRegistry``,
+    ``SqliteRegistry`` and ``JournalRegistry`` support it (as do
+    ``PooledRegistry`` / ``RemoteRegistry`` over them); a custom backend relying
+    on the default :meth:`VniRegistry.allocate_many` does not.
+    """
+
+
 class CircuitConflict(NetAutoException):
     """The requested circuit conflicts with existing config (e.g. the VLAN/port
     is already bound to a different service)."""
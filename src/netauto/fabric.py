@@ -0,0 +1,363 @@
+"""Fabric-wide (many-device) read-back and reconcile.
+
+The per-device building blocks (:class:`~netauto.evpn.EvpnManager`,
+:func:`~netauto.evpn.plan_reconcile`) configure or inspect one switch per call;
+this module fans them out across a fabric. Devices are read concurrently with
+bounded parallelism and a per-device deadline, so sweep wall-time tracks the
+slowest device rather than the sum, and one hung switch is reported as timed
+out instead of stalling everything.
+
+A device is given either as a connected :class:`DeviceDriver` (left connected)
+or as a zero-argument callable that opens one (disconnected after the read), so
+connection set-up runs in parallel and under the deadline too.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping
+from typing import Any
+
+from .allocation import ConflictAccumulator
+from .drivers import DeviceDriver
+from .evpn import EvpnManager, plan_reconcile
+from .index import CircuitIndex
+from .models import (
+    DevicePlan,
+    EvpnCircuit,
+    FabricAudit,
+    FabricPlan,
+    ReconcilePlan,
+)
+
+logger = logging.getLogger(__name__)
+
+DeviceTarget = DeviceDriver | Callable[[], DeviceDriver]
+
+
+def read_circuits(target: DeviceTarget) -> list[EvpnCircuit]:
+    """Read one device's circuits back, opening (and closing) the connection
+    when ``target`` is a connect callable."""
+    if isinstance(target, DeviceDriver):
+        return EvpnManager(target).get_circuits()
+    driver = target()
+    try:
+        return EvpnManager(driver).get_circuits()
+    finally:
+        driver.disconnect()
+
+
+def fan_out(
+    names: list[str],
+    work: Callable[[str], Any],
+    max_workers: int,
+    timeout: float | None,
+) -> Iterator[tuple[str, Any, BaseException | None, float]]:
+    """Run ``work(name)`` for every name, at most ``max_workers`` at a time.
+
+    Yields ``(name, value, error, seconds)`` as each device finishes, in
+    completion order. A device still running ``timeout`` seconds after it
+    started is yielded with a :class:`TimeoutError` and its slot is freed at
+    once; its thread (a daemon) is abandoned and a late result is dropped.
+    Python threads can't be killed, so the drivers' own socket timeouts bound
+    how long an abandoned read lingers.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    done: queue.Queue = queue.Queue()
+    pending = list(reversed(names))
+    running: dict[str, float] = {}  # name -> monotonic start
+
+    def call(name: str) -> None:
+        try:
+            done.put((name, work(name), None))
+        except BaseException as e:  # noqa: BLE001 - reported, never raised in the worker
+            done.put((name, None, e))
+
+    while pending or running:
+        while pending and len(running) < max_workers:
+            name = pending.pop()
+            running[name] = time.monotonic()
+            threading.Thread(
+                target=call, args=(name,), name=f"netauto-{name}", daemon=True
+            ).start()
+
+        wait = None
+        if timeout is not None:
+            deadline = min(running.values()) + timeout
+            wait = max(0.0, deadline - time.monotonic())
+        try:
+            name, value, error = done.get(timeout=wait)
+        except queue.Empty:
+            now = time.monotonic()
+            for name, started in list(running.items()):
+                if now - started >= timeout:
+                    del running[name]
+                    logger.warning("%s: no answer after %.1fs", name, timeout)
+                    yield (
+                        name,
+                        None,
+                        TimeoutError(f"no answer after {timeout:.1f}s"),
+                        now - started,
+                    )
+            continue
+        started = running.pop(name, None)
+        if started is None:
+            continue  # late result from a device already reported as timed out
+        yield name, value, error, time.monotonic() - started
+
+
+def _error(e: BaseException) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+class FabricAuditor:
+    """Concurrent read-back of many devices with a streaming conflict audit.
+
+    Reads every device with bounded parallelism and a per-device deadline (see
+    :func:`fan_out`); each device's circuits are fed into a
+    :class:`~netauto.allocation.ConflictAccumulator` the moment they arrive, so
+    the VNI/RT collision report is ready as soon as the last device answers. A
+    device that errors or times out is recorded in ``errors``; the rest of the
+    sweep carries on.
+    """
+
+    def __init__(
+        self,
+        devices: Mapping[str, DeviceTarget],
+        max_workers: int = 32,
+        timeout: float | None = 60.0,
+    ):
+        self.devices = dict(devices)
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+    def audit(
+        self,
+        on_device: Callable[[str, list[EvpnCircuit]], None] | None = None,
+    ) -> FabricAudit:
+        """Sweep the fabric. ``on_device(name, circuits)`` is called for each
+        device as it answers (completion order), e.g. to print progress."""
+        started = time.perf_counter()
+        audit = FabricAudit()
+        accumulator = ConflictAccumulator()
+        for name, circuits, error, seconds in fan_out(
+            list(self.devices),
+            lambda name: read_circuits(self.devices[name]),
+            self.max_workers,
+            self.timeout,
+        ):
+            audit.read_seconds[name] = seconds
+            if error is not None:
+                audit.errors[name] = _error(error)
+                continue
+            audit.circuits[name] = circuits
+            accumulator.add(circuits, device=name)
+            if on_device is not None:
+                on_device(name, circuits)
+
+        audit.vni_collisions = accumulator.vni_collisions
+        audit.rt_collisions = accumulator.rt_collisions
+        audit.single_ended = accumulator.single_ended
+        audit.seconds = time.perf_counter() - started
+        if audit.vni_collisions or audit.rt_collisions:
+            logger.error(
+                "fabric collisions — vni: %s  rt: %s",
+                audit.vni_collisions,
+                audit.rt_collisions,
+            )
+        logger.info(
+            "audited %d devices in %.2fs (%d unreachable)",
+            len(self.devices),
+            audit.seconds,
+            len(audit.errors),
+        )
+        return audit
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+class _DeviceState:
+    """What the previous incremental pass saw on one device."""
+
+    def __init__(self):
+        self.fingerprint: str | None = None
+        self.intent_hash: str | None = None
+        self.index = CircuitIndex()
+        self.actual: dict[int, str] = {}  # vni -> digest of its read-back
+        # vni -> (intent digest, actual digest, "create" | "in_sync" | drift)
+        self.verdicts: dict[int, tuple[str, str | None, Any]] = {}
+        self.plan: ReconcilePlan | None = None
+
+
+class FabricReconciler:
+    """Plan the reconcile of a whole fabric against its intended circuits.
+
+    ``devices`` maps a device name to its driver (or connect callable);
+    ``intended`` maps the same names to the circuits that device should carry
+    (a device with no entry is planned against an empty intent, so everything on
+    it is reported ``to_delete``). :meth:`plan` reads every device concurrently
+    and runs :func:`~netauto.evpn.plan_reconcile` on each as it arrives.
+    Report-only, like ``plan_reconcile``; apply with
+    :func:`~netauto.evpn.apply_plans`.
+
+    With ``incremental=True`` the reconciler remembers, per device, the intent
+    hash and config fingerprint of the last pass. A device where neither moved
+    gets its previous plan back without parsing anything; otherwise only the
+    VNIs whose intended or read-back record changed are re-diffed. Update the
+    intent between passes with :meth:`set_intent`.
+    """
+
+    def __init__(
+        self,
+        devices: Mapping[str, DeviceTarget],
+        intended: Mapping[str, list[EvpnCircuit]],
+        max_workers: int = 32,
+        timeout: float | None = 60.0,
+        incremental: bool = False,
+    ):
+        unknown = sorted(set(intended) - set(devices))
+        if unknown:
+            raise ValueError(f"intent given for unknown devices: {unknown}")
+        self.devices = dict(devices)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.incremental = incremental
+        self.intended: dict[str, list[EvpnCircuit]] = {}
+        self._intent: dict[str, dict[int, tuple[EvpnCircuit, str]]] = {}
+        self._intent_hash: dict[str, str] = {}
+        self._state: dict[str, _DeviceState] = {}
+        for name in devices:
+            self.set_intent(name, intended.get(name, []))
+
+    def set_intent(self, device: str, circuits: list[EvpnCircuit]) -> None:
+        """Replace one device's intended circuits (hashed once, here)."""
+        if device not in self.devices:
+            raise ValueError(f"unknown device: {device}")
+        self.intended[device] = list(circuits)
+        by_vni = {c.evpn.vni: (c, _digest(c.model_dump_json())) for c in circuits}
+        self._intent[device] = by_vni
+        self._intent_hash[device] = _digest(
+            ",".join(f"{vni}={d}" for vni, (_, d) in sorted(by_vni.items()))
+        )
+
+    def plan(self) -> FabricPlan:
+        started = time.perf_counter()
+        fabric = FabricPlan()
+        read = self._read_changed if self.incremental else self._read
+        for name, actual, error, seconds in fan_out(
+            list(self.devices), read, self.max_workers, self.timeout
+        ):
+            if error is not None:
+                fabric.devices[name] = DevicePlan(
+                    error=_error(error), read_seconds=seconds
+                )
+                continue
+            t0 = time.perf_counter()
+            if self.incremental:
+                device = self._plan_incremental(name, *actual)
+            else:
+                device = DevicePlan(plan=plan_reconcile(self.intended[name], actual))
+            device.read_seconds = seconds
+            device.plan_seconds = time.perf_counter() - t0
+            fabric.devices[name] = device
+        # report in inventory order, whatever order the devices answered in
+        fabric.devices = {name: fabric.devices[name] for name in self.devices}
+        fabric.seconds = time.perf_counter() - started
+        logger.info(
+            "planned %d devices in %.2fs (%d failed)",
+            len(fabric.devices),
+            fabric.seconds,
+            len(fabric.failed),
+        )
+        return fabric
+
+    def _read(self, name: str) -> list[EvpnCircuit]:
+        return read_circuits(self.devices[name])
+
+    def _read_changed(self, name: str) -> tuple[str, list[EvpnCircuit] | None]:
+        """``(fingerprint, circuits)``; circuits is ``None`` when the config is
+        unchanged since the last pass (nothing parsed)."""
+        target = self.devices[name]
+        driver = target if isinstance(target, DeviceDriver) else target()
+        try:
+            fingerprint = driver.get_config_fingerprint()
+            config = None
+            if fingerprint is None:
+                config = driver.get_config()
+                fingerprint = _digest(str(config or ""))
+            state = self._state.get(name)
+            if state is not None and state.fingerprint == fingerprint:
+                return fingerprint, None
+            if config is None:
+                config = driver.get_config()
+            return fingerprint, EvpnManager(driver).circuits_from_config(config)
+        finally:
+            if driver is not target:
+                driver.disconnect()
+
+    def _plan_incremental(
+        self,
+        name: str,
+        fingerprint: str,
+        circuits: list[EvpnCircuit] | None,
+    ) -> DevicePlan:
+        state = self._state.setdefault(name, _DeviceState())
+        intent_hash = self._intent_hash[name]
+        if circuits is None and state.intent_hash == intent_hash:
+            # a copy: the cached plan must survive a caller editing the result
+            return DevicePlan(plan=state.plan.model_copy(deep=True), cached=True)
+
+        if circuits is not None:
+            state.index = CircuitIndex(circuits)
+            state.actual = {
+                vni: _digest(
+                    "".join(c.model_dump_json() for c in state.index.by_vni(vni))
+                )
+                for vni in state.index.vnis()
+            }
+
+        plan = ReconcilePlan()
+        verdicts: dict[int, tuple[str, str | None, Any]] = {}
+        rediffed = 0
+        for vni, (want, want_digest) in self._intent[name].items():
+            have_digest = state.actual.get(vni)
+            previous = state.verdicts.get(vni)
+            if previous is not None and previous[:2] == (want_digest, have_digest):
+                outcome = previous[2]
+            else:
+                rediffed += 1
+                # one VNI against the kept index, as plan_reconcile would diff it
+                have = state.index.find(vni, want.interface)
+                if have is None:
+                    outcome = "create"
+                else:
+                    diffs = EvpnManager._diff_circuit(
+                        want.interface or have.interface or "",
+                        want.evpn,
+                        want.routing_instance,
+                        have,
+                    )
+                    outcome = diffs or "in_sync"
+            verdicts[vni] = (want_digest, have_digest, outcome)
+            if outcome == "create":
+                plan.to_create.append(vni)
+            elif outcome == "in_sync":
+                plan.in_sync.append(vni)
+            else:
+                plan.to_update[vni] = list(outcome)
+        plan.to_delete = sorted(state.index.vnis() - set(self._intent[name]))
+        plan.to_create.sort()
+        plan.in_sync.sort()
+
+        state.fingerprint = fingerprint
+        state.intent_hash = intent_hash
+        state.verdicts = verdicts
+        state.plan = plan
+        return DevicePlan(plan=plan.model_copy(deep=True), rediffed=rediffed)
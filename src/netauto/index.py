@@ -0,0 +1,146 @@
+"""Indexed view of read-back EVPN circuits.
+
+``get_circuits()`` returns a flat list; verify / reconcile / audit each used to
+scan it (or rebuild ad-hoc ``by_vni`` / ``by_rt`` dicts). :class:`CircuitIndex`
+indexes a read-back once — by VNI, access binding ``(interface, VLAN)``,
+route-target, service key and routing-instance name — so a large device (or a
+whole fabric sweep) is queried many times at O(1) per lookup. It can be kept
+current with :meth:`CircuitIndex.add` / :meth:`CircuitIndex.remove`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+
+from .models import AzureEvpn, Evpn, EvpnCircuit
+
+
+def service_key(circuit: EvpnCircuit) -> str:
+    """Service identity used to group circuits for collision detection.
+
+    Prefer the routing-instance (VRF) name: it is read back authoritatively from
+    the device (the VXLAN tenant -> VRF mapping) and is the same on both ends of a
+    circuit. Fall back to ``evpn.description`` — the access-port label — only when
+    no VRF is bound; that label can be blank when a sub-interface has no
+    ``description`` configured, which would otherwise make one end of a normal
+    circuit look like a *different* service and raise a spurious collision.
+    """
+    ri = circuit.routing_instance
+    if ri is not None and ri.instance_name:
+        return ri.instance_name
+    return circuit.evpn.description
+
+
+def circuit_bindings(
+    interface: str | None, evpn: Evpn | AzureEvpn
+) -> list[tuple[str, int]]:
+    """The ``(interface, VLAN tag)`` pairs a circuit claims on its port.
+
+    Plain circuits claim their VLAN; an Azure customer endpoint claims each
+    C-TAG and a CNI endpoint its S-TAG. Unknown interface -> no bindings.
+    """
+    if interface is None:
+        return []
+    if isinstance(evpn, AzureEvpn):
+        tags = evpn.c_tags if evpn.role == "customer" else [evpn.s_tag]
+    else:
+        tags = [evpn.vlan.vlan_id]
+    return [(interface, tag) for tag in tags]
+
+
+class CircuitIndex:
+    """Read-back circuits with O(1) lookups by VNI, binding, RT, service key and
+    routing-instance name.
+
+    Every lookup returns the (possibly empty) list of matching circuits: within
+    one device a key is normally unique, but a fabric-wide index legitimately
+    holds both ends of a circuit under the same VNI / RT.
+    """
+
+    def __init__(self, circuits: Iterable[EvpnCircuit] = ()):
+        self._circuits: list[EvpnCircuit] = []
+        self._by_vni: dict[int, list[EvpnCircuit]] = {}
+        self._by_binding: dict[tuple[str, int], list[EvpnCircuit]] = {}
+        self._by_rt: dict[str, list[EvpnCircuit]] = {}
+        self._by_service: dict[str, list[EvpnCircuit]] = {}
+        self._by_instance: dict[str, list[EvpnCircuit]] = {}
+        for circuit in circuits:
+            self.add(circuit)
+
+    def _keys(self, circuit: EvpnCircuit):
+        yield self._by_vni, circuit.evpn.vni
+        for binding in circuit_bindings(circuit.interface, circuit.evpn):
+            yield self._by_binding, binding
+        yield self._by_service, service_key(circuit)
+        ri = circuit.routing_instance
+        if ri is not None:
+            yield self._by_rt, ri.rt_rd
+            yield self._by_instance, ri.instance_name
+
+    def add(self, circuit: EvpnCircuit) -> None:
+        self._circuits.append(circuit)
+        for table, key in self._keys(circuit):
+            table.setdefault(key, []).append(circuit)
+
+    def remove(self, circuit: EvpnCircuit) -> None:
+        """Drop one circuit equal to ``circuit``; ``ValueError`` if absent."""
+        self._circuits.remove(circuit)
+        for table, key in self._keys(circuit):
+            bucket = table[key]
+            bucket.remove(circuit)
+            if not bucket:
+                del table[key]
+
+    def __len__(self) -> int:
+        return len(self._circuits)
+
+    def __iter__(self) -> Iterator[EvpnCircuit]:
+        return iter(self._circuits)
+
+    # ------------------------------------------------------------------ #
+    # Lookups
+    # ------------------------------------------------------------------ #
+    def by_vni(self, vni: int) -> list[EvpnCircuit]:
+        return list(self._by_vni.get(vni, ()))
+
+    def by_binding(self, interface: str, vlan: int) -> list[EvpnCircuit]:
+        return list(self._by_binding.get((interface, vlan), ()))
+
+    def by_rt(self, rt: str) -> list[EvpnCircuit]:
+        return list(self._by_rt.get(rt, ()))
+
+    def by_service(self, key: str) -> list[EvpnCircuit]:
+        return list(self._by_service.get(key, ()))
+
+    def by_instance(self, instance_name: str) -> list[EvpnCircuit]:
+        return list(self._by_instance.get(instance_name, ()))
+
+    def vnis(self) -> set[int]:
+        return set(self._by_vni)
+
+    def find(self, vni: int, interface: str | None = None) -> EvpnCircuit | None:
+        """The circuit carrying ``vni``, preferring one bound to ``interface``."""
+        candidates = self._by_vni.get(vni)
+        if not candidates:
+            return None
+        return next((c for c in candidates if c.interface == interface), candidates[0])
+
+    # ------------------------------------------------------------------ #
+    # Audit
+    # ------------------------------------------------------------------ #
+    def vni_collisions(self) -> dict[int, list[str]]:
+        """VNIs used by more than one service key."""
+        return _collisions(self._by_vni)
+
+    def rt_collisions(self) -> dict[str, list[str]]:
+        """Route-targets used by more than one service key."""
+        return _collisions(self._by_rt)
+
+
+def _collisions(table: dict) -> dict:
+    out = {}
+    for key, circuits in table.items():
+        keys = {service_key(c) for c in circuits}
+        if len(keys) > 1:
+            out[key] = sorted(keys)
+    return out
@@ -1,8 +1,16 @@
 import logging
-from typing import Dict, List, Optional
-from .models import Interface, Lag, Vlan
+from typing import Any, Dict, List, Optional
+from .models import (
+    Interface,
+    InterfaceChange,
+    Lag,
+    LagOperation,
+    OperationTrace,
+    Vlan,
+)
 from .drivers import DeviceDriver
-from .exceptions import NetAutoException
+from .exceptions import InterfaceNotFound, NetAutoException
+from .timing import traced_operation
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +25,11 @@ def _as_interface_map(interfaces) -> Dict[str, Interface]:
     return {intf.name: intf for intf in interfaces}
 
 
+def _normalise(rendered) -> List[str]:
+    """Renderers return a CLI line list (Arista) or one XML string (OcNOS)."""
+    return rendered if isinstance(rendered, list) else [rendered]
+
+
 class InterfaceManager:
     def __init__(self, driver: DeviceDriver, name: str):
         self.driver = driver
@@ -51,6 +64,73 @@ class InterfaceManager:
         return self.driver.push_config(commands, dry_run=dry_run)
 
 
+class InterfaceEditor:
+    """Bulk description / MTU / admin-state edits on one device.
+
+    ``apply({"Ethernet1": {"description": "SO123"}, "Ethernet2": {"mtu": 9214}})``
+    reads the interface inventory once, drops every field that already has the
+    requested value, renders only the interfaces left with a real change (one
+    coalesced document on OcNOS) and pushes them in a single transaction.
+    Only fields the driver reads back (``driver.interface_fields``) can be
+    dropped; the rest are always pushed.
+    """
+
+    FIELDS = ("description", "mtu", "enabled")
+
+    def __init__(self, driver: DeviceDriver):
+        self.driver = driver
+        self.last_trace: Optional[OperationTrace] = None  # of the last apply()
+
+    def plan(self, changes: Dict[str, Dict[str, Any]]) -> List[InterfaceChange]:
+        """The :class:`InterfaceChange` edits that differ from the device, in
+        input order. Unknown interfaces or fields raise."""
+        inventory = _as_interface_map(self.driver.get_interfaces())
+        missing = [name for name in changes if name not in inventory]
+        if missing:
+            raise InterfaceNotFound(f"Interfaces not found: {', '.join(missing)}")
+
+        read_back = self.driver.interface_fields
+        planned: List[InterfaceChange] = []
+        for name, fields in changes.items():
+            wanted = InterfaceChange(name=name, **fields)
+            current = inventory[name]
+            delta = {}
+            for field in self.FIELDS:
+                want = getattr(wanted, field)
+                if want is None:
+                    continue
+                if field not in read_back:
+                    delta[field] = want  # unknown on the device: always push
+                    continue
+                have = getattr(current, field)
+                if field == "description":
+                    # "" clears; a missing description reads back as None
+                    want, have = want or None, have or None
+                if want != have:
+                    delta[field] = getattr(wanted, field)
+            if delta:
+                planned.append(InterfaceChange(name=name, **delta))
+        return planned
+
+    @traced_operation
+    def apply(self, changes: Dict[str, Dict[str, Any]], dry_run: bool = False) -> str:
+        """Push the edits that differ from the device as one transaction.
+
+        Returns the configuration diff (or the intended change in dry-run);
+        ``""`` without touching the device when nothing differs.
+        """
+        planned = self.plan(changes)
+        if not planned:
+            return ""
+        logger.info(
+            "updating %d of %d interfaces", len(planned), len(changes)
+        )
+        return self.driver.push_config(
+            _normalise(self.driver.renderer.render_interface_changes(planned)),
+            dry_run=dry_run,
+        )
+
+
 class LagManager:
     """Building blocks for single-switch LAG create/delete on Arista and OcNOS.
 
@@ -59,12 +139,19 @@ class LagManager:
         caller already has a fully-formed ``Lag`` model.
       * ``LagManager.create_lag(name, ports)`` / ``delete_lag(name, ports)`` —
         port-list helpers that read device state, build the ``Lag`` and push it.
+      * ``LagManager.apply_many([LagOperation, ...])`` — many creates / member
+        changes validated against one state read and pushed as one transaction
+        (the single-LAG helpers are one-operation batches).
 
     No MLAG support — these are single-switch aggregates only.
+
+    Each operation's phase timings (see :mod:`netauto.timing`) are left on
+    :attr:`last_trace`.
     """
 
     def __init__(self, driver: DeviceDriver):
         self.driver = driver
+        self.last_trace: Optional[OperationTrace] = None
 
     def _collect_vlans(
         self, switchports: Dict[str, Interface], member_ports: List[str]
@@ -94,6 +181,7 @@ class LagManager:
 
         return mode, trunk_vlans, access_vlan
 
+    @traced_operation
     def create_lag(
         self,
         lag_name: str,
@@ -112,71 +200,21 @@ class LagManager:
 
         Returns the configuration diff (or the intended change in dry-run).
         """
-        # Existence is checked against the full interface inventory: a routed
-        # (L3) port exists on the device but won't appear in get_switchports(),
-        # which only reports L2 switchports.
-        inventory = _as_interface_map(self.driver.get_interfaces())
-        switchports = _as_interface_map(self.driver.get_switchports())
-
-        for port in member_ports:
-            if port not in inventory and port not in switchports:
-                raise NetAutoException(f"Port {port} does not exist on device.")
-            member_of = (
-                getattr(inventory.get(port), "lag_member_of", None)
-                or getattr(switchports.get(port), "lag_member_of", None)
-            )
-            if member_of:
-                raise NetAutoException(
-                    f"Port {port} is already a member of {member_of}"
+        return self.apply_many(
+            [
+                LagOperation(
+                    action="create",
+                    lag_name=lag_name,
+                    member_ports=member_ports,
+                    lacp_mode=lacp_mode,
+                    description=description,
+                    migrate_vlans=migrate_vlans,
                 )
-
-        members = [Interface(name=p) for p in member_ports]
-        lag = Lag(
-            name=lag_name,
-            description=description,
-            lacp_mode=lacp_mode,
-            members=members,
-            mtu=None,  # don't impose a default MTU; device keeps its own
+            ],
+            dry_run=dry_run,
         )
 
-        mode, trunk_vlans, access_vlan = ("access", [], None)
-        if migrate_vlans:
-            mode, trunk_vlans, access_vlan = self._collect_vlans(
-                switchports, member_ports
-            )
-
-        # Arista models L2 VLANs as switchport config on the Port-Channel, so we
-        # carry them on the Lag model and let the renderer emit them inline.
-        if self.driver.platform != "ipinfusion_ocnos":
-            if migrate_vlans and mode == "trunk" and trunk_vlans:
-                lag.mode = "trunk"
-                lag.trunk_vlans = trunk_vlans
-            elif migrate_vlans and access_vlan:
-                lag.mode = "access"
-                lag.access_vlan = access_vlan
-            logger.info("creating LAG %s with members %s", lag_name, member_ports)
-            return self.driver.push_lag(lag, dry_run=dry_run)
-
-        # OcNOS-SP models L2 VLANs as dot1q sub-interfaces. Build one atomic
-        # payload list: the bundle, then move each member's sub-interfaces onto
-        # the po. create_parent_agg=True instantiates the aggregator so the
-        # members' aggregate-id reference resolves.
-        commands: List[str] = [
-            self.driver.renderer.render_lag(lag, create_parent_agg=True)
-        ]
-        if migrate_vlans:
-            for port in member_ports:
-                sp = switchports.get(port)
-                for vlan in (sp.trunk_vlans if sp else []):
-                    commands.append(self.driver.renderer.render_vlan(lag, vlan))
-                    commands.append(
-                        self.driver.renderer.render_vlan_delete(
-                            Interface(name=port), vlan
-                        )
-                    )
-        logger.info("creating LAG %s with members %s", lag_name, member_ports)
-        return self.driver.push_config(commands, dry_run=dry_run)
-
+    @traced_operation
     def delete_lag(
         self, lag_name: str, member_ports: List[str], dry_run: bool = False
     ) -> str:
@@ -192,9 +230,9 @@ class LagManager:
 
     def _push_rendered(self, rendered, dry_run: bool) -> str:
         """Normalise a renderer result (CLI list or single XML string) and push."""
-        commands = rendered if isinstance(rendered, list) else [rendered]
-        return self.driver.push_config(commands, dry_run=dry_run)
+        return self.driver.push_config(_normalise(rendered), dry_run=dry_run)
 
+    @traced_operation
     def add_members(
         self,
         lag_name: str,
@@ -207,37 +245,19 @@ class LagManager:
         The LAG must already exist. Ports already belonging to a *different* LAG
         are refused; re-adding a port already in this LAG is a no-op.
         """
-        inventory = _as_interface_map(self.driver.get_interfaces())
-        switchports = _as_interface_map(self.driver.get_switchports())
-
-        if lag_name not in inventory:
-            raise NetAutoException(
-                f"LAG {lag_name} does not exist; use create_lag first."
-            )
-
-        for port in member_ports:
-            if port not in inventory and port not in switchports:
-                raise NetAutoException(f"Port {port} does not exist on device.")
-            member_of = (
-                getattr(inventory.get(port), "lag_member_of", None)
-                or getattr(switchports.get(port), "lag_member_of", None)
-            )
-            if member_of and member_of != lag_name:
-                raise NetAutoException(
-                    f"Port {port} is already a member of {member_of}"
+        return self.apply_many(
+            [
+                LagOperation(
+                    action="add_members",
+                    lag_name=lag_name,
+                    member_ports=member_ports,
+                    lacp_mode=lacp_mode,
                 )
-
-        lag = Lag(
-            name=lag_name,
-            members=[Interface(name=p) for p in member_ports],
-            lacp_mode=lacp_mode,
-            mtu=None,
-        )
-        logger.info("adding members %s to LAG %s", member_ports, lag_name)
-        return self._push_rendered(
-            self.driver.renderer.render_lag_add_members(lag), dry_run
+            ],
+            dry_run=dry_run,
         )
 
+    @traced_operation
     def remove_members(
         self, lag_name: str, member_ports: List[str], dry_run: bool = False
     ) -> str:
@@ -247,22 +267,160 @@ class LagManager:
         accidentally detaching a port from a different LAG (`no channel-group`
         would otherwise pull it out of whatever channel it is in).
         """
+        return self.apply_many(
+            [
+                LagOperation(
+                    action="remove_members",
+                    lag_name=lag_name,
+                    member_ports=member_ports,
+                )
+            ],
+            dry_run=dry_run,
+        )
+
+    @traced_operation
+    def apply_many(
+        self, operations: List[LagOperation], dry_run: bool = False
+    ) -> str:
+        """Validate and push a batch of LAG create / add / remove operations as
+        one device transaction.
+
+        Device state is read once for the whole batch (``get_switchports()`` is
+        skipped for a remove-only batch) and each operation is checked against
+        it *and* against the operations before it: a port claimed by two LAGs in
+        the batch is refused, a LAG created earlier in the batch may be grown
+        later in it, and a port removed from one LAG may join another. Any
+        invalid operation raises before anything is pushed.
+
+        Returns the configuration diff (or the intended change in dry-run).
+        """
         inventory = _as_interface_map(self.driver.get_interfaces())
+        switchports: Dict[str, Interface] = {}
+        if any(op.action != "remove_members" for op in operations):
+            switchports = _as_interface_map(self.driver.get_switchports())
+
+        batch: Dict[str, Optional[str]] = {}  # port -> LAG, as of this batch
+        created: set[str] = set()
+
+        def member_of(port: str) -> Optional[str]:
+            if port in batch:
+                return batch[port]
+            return getattr(inventory.get(port), "lag_member_of", None) or getattr(
+                switchports.get(port), "lag_member_of", None
+            )
 
-        for port in member_ports:
-            member_of = getattr(inventory.get(port), "lag_member_of", None)
-            if member_of != lag_name:
-                raise NetAutoException(
-                    f"Port {port} is not a member of {lag_name} "
-                    f"(currently: {member_of})"
+        def claim(op: LagOperation, allow_same: bool) -> None:
+            for port in op.member_ports:
+                if port not in inventory and port not in switchports:
+                    raise NetAutoException(f"Port {port} does not exist on device.")
+                current = member_of(port)
+                if current and not (allow_same and current == op.lag_name):
+                    if port in batch:
+                        raise NetAutoException(
+                            f"Port {port} is used by both {current} and "
+                            f"{op.lag_name} in this batch"
+                        )
+                    raise NetAutoException(
+                        f"Port {port} is already a member of {current}"
+                    )
+                batch[port] = op.lag_name
+
+        commands: List[str] = []
+        for op in operations:
+            if op.action == "create":
+                claim(op, allow_same=False)
+                created.add(op.lag_name)
+                logger.info(
+                    "creating LAG %s with members %s", op.lag_name, op.member_ports
+                )
+                commands += self._create_commands(op, switchports)
+            elif op.action == "add_members":
+                if op.lag_name not in inventory and op.lag_name not in created:
+                    raise NetAutoException(
+                        f"LAG {op.lag_name} does not exist; use create_lag first."
+                    )
+                claim(op, allow_same=True)
+                logger.info(
+                    "adding members %s to LAG %s", op.member_ports, op.lag_name
+                )
+                commands += _normalise(
+                    self.driver.renderer.render_lag_add_members(
+                        Lag(
+                            name=op.lag_name,
+                            members=[Interface(name=p) for p in op.member_ports],
+                            lacp_mode=op.lacp_mode,
+                            mtu=None,
+                        )
+                    )
+                )
+            else:
+                for port in op.member_ports:
+                    current = member_of(port)
+                    if current != op.lag_name:
+                        raise NetAutoException(
+                            f"Port {port} is not a member of {op.lag_name} "
+                            f"(currently: {current})"
+                        )
+                    batch[port] = None
+                logger.info(
+                    "removing members %s from LAG %s", op.member_ports, op.lag_name
+                )
+                commands += _normalise(
+                    self.driver.renderer.render_lag_remove_members(
+                        Lag(
+                            name=op.lag_name,
+                            members=[Interface(name=p) for p in op.member_ports],
+                            mtu=None,
+                        )
+                    )
                 )
 
+        if not commands:
+            return ""
+        return self.driver.push_config(commands, dry_run=dry_run)
+
+    def _create_commands(
+        self, op: LagOperation, switchports: Dict[str, Interface]
+    ) -> List[str]:
+        """Rendered payloads for one validated ``create`` operation."""
         lag = Lag(
-            name=lag_name,
-            members=[Interface(name=p) for p in member_ports],
-            mtu=None,
-        )
-        logger.info("removing members %s from LAG %s", member_ports, lag_name)
-        return self._push_rendered(
-            self.driver.renderer.render_lag_remove_members(lag), dry_run
+            name=op.lag_name,
+            description=op.description,
+            lacp_mode=op.lacp_mode,
+            members=[Interface(name=p) for p in op.member_ports],
+            mtu=None,  # don't impose a default MTU; device keeps its own
         )
+
+        # Arista models L2 VLANs as switchport config on the Port-Channel, so we
+        # carry them on the Lag model and let the renderer emit them inline.
+        if self.driver.platform != "ipinfusion_ocnos":
+            if op.migrate_vlans:
+                mode, trunk_vlans, access_vlan = self._collect_vlans(
+                    switchports, op.member_ports
+                )
+                if mode == "trunk" and trunk_vlans:
+                    lag.mode = "trunk"
+                    lag.trunk_vlans = trunk_vlans
+                elif access_vlan:
+                    lag.mode = "access"
+                    lag.access_vlan = access_vlan
+            return _normalise(self.driver.renderer.render_lag(lag))
+
+        # OcNOS-SP models L2 VLANs as dot1q sub-interfaces. Build one atomic
+        # payload list: the bundle, then move each member's sub-interfaces onto
+        # the po. create_parent_agg=True instantiates the aggregator so the
+        # members' aggregate-id reference resolves.
+        commands: List[str] = [
+            self.driver.renderer.render_lag(lag, create_parent_agg=True)
+        ]
+        if op.migrate_vlans:
+            for port in op.member_ports:
+                sp = switchports.get(port)
+                for vlan in (sp.trunk_vlans if sp else []):
+                    commands.append(self.driver.renderer.render_vlan(lag, vlan))
+                    commands.append(
+                        self.driver.renderer.render_vlan_delete(
+                            Interface(name=port), vlan
+                        )
+                    )
+        return commands
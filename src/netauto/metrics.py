@@ -0,0 +1,471 @@
+"""Driver RPC metrics with a Prometheus text exporter.
+
+Logs say what a driver did; metrics say how long it took across the fleet.
+Enable instrumentation once per process::
+
+    from netauto import metrics
+
+    rpc = metrics.instrument()                    # every DeviceDriver, from now on
+    metrics.MetricsServer(rpc.registry, port=9464).start()   # or:
+    metrics.write_textfile(rpc.registry, "/var/lib/node_exporter/netauto.prom")
+
+Every driver RPC (the methods listed in ``drivers.base.RPC_METHODS``) is then
+recorded per device, platform and RPC:
+
+* ``netauto_rpc_duration_seconds`` — latency histogram;
+* ``netauto_rpc_request_bytes_total`` / ``netauto_rpc_response_bytes_total`` —
+  payload sizes on the wire (eAPI command/response JSON, NETCONF reply XML),
+  as reported by the driver; drivers that report nothing (``MockDriver``) are
+  sized from their command lists and string results;
+* ``netauto_rpc_errors_total`` — RPCs that raised, plus failures a driver
+  swallows (an OcNOS ``get_config`` that returns ``""``);
+* ``netauto_candidate_lock_wait_seconds`` — time to acquire the OcNOS
+  candidate lock.
+
+The registry is in-process and dependency-free; scrape it or write it out.
+Without :func:`instrument` the drivers pay one attribute lookup per RPC.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+# Prometheus client defaults, stretched for config pulls and commits.
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Family:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str]):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Family):
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("counters only go up")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, key)} {_number(v)}"
+            for key, v in values
+        ]
+
+
+class _Series:
+    __slots__ = ("buckets", "count", "sum")
+
+    def __init__(self, size: int):
+        self.buckets = [0] * size  # non-cumulative; summed on render
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Family):
+    """Bucketed observations per label set (cumulative ``le`` buckets on export)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        bounds = sorted(float(b) for b in buckets)
+        if bounds and bounds[-1] == math.inf:
+            bounds.pop()
+        self.bounds = tuple(bounds)
+        self._series: dict[tuple, _Series] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        slot = bisect_left(self.bounds, value)  # le-inclusive; == len -> +Inf
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.bounds) + 1)
+            series.buckets[slot] += 1
+            series.sum += value
+            series.count += 1
+
+    def snapshot(self, **labels: Any) -> tuple[int, float]:
+        """``(count, sum)`` for one label set."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return (series.count, series.sum) if series else (0, 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = sorted(
+                (key, list(s.buckets), s.sum, s.count)
+                for key, s in self._series.items()
+            )
+        lines = self.header()
+        for key, buckets, total, count in series:
+            cumulative = 0
+            for bound, n in zip(self.bounds + (math.inf,), buckets):
+                cumulative += n
+                le = f'le="{_number(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            lines.append(
+                f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}"
+            )
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """The metric families of one process, rendered as Prometheus text."""
+
+    def __init__(self):
+        self._families: dict[str, _Family] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, family: _Family) -> Any:
+        with self._lock:
+            existing = self._families.get(family.name)
+            if existing is not None:
+                if type(existing) is not type(family) or (
+                    existing.labelnames != family.labelnames
+                ):
+                    raise ValueError(f"metric {family.name} already registered")
+                return existing
+            self._families[family.name] = family
+            return family
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            families = sorted(self._families.items())
+        lines: list[str] = []
+        for _, family in families:
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------- #
+# Driver instrumentation
+# ---------------------------------------------------------------------- #
+class _RpcStats:
+    __slots__ = ("errors", "lock_wait", "received", "rpc", "sent", "sized")
+
+    def __init__(self, rpc: str):
+        self.rpc = rpc
+        self.sent = 0
+        self.received = 0
+        self.errors = 0
+        self.lock_wait: float | None = None
+        self.sized = False  # the driver reported wire sizes itself
+
+
+_current: ContextVar[_RpcStats | None] = ContextVar("netauto_rpc", default=None)
+
+
+def payload_size(payload: Any) -> int:
+    """Bytes of a request/response payload (UTF-8; JSON for structured data)."""
+    if payload is None:
+        return 0
+    if isinstance(payload, bytes):
+        return len(payload)
+    if isinstance(payload, str):
+        return len(payload.encode())
+    if isinstance(payload, (list, tuple)) and all(isinstance(p, str) for p in payload):
+        return sum(len(p.encode()) + 1 for p in payload)  # newline-separated
+    return len(json.dumps(payload, default=str).encode())
+
+
+def count_bytes(sent: Any = 0, received: Any = 0) -> None:
+    """Add wire sizes to the RPC being measured. Ints are taken as byte
+    counts; anything else is sized with :func:`payload_size` — only when
+    metrics are on, so drivers can pass raw payloads unconditionally."""
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.sized = True
+    stats.sent += sent if isinstance(sent, int) else payload_size(sent)
+    stats.received += received if isinstance(received, int) else payload_size(received)
+
+
+def count_error() -> None:
+    """Count a failure the driver handles itself instead of raising."""
+    stats = _current.get()
+    if stats is not None:
+        stats.errors += 1
+
+
+@contextmanager
+def lock_wait() -> Iterator[None]:
+    """Time acquiring a configuration lock within the current RPC."""
+    stats = _current.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.lock_wait = (stats.lock_wait or 0.0) + time.perf_counter() - started
+
+
+def device_label(driver: Any) -> str:
+    return str(getattr(driver, "host", None) or driver.platform)
+
+
+class DriverMetrics:
+    """The RPC metric families, registered in ``registry``."""
+
+    LABELS = ("device", "platform", "rpc")
+
+    def __init__(
+        self,
+        registry: MetricsRegistry | None = None,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.registry = registry if registry is not None else MetricsRegistry()
+        r = self.registry
+        self.duration = r.histogram(
+            "netauto_rpc_duration_seconds", "Driver RPC latency.", self.LABELS, buckets
+        )
+        self.request_bytes = r.counter(
+            "netauto_rpc_request_bytes_total", "Bytes sent to the device.", self.LABELS
+        )
+        self.response_bytes = r.counter(
+            "netauto_rpc_response_bytes_total",
+            "Bytes received from the device.",
+            self.LABELS,
+        )
+        self.errors = r.counter(
+            "netauto_rpc_errors_total", "Failed driver RPCs.", self.LABELS
+        )
+        self.lock_wait = r.histogram(
+            "netauto_candidate_lock_wait_seconds",
+            "Time to acquire the candidate datastore lock.",
+            ("device", "platform"),
+            buckets,
+        )
+
+    @contextmanager
+    def measure(self, driver: Any, rpc: str, args: tuple = ()) -> Iterator[_RpcStats]:
+        """Record one RPC of ``driver``. A call re-entering the same RPC (a
+        subclass calling ``super()``) is counted once, by the outer call."""
+        outer = _current.get()
+        if outer is not None and outer.rpc == rpc:
+            yield outer
+            return
+        stats = _RpcStats(rpc)
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            yield stats
+        except BaseException:
+            stats.errors += 1
+            raise
+        finally:
+            _current.reset(token)
+            seconds = time.perf_counter() - started
+            if not stats.sized and args and isinstance(args[0], list):
+                stats.sent = payload_size(args[0])  # push_config commands
+            self._record(driver, rpc, seconds, stats)
+
+    def _record(self, driver: Any, rpc: str, seconds: float, stats: _RpcStats) -> None:
+        labels = {
+            "device": device_label(driver),
+            "platform": driver.platform,
+            "rpc": rpc,
+        }
+        self.duration.observe(seconds, **labels)
+        self.request_bytes.inc(stats.sent, **labels)
+        self.response_bytes.inc(stats.received, **labels)
+        if stats.errors:
+            self.errors.inc(stats.errors, **labels)
+        if stats.lock_wait is not None:
+            self.lock_wait.observe(
+                stats.lock_wait, device=labels["device"], platform=labels["platform"]
+            )
+
+
+def size_result(result: Any) -> None:
+    """Size a string RPC result when the driver reported nothing itself."""
+    stats = _current.get()
+    if stats is not None and not stats.sized and isinstance(result, str):
+        stats.received = payload_size(result)
+
+
+def instrument(metrics: DriverMetrics | None = None) -> DriverMetrics:
+    """Record the RPCs of every driver into ``metrics`` (a new
+    :class:`DriverMetrics` by default). Set ``driver.metrics`` instead to
+    instrument one driver, or to ``None`` to exclude it."""
+    from .drivers import DeviceDriver
+
+    metrics = metrics if metrics is not None else DriverMetrics()
+    DeviceDriver.metrics = metrics
+    return metrics
+
+
+def uninstrument() -> None:
+    from .drivers import DeviceDriver
+
+    DeviceDriver.metrics = None
+
+
+# ---------------------------------------------------------------------- #
+# Export
+# ---------------------------------------------------------------------- #
+def write_textfile(registry: MetricsRegistry, path: str | Path) -> None:
+    """Write the registry atomically, e.g. for node_exporter's textfile
+    collector (which must never see a half-written file)."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as fh:
+            fh.write(registry.render())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class MetricsServer:
+    """Serve ``registry`` at ``http://host:port/metrics`` from a daemon thread.
+
+    Binds localhost by default; ``port=0`` picks a free one (see
+    :attr:`address` after :meth:`start`).
+    """
+
+    def __init__(
+        self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 0
+    ):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.address: tuple[str, int] | None = None
+        self._httpd: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    def _handler(self) -> type:
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass  # scrapes every few seconds would flood stderr
+
+        return Handler
+
+    def start(self) -> tuple[str, int]:
+        self._httpd = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._httpd.daemon_threads = True
+        self.address = self._httpd.server_address[:2]
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="netauto-metrics", daemon=True
+        )
+        self._thread.start()
+        return self.address
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join()
+            self._httpd = None
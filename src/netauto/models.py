@@ -1,5 +1,5 @@
 from typing import Literal, Optional
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
 
 class Vlan(BaseModel):
@@ -25,6 +25,20 @@ class Interface(BaseModel):
     vpn_id: Optional[int] = None
 
 
+class InterfaceChange(BaseModel):
+    """Field changes for one interface in a bulk edit (``InterfaceEditor``).
+
+    ``None`` leaves a field as it is; ``description=""`` clears it.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    name: str
+    description: Optional[str] = None
+    mtu: Optional[int] = Field(None, ge=68, le=65535)
+    enabled: Optional[bool] = None
+
+
 class Lag(Interface):
     members: list[Interface] = Field(default_factory=list)
     lacp_mode: Literal["active", "passive", "static"] = "active"
@@ -161,6 +175,30 @@ class EvpnCircuit(BaseModel):
     interface: Optional[str] = None
 
 
+class PhaseTiming(BaseModel):
+    """One timed phase of an operation; nested phases are ``/``-joined
+    (``push_config/commit``)."""
+
+    name: str
+    seconds: float
+
+
+class OperationTrace(BaseModel):
+    """Where the time of one manager operation went (see ``netauto.timing``)."""
+
+    operation: str
+    device: Optional[str] = None
+    phases: list[PhaseTiming] = Field(default_factory=list)  # in completion order
+    total: float = 0.0
+
+    def by_phase(self) -> dict[str, float]:
+        """Seconds per phase name, summed over repeats (e.g. two pushes)."""
+        out: dict[str, float] = {}
+        for p in self.phases:
+            out[p.name] = out.get(p.name, 0.0) + p.seconds
+        return out
+
+
 class CircuitDiff(BaseModel):
     """Result of verifying an intended circuit against the live device."""
 
@@ -175,6 +213,47 @@ class EnsureResult(BaseModel):
     action: Literal["created", "updated", "unchanged"]
     differences: list[str] = Field(default_factory=list)  # what drifted (if updated)
     config_diff: str = ""  # device config diff, when a push happened
+    trace: Optional[OperationTrace] = None  # phase timings of the call
+
+
+class CircuitSpec(BaseModel):
+    """One circuit endpoint to provision as part of a batch
+    (``EvpnManager.create_circuits``). ``routing_instance`` is the service VRF
+    to create alongside it; leave it ``None`` when the VRF already exists."""
+
+    interface: str
+    evpn: Evpn | AzureEvpn
+    routing_instance: Optional[RoutingInstance] = None
+
+
+class CircuitResult(BaseModel):
+    """Per-circuit outcome of a batch operation."""
+
+    interface: str
+    vni: int
+    action: Literal["created", "rejected", "failed"]
+    error: Optional[str] = None  # why it was rejected / failed
+    # index into BatchResult.config_diffs of the push that carried it
+    transaction: Optional[int] = None
+
+
+class BatchResult(BaseModel):
+    """Outcome of a batched push: one result per circuit, in input order, and
+    the device diff of each transaction."""
+
+    circuits: list[CircuitResult] = Field(default_factory=list)
+    config_diffs: list[str] = Field(default_factory=list)
+    trace: Optional[OperationTrace] = None
+
+
+class EnsureBatchResult(BaseModel):
+    """Outcome of ``ensure_circuits``: one :class:`EnsureResult` per intent (in
+    input order; ``config_diff`` left empty on each), the diff of the single
+    converge push, and the phase timings of the call."""
+
+    results: list[EnsureResult] = Field(default_factory=list)
+    config_diff: str = ""
+    trace: Optional[OperationTrace] = None  # phase timings of the call
 
 
 class ReconcilePlan(BaseModel):
@@ -186,6 +265,95 @@ class ReconcilePlan(BaseModel):
     in_sync: list[int] = Field(default_factory=list)
 
 
+class ApplyResult(BaseModel):
+    """Outcome of applying a :class:`ReconcilePlan` to one device (by VNI)."""
+
+    created: list[int] = Field(default_factory=list)
+    updated: list[int] = Field(default_factory=list)
+    deleted: list[int] = Field(default_factory=list)
+    failed: dict[int, str] = Field(default_factory=dict)  # vni -> error
+    skipped: list[int] = Field(default_factory=list)  # not attempted (stopped)
+    config_diffs: list[str] = Field(default_factory=list)  # one per transaction
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed and not self.skipped
+
+
+class DevicePlan(BaseModel):
+    """One device's share of a fabric reconcile."""
+
+    plan: Optional[ReconcilePlan] = None  # None when the device failed
+    error: Optional[str] = None  # read failure or timeout
+    read_seconds: float = 0.0  # connect + read-back + parse
+    plan_seconds: float = 0.0
+    # incremental reconcile: plan reused as-is / VNIs actually re-diffed
+    cached: bool = False
+    rediffed: int = 0
+
+
+class FabricPlan(BaseModel):
+    """Per-device reconcile plans for a fabric, with wall-clock timing."""
+
+    devices: dict[str, DevicePlan] = Field(default_factory=dict)
+    seconds: float = 0.0  # whole sweep
+
+    @property
+    def failed(self) -> dict[str, str]:
+        return {name: dev.error for name, dev in self.devices.items() if dev.error}
+
+
+class FabricAudit(BaseModel):
+    """Read-back of a fabric sweep plus the fabric-wide identifier audit.
+
+    Partial by design: devices that failed or missed their deadline are listed
+    in ``errors`` and the audit covers the devices that answered.
+    """
+
+    circuits: dict[str, list[EvpnCircuit]] = Field(default_factory=dict)
+    errors: dict[str, str] = Field(default_factory=dict)
+    read_seconds: dict[str, float] = Field(default_factory=dict)
+    vni_collisions: dict[int, list[str]] = Field(default_factory=dict)
+    rt_collisions: dict[str, list[str]] = Field(default_factory=dict)
+    single_ended: dict[int, str] = Field(default_factory=dict)  # vni -> device
+    seconds: float = 0.0
+
+
+class LagOperation(BaseModel):
+    """One step of a ``LagManager.apply_many`` batch; ``action`` names the
+    single-LAG method it stands for."""
+
+    action: Literal["create", "add_members", "remove_members"]
+    lag_name: str
+    member_ports: list[str]
+    lacp_mode: Literal["active", "passive", "static"] = "active"
+    description: Optional[str] = None  # create only
+    migrate_vlans: bool = True  # create only
+
+
+class PoolStats(BaseModel):
+    """Usage of one named VNI pool (``PooledRegistry.stats``)."""
+
+    pool: str
+    first_vni: int
+    last_vni: int
+    allocated: int  # assignments inside the range
+    free: int
+    exhaustions: int = 0  # allocations refused for lack of a free VNI
+
+    @property
+    def size(self) -> int:
+        return self.last_vni - self.first_vni + 1
+
+    @property
+    def utilization(self) -> float:
+        return self.allocated / self.size
+
+    @property
+    def exhausted(self) -> bool:
+        return self.free == 0
+
+
 class Config(BaseModel):
     #    hostname: str
     asn: Optional[Asn] = None
@@ -0,0 +1,452 @@
+"""Local VNI allocation service: one authoritative registry, many workers.
+
+Each Prefect worker building its own ``JsonFileRegistry`` means one image per
+process, reloads whenever another worker writes, and no safety across hosts.
+:class:`RegistryServer` instead owns a single ``VniRegistry`` (any backend) and
+serves it over a Unix socket or a localhost TCP port; :class:`RemoteRegistry`
+is the client and is itself a ``VniRegistry``, so callers swap it in unchanged.
+
+Wire format: one JSON object per line. A request is
+``{"id": n, "method": "allocate", "params": {...}}``; the reply carries the same
+``id`` and either ``"result"`` or ``"error": {"type", "message"}``. The server
+answers a connection's requests in order, and the client does not wait for one
+reply before sending the next request, so concurrent callers (threads) and
+:meth:`RemoteRegistry.submit` batches are pipelined over one connection.
+
+The server runs every registry call on one dedicated worker thread, off the
+event loop: slow backend I/O (an fsync, a SQLite write) never stalls reading
+and writing other connections, calls still run one at a time in arrival order,
+and the registry is only ever touched by one thread, so its own locking never
+contends.
+
+Run it with::
+
+    python -m netauto.registry_service --sqlite /var/lib/netauto/vni.db \\
+        --socket /run/netauto/vni.sock
+
+(``--journal DIR`` serves a :class:`~netauto.allocation.JournalRegistry`,
+``--json PATH`` a :class:`~netauto.allocation.JsonFileRegistry`.)
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import socket
+import stat
+import threading
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from .allocation import JournalRegistry, JsonFileRegistry, SqliteRegistry, VniRegistry
+from .allocator import MAX_VNI
+from .exceptions import (
+    ContiguousUnsupported,
+    NetAutoException,
+    RtCollision,
+    SeedConflict,
+    VniExhausted,
+    VniInUse,
+)
+from .models import EvpnCircuit
+
+logger = logging.getLogger(__name__)
+
+_ERRORS = {
+    cls.__name__: cls
+    for cls in (
+        NetAutoException,
+        ContiguousUnsupported,
+        RtCollision,
+        VniExhausted,
+        VniInUse,
+        ValueError,
+    )
+}
+
+
+class RegistryServer:
+    """Serve ``registry`` to :class:`RemoteRegistry` clients.
+
+    Give ``socket_path`` for a Unix socket, otherwise it listens on
+    ``host``:``port`` (``port=0`` picks a free one; see :attr:`address`).
+    Run it blocking with :meth:`serve_forever`, or in a background thread with
+    :meth:`start` / :meth:`stop` (tests, embedding in a worker).
+    """
+
+    METHODS = (
+        "allocate",
+        "allocate_many",
+        "release",
+        "release_many",
+        "get",
+        "assignments",
+        "record",
+        "seed_from_circuits",
+    )
+
+    def __init__(
+        self,
+        registry: VniRegistry,
+        socket_path: str | Path | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.registry = registry
+        self.socket_path = str(socket_path) if socket_path is not None else None
+        self.host = host
+        self.port = port
+        self.address: Any = None  # socket path or (host, port) once listening
+        self._server: asyncio.AbstractServer | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._connections: set[asyncio.Task] = set()
+        self._executor: ThreadPoolExecutor | None = None
+
+    # ------------------------------------------------------------------ #
+    # Request handling
+    # ------------------------------------------------------------------ #
+    def _dispatch(self, method: str, params: dict) -> Any:
+        if method == "vni_range":
+            return [self.registry.base_vni, self.registry.max_vni]
+        if method not in self.METHODS:
+            raise ValueError(f"unknown method: {method}")
+        if method == "allocate_many":
+            params["requests"] = [tuple(r) for r in params["requests"]]
+        elif method == "seed_from_circuits":
+            params["circuits"] = [
+                EvpnCircuit.model_validate(c) for c in params["circuits"]
+            ]
+        return getattr(self.registry, method)(**params)
+
+    def _handle(self, line: bytes) -> bytes:
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            reply = {
+                "id": request_id,
+                "result": self._dispatch(
+                    request["method"], request.get("params") or {}
+                ),
+            }
+        except Exception as e:  # noqa: BLE001 - every error is sent to the client
+            error = {"type": type(e).__name__, "message": str(e)}
+            if isinstance(e, SeedConflict):
+                error["conflicts"] = e.conflicts
+            reply = {"id": request_id, "error": error}
+        return json.dumps(reply).encode() + b"\n"
+
+    async def _client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        loop = asyncio.get_running_loop()
+        try:
+            while line := await reader.readline():
+                reply = await loop.run_in_executor(self._executor, self._handle, line)
+                writer.write(reply)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _shutdown(self) -> None:
+        self._server.close()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+    # ------------------------------------------------------------------ #
+    async def _listen(self) -> None:
+        # one worker: registry calls stay serialised, in the order they arrive
+        self._executor = ThreadPoolExecutor(
+            1, thread_name_prefix="netauto-registry-call"
+        )
+        if self.socket_path is not None:
+            _remove_stale_socket(self.socket_path)
+            self._server = await asyncio.start_unix_server(
+                self._client, path=self.socket_path
+            )
+            self.address = self.socket_path
+        else:
+            self._server = await asyncio.start_server(
+                self._client, host=self.host, port=self.port
+            )
+            self.address = self._server.sockets[0].getsockname()[:2]
+        logger.info("VNI registry service listening on %s", self.address)
+
+    async def _serve(self) -> None:
+        await self._listen()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def serve_forever(self) -> None:
+        try:
+            asyncio.run(self._serve())
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+
+    def start(self) -> Any:
+        """Serve from a daemon thread; returns :attr:`address` once listening."""
+        ready = threading.Event()
+        failed: list[BaseException] = []
+
+        def run() -> None:
+            loop = asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(self._listen())
+            except BaseException as e:  # noqa: BLE001 - re-raised by start()
+                failed.append(e)
+                loop.close()
+                if self._executor is not None:
+                    self._executor.shutdown()
+                ready.set()
+                return
+            self._loop = loop
+            ready.set()
+            loop.run_forever()
+            loop.run_until_complete(self._shutdown())
+            loop.close()
+            self._executor.shutdown()
+
+        self._thread = threading.Thread(
+            target=run, name="netauto-registry", daemon=True
+        )
+        self._thread.start()
+        ready.wait()
+        if failed:
+            self._thread.join()
+            raise failed[0]
+        return self.address
+
+    def stop(self) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Clear a socket left behind by a server that died; refuse to touch
+    anything else, above all a socket another server is still listening on."""
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise NetAutoException(f"{path} exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        Path(path).unlink(missing_ok=True)
+        return
+    finally:
+        probe.close()
+    raise NetAutoException(f"a registry service is already listening on {path}")
+
+
+class RemoteRegistry(VniRegistry):
+    """``VniRegistry`` client for a :class:`RegistryServer`.
+
+    One connection, shared by every thread: each call is written as soon as it
+    is made and matched to its reply by id, so many threads (or one thread
+    using :meth:`submit`) keep the pipe full instead of taking turns.
+    Registry errors come back as the same exception types. ``base_vni`` /
+    ``max_vni`` are the served registry's, fetched on connect, so a remote
+    registry can be a :class:`~netauto.allocation.PooledRegistry` pool.
+    """
+
+    def __init__(
+        self,
+        socket_path: str | Path | None = None,
+        host: str = "127.0.0.1",
+        port: int | None = None,
+        timeout: float | None = 30.0,
+    ):
+        if socket_path is not None:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.connect(str(socket_path))
+        elif port is not None:
+            self._sock = socket.create_connection((host, port))
+        else:
+            raise ValueError("give socket_path or port")
+        self.timeout = timeout
+        self._send_lock = threading.Lock()
+        self._ids = itertools.count()
+        self._pending: dict[int, Future] = {}
+        self._closed = False
+        self._reader = threading.Thread(
+            target=self._read_replies, name="netauto-registry-client", daemon=True
+        )
+        self._reader.start()
+        self.base_vni, self.max_vni = self.call("vni_range")
+
+    def _read_replies(self) -> None:
+        error: BaseException = ConnectionError("registry service closed the connection")
+        try:
+            for line in self._sock.makefile("rb"):
+                try:
+                    reply = json.loads(line)
+                    outcome = (
+                        _remote_error(reply["error"])
+                        if "error" in reply
+                        else reply["result"]
+                    )
+                    future = self._pending.pop(reply["id"], None)
+                except (ValueError, KeyError, TypeError) as e:
+                    # no telling which request this answered: fail everything
+                    # in flight rather than leave a caller waiting forever
+                    logger.warning("Malformed reply from registry service: %r", line)
+                    self._fail_pending(
+                        NetAutoException(f"malformed reply from registry service: {e}")
+                    )
+                    continue
+                if future is None or not future.set_running_or_notify_cancel():
+                    continue  # timed out or cancelled by the caller
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+        except OSError as e:
+            error = e
+        with self._send_lock:
+            self._closed = True
+        self._fail_pending(error)
+
+    def _fail_pending(self, error: BaseException) -> None:
+        while self._pending:
+            try:
+                _, future = self._pending.popitem()
+            except KeyError:  # emptied by a timed-out caller meanwhile
+                break
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+    def submit(self, method: str, **params: Any) -> Future:
+        """Send one request without waiting; the future resolves to its result."""
+        return self._send(method, params)[1]
+
+    def _send(self, method: str, params: dict) -> tuple[int, Future]:
+        future: Future = Future()
+        with self._send_lock:
+            if self._closed:
+                raise ConnectionError("RemoteRegistry is closed")
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            self._sock.sendall(
+                json.dumps(
+                    {"id": request_id, "method": method, "params": params}
+                ).encode()
+                + b"\n"
+            )
+        return request_id, future
+
+    def call(self, method: str, **params: Any) -> Any:
+        request_id, future = self._send(method, params)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # the reply, if it ever comes, is dropped by the reader
+            self._pending.pop(request_id, None)
+            future.cancel()
+            raise
+
+    def close(self) -> None:
+        with self._send_lock:
+            self._closed = True
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        self._reader.join()
+
+    # ------------------------------------------------------------------ #
+    # VniRegistry
+    # ------------------------------------------------------------------ #
+    def allocate(self, service_key: str, rt: str | None = None) -> int:
+        return self.call("allocate", service_key=service_key, rt=rt)
+
+    def allocate_many(
+        self,
+        requests: Iterable[tuple[str, str | None]],
+        contiguous: bool = False,
+    ) -> list[int]:
+        return self.call(
+            "allocate_many", requests=[list(r) for r in requests], contiguous=contiguous
+        )
+
+    def release(self, service_key: str) -> None:
+        self.call("release", service_key=service_key)
+
+    def release_many(self, service_keys: Iterable[str]) -> None:
+        self.call("release_many", service_keys=list(service_keys))
+
+    def get(self, service_key: str) -> int | None:
+        return self.call("get", service_key=service_key)
+
+    def assignments(self) -> dict[str, dict]:
+        return self.call("assignments")
+
+    def record(self, service_key: str, vni: int, rt: str | None) -> None:
+        self.call("record", service_key=service_key, vni=vni, rt=rt)
+
+    def seed_from_circuits(self, circuits: Iterable) -> None:
+        self.call(
+            "seed_from_circuits",
+            circuits=[c.model_dump(mode="json") for c in circuits],
+        )
+
+
+def _remote_error(error: dict) -> Exception:
+    if error["type"] == "SeedConflict":
+        return SeedConflict(error.get("conflicts") or [error["message"]])
+    return _ERRORS.get(error["type"], NetAutoException)(error["message"])
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve a VNI registry to local workers."
+    )
+    store = parser.add_mutually_exclusive_group(required=True)
+    store.add_argument("--json", help="JsonFileRegistry path")
+    store.add_argument("--sqlite", help="SqliteRegistry path")
+    store.add_argument("--journal", help="JournalRegistry directory")
+    parser.add_argument("--base-vni", type=int, default=10000)
+    parser.add_argument("--max-vni", type=int, default=MAX_VNI)
+    listen = parser.add_mutually_exclusive_group(required=True)
+    listen.add_argument("--socket", help="Unix socket path")
+    listen.add_argument("--port", type=int, help="TCP port on --host")
+    parser.add_argument("--host", default="127.0.0.1")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    limits = {"base_vni": args.base_vni, "max_vni": args.max_vni}
+    if args.json:
+        registry = JsonFileRegistry(args.json, **limits)
+    elif args.journal:
+        registry = JournalRegistry(args.journal, **limits)
+    else:
+        registry = SqliteRegistry(args.sqlite, **limits)
+    RegistryServer(
+        registry, socket_path=args.socket, host=args.host, port=args.port or 0
+    ).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
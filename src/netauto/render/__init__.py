@@ -1,7 +1,13 @@
 from .base import DeviceRenderer
+from .cache import RenderCache
 
 # from .arista import AristaDeviceRenderer
 from .ocnos import OcnosDeviceRenderer
 from .arista import AristaDeviceRenderer
 
-__all__ = ["DeviceRenderer", "AristaDeviceRenderer", "OcnosDeviceRenderer"]
+__all__ = [
+    "DeviceRenderer",
+    "AristaDeviceRenderer",
+    "OcnosDeviceRenderer",
+    "RenderCache",
+]
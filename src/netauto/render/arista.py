@@ -1,73 +1,204 @@
-from .base import DeviceRenderer
-from jinja2 import Environment, PackageLoader, select_autoescape
-from typing import List
-from pathlib import Path
-from netauto.models import Interface, Lag, Evpn, Vlan, RoutingInstance, Asn, AzureEvpn
+from .base import DeviceRenderer, _unique_routing_instances
+from .cache import cached_render
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    PackageLoader,
+    Template,
+    select_autoescape,
+)
+from typing import List, Optional, Sequence
+import logging
+import os
+import threading
+from netauto.models import (
+    Asn,
+    AzureEvpn,
+    Evpn,
+    Interface,
+    InterfaceChange,
+    Lag,
+    RoutingInstance,
+    Vlan,
+)
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = "arista_eos"
+
+# One Environment (and one set of compiled templates) per process, shared by
+# every renderer -- and so by every AristaDriver / MockDriver instance. Built on
+# first use; _ENV_LOCK guards the build against concurrent first renders.
+_ENV: Optional[Environment] = None
+_TEMPLATES: dict[str, Template] = {}
+_ENV_LOCK = threading.Lock()
+
+
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    """On-disk cache of compiled template bytecode, so a cold process skips
+    Jinja compilation. ``NETAUTO_JINJA_CACHE`` picks the directory (jinja's
+    per-user temp dir by default); an empty value disables the cache."""
+    directory = os.environ.get("NETAUTO_JINJA_CACHE")
+    if directory == "":
+        return None
+    try:
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return FileSystemBytecodeCache(directory or None)
+    except (OSError, RuntimeError) as e:
+        # read-only or untrusted temp dir: render from source instead
+        logger.warning("jinja bytecode cache disabled: %s", e)
+        return None
+
+
+def _template_env() -> Environment:
+    """The shared Arista template environment, with every template preloaded."""
+    global _ENV
+    if _ENV is None:
+        with _ENV_LOCK:
+            if _ENV is None:
+                env = Environment(
+                    loader=PackageLoader("netauto", "templates"),
+                    autoescape=select_autoescape(),
+                    trim_blocks=True,
+                    lstrip_blocks=True,
+                    bytecode_cache=_bytecode_cache(),
+                    # templates ship inside the package and don't change under a
+                    # running process; skip the per-render up-to-date stat.
+                    auto_reload=False,
+                )
+                for name in env.list_templates(
+                    filter_func=lambda n: n.startswith(f"{TEMPLATE_DIR}/")
+                ):
+                    _TEMPLATES[name] = env.get_template(name)
+                _ENV = env
+    return _ENV
+
+
+def _close_modes(lines: List[str]) -> List[str]:
+    """Append ``exit`` lines so a rendered block ends in global config mode.
+
+    A line opens a sub-mode when the next line is indented deeper than it; each
+    open mode is closed with an ``exit`` at its children's indent as soon as a
+    shallower line (or the end of the block) is reached.
+    """
+    out: List[str] = []
+    open_modes: List[tuple[int, int]] = []  # (mode line indent, child indent)
+
+    def indent(line: str) -> int:
+        return len(line) - len(line.lstrip())
+
+    for i, line in enumerate(lines):
+        depth = indent(line)
+        while open_modes and depth <= open_modes[-1][0]:
+            out.append(" " * open_modes.pop()[1] + "exit")
+        out.append(line)
+        if i + 1 < len(lines) and indent(lines[i + 1]) > depth:
+            open_modes.append((depth, indent(lines[i + 1])))
+    while open_modes:
+        out.append(" " * open_modes.pop()[1] + "exit")
+    return out
 
 
 class AristaDeviceRenderer(DeviceRenderer):
-    """Renders configuration templates for Arista EOS devices."""
+    """Renders configuration templates for Arista EOS devices.
+
+    Construction is cheap: all instances share one process-wide Jinja
+    environment whose templates are compiled (or loaded from the bytecode
+    cache) once, on first use.
+    """
+
+    platform = "arista_eos"
 
     def __init__(self):
-        # Load templates from the package
-        self.env = Environment(
-            loader=PackageLoader("netauto", "templates"),
-            autoescape=select_autoescape(),
-            trim_blocks=True,
-            lstrip_blocks=True,
-        )
+        self.env = _template_env()
 
-    def render_interface(self, interface: Interface) -> List[str]:
-        template_path = f"arista_eos/interface.j2"
-        template = self.env.get_template(template_path)
-        rendered = template.render(interface=interface)
+    def _template(self, template_path: str) -> Template:
+        template = _TEMPLATES.get(template_path)
+        if template is None:
+            template = _TEMPLATES[template_path] = self.env.get_template(template_path)
+        return template
+
+    def _render(self, template_path: str, **context) -> List[str]:
+        """Render a template to its non-blank CLI lines."""
+        rendered = self._template(template_path).render(**context)
         return [line for line in rendered.split("\n") if line.strip()]
 
+    @cached_render
+    def render_interface(self, interface: Interface) -> List[str]:
+        return self._render("arista_eos/interface.j2", interface=interface)
+
+    @cached_render
+    def render_interface_changes(self, changes: Sequence[InterfaceChange]) -> List[str]:
+        """Render bulk interface edits (only the fields each change sets)."""
+        return self._render("arista_eos/interface_changes.j2", changes=changes)
+
+    @cached_render
     def render_interface_delete(self, interface: Interface) -> List[str]:
         pass
 
+    @cached_render
     def render_lag(self, lag: Lag) -> List[str]:
         """Render LAG configuration."""
-        template_path = f"arista_eos/lag.j2"
-        template = self.env.get_template(template_path)
-        rendered = template.render(lag=lag)
-        return [line for line in rendered.split("\n") if line.strip()]
+        return self._render("arista_eos/lag.j2", lag=lag)
 
+    @cached_render
     def render_lag_delete(self, lag: Lag) -> List[str]:
-        template_path = f"arista_eos/lag_delete.j2"
-        template = self.env.get_template(template_path)
-        rendered = template.render(
+        return self._render(
+            "arista_eos/lag_delete.j2",
             lag=lag,
             lag_name=lag.name,
             members=[member.name for member in lag.members],
         )
-        return [line for line in rendered.split("\n") if line.strip()]
 
+    @cached_render
     def render_lag_add_members(self, lag: Lag) -> List[str]:
         """Render channel-group config for new members of an existing LAG."""
-        template = self.env.get_template("arista_eos/lag_add_members.j2")
-        rendered = template.render(lag=lag)
-        return [line for line in rendered.split("\n") if line.strip()]
+        return self._render("arista_eos/lag_add_members.j2", lag=lag)
 
+    @cached_render
     def render_lag_remove_members(self, lag: Lag) -> List[str]:
         """Render config detaching members from a LAG (LAG interface kept)."""
-        template = self.env.get_template("arista_eos/lag_remove_members.j2")
-        rendered = template.render(lag=lag)
-        return [line for line in rendered.split("\n") if line.strip()]
+        return self._render("arista_eos/lag_remove_members.j2", lag=lag)
 
+    @cached_render
     def render_evpn(self, interface: Interface, evpn: Evpn) -> List[str]:
         """Render EVPN service configuration."""
-        template_path = f"arista_eos/evpn.j2"
-        template = self.env.get_template(template_path)
-        rendered = template.render(interface=interface, evpn=evpn)
-        return [line for line in rendered.split("\n") if line.strip()]
+        return self._render("arista_eos/evpn.j2", interface=interface, evpn=evpn)
 
+    @cached_render
     def render_evpn_delete(self, interface: Interface, evpn: Evpn) -> List[str]:
         """Render EVPN service delete configuration."""
-        template_path = f"arista_eos/evpn_delete.j2"
-        template = self.env.get_template(template_path)
-        rendered = template.render(interface=interface, evpn=evpn)
-        return [line for line in rendered.split("\n") if line.strip()]
+        return self._render("arista_eos/evpn_delete.j2", interface=interface, evpn=evpn)
+
+    @cached_render
+    def render_evpn_many(
+        self,
+        circuits: Sequence[
+            tuple[Interface, Evpn | AzureEvpn, Optional[RoutingInstance]]
+        ],
+    ) -> List[str]:
+        """Render several circuits (and their VRFs) as one ordered CLI block.
+
+        Each item is ``(interface, evpn, routing_instance)``; ``evpn`` may be an
+        :class:`AzureEvpn`, and ``routing_instance=None`` skips the VRF. All
+        vlan-aware-bundles come first (each once), then the circuits. Every
+        block is closed back to global config with explicit ``exit`` lines, so
+        a bare ``vlan <id>`` after a ``vlan-aware-bundle`` can't be swallowed as
+        a bundle member -- the sub-mode leak that otherwise forces one config
+        session per block (see ``EvpnManager.create_circuit``).
+        """
+        lines: List[str] = []
+        for asn, vrf in _unique_routing_instances(circuits):
+            lines += _close_modes(self.render_routing_instance(asn, vrf))
+        for interface, evpn, _ in circuits:
+            rendered = (
+                self.render_azure_evpn(interface, evpn)
+                if isinstance(evpn, AzureEvpn)
+                else self.render_evpn(interface, evpn)
+            )
+            lines += _close_modes(rendered)
+        return lines
 
     def _azure_context(self, interface: Interface, azure: AzureEvpn) -> dict:
         """Common template context; resolves the effective S-TAG.
@@ -84,44 +215,38 @@ class AristaDeviceRenderer(DeviceRenderer):
         )
         return {"interface": interface, "azure": azure, "effective_s_tag": effective}
 
+    @cached_render
     def render_azure_evpn(self, interface: Interface, azure: AzureEvpn) -> List[str]:
         """Render an Azure Q-in-Q EVPN circuit endpoint."""
-        template = self.env.get_template("arista_eos/azure_evpn.j2")
-        rendered = template.render(**self._azure_context(interface, azure))
-        return [line for line in rendered.split("\n") if line.strip()]
+        return self._render(
+            "arista_eos/azure_evpn.j2", **self._azure_context(interface, azure)
+        )
 
+    @cached_render
     def render_azure_evpn_delete(
         self, interface: Interface, azure: AzureEvpn
     ) -> List[str]:
         """Render the delete for an Azure Q-in-Q EVPN circuit endpoint."""
-        template = self.env.get_template("arista_eos/azure_evpn_delete.j2")
-        rendered = template.render(**self._azure_context(interface, azure))
-        return [line for line in rendered.split("\n") if line.strip()]
+        return self._render(
+            "arista_eos/azure_evpn_delete.j2", **self._azure_context(interface, azure)
+        )
 
+    @cached_render
     def render_vlan(self, interface: Interface, vlan: Vlan) -> List[str]:
         """Render VLAN configuration."""
-        template_path = f"arista_eos/vlan.j2"
-        template = self.env.get_template(template_path)
-        rendered = template.render(interface=interface, vlan=vlan)
-        return [line for line in rendered.split("\n") if line.strip()]
+        return self._render("arista_eos/vlan.j2", interface=interface, vlan=vlan)
 
+    @cached_render
     def render_vlan_delete(self, interface: Interface, vlan: Vlan) -> List[str]:
         """Render VLAN delete configuration."""
-        template_path = f"arista_eos/vlan_delete.j2"
-        template = self.env.get_template(template_path)
-        rendered = template.render(interface=interface, vlan=vlan)
-        return [line for line in rendered.split("\n") if line.strip()]
+        return self._render("arista_eos/vlan_delete.j2", interface=interface, vlan=vlan)
 
+    @cached_render
     def render_routing_instance(self, asn: Asn, vrf: RoutingInstance) -> List[str]:
-        template_path = f"arista_eos/vrf.j2"
-        template = self.env.get_template(template_path)
-        rendered = template.render(asn=asn, vrf=vrf)
-        return [line for line in rendered.split("\n") if line.strip()]
+        return self._render("arista_eos/vrf.j2", asn=asn, vrf=vrf)
 
+    @cached_render
     def render_routing_instance_delete(
         self, asn: Asn, vrf: RoutingInstance
     ) -> List[str]:
-        template_path = f"arista_eos/vrf_delete.j2"
-        template = self.env.get_template(template_path)
-        rendered = template.render(asn=asn, vrf=vrf)
-        return [line for line in rendered.split("\n") if line.strip()]
+        return self._render("arista_eos/vrf_delete.j2", asn=asn, vrf=vrf)
@@ -1,9 +1,65 @@
 from abc import ABC, abstractmethod
-from typing import List
-from netauto.models import Interface, Vlan, Lag, EvpnService
+from typing import List, Optional
+from netauto.models import (
+    Asn,
+    AzureEvpn,
+    Interface,
+    Vlan,
+    Lag,
+    EvpnService,
+    RoutingInstance,
+)
+from .cache import RenderCache
+
+
+def _unique_routing_instances(circuits) -> List[tuple[Asn, RoutingInstance]]:
+    """The distinct VRFs referenced by a batch, in first-seen order.
+
+    Circuits of the same service share one VRF, so it is rendered once. Two
+    different definitions under one instance name can't both be applied.
+    """
+    seen: dict[str, RoutingInstance] = {}
+    unique: List[tuple[Asn, RoutingInstance]] = []
+    for _, evpn, vrf in circuits:
+        if vrf is None:
+            continue
+        known = seen.get(vrf.instance_name)
+        if known is None:
+            seen[vrf.instance_name] = vrf
+            unique.append((Asn(asn=evpn.asn), vrf))
+        elif known != vrf:
+            raise ValueError(
+                f"conflicting definitions for routing instance {vrf.instance_name!r}"
+            )
+    return unique
+
+
+def _as_list(rendered) -> List[str]:
+    return [rendered] if isinstance(rendered, str) else list(rendered)
 
 
 class DeviceRenderer(ABC):
+    # Platform identifier, matching DeviceDriver.platform; part of the render
+    # cache key so one RenderCache can be shared across vendors.
+    platform: str = ""
+    # Opt-in memoisation of render_* results; see enable_render_cache().
+    render_cache: Optional[RenderCache] = None
+
+    def enable_render_cache(
+        self, maxsize: int = 1024, cache: Optional[RenderCache] = None
+    ) -> RenderCache:
+        """Memoise this renderer's ``render_*`` calls in an LRU cache.
+
+        Pass ``cache`` to share one cache between renderers (e.g. every driver
+        in a reconcile sweep); otherwise a new one holding ``maxsize`` payloads
+        is created. Returns the cache so callers can read ``cache_info()``.
+        """
+        self.render_cache = cache or RenderCache(maxsize=maxsize)
+        return self.render_cache
+
+    def disable_render_cache(self) -> None:
+        self.render_cache = None
+
     @abstractmethod
     def render_interface(self, interface: Interface) -> List[str]:
         """Render interface configuration commands for the given platform."""
@@ -55,3 +111,36 @@ class DeviceRenderer(ABC):
     def render_evpn_delete(self, svc: EvpnService) -> List[str]:
         """Render EVPN service configuration commands for the given platform."""
         pass
+
+    def render_interface_changes(self, changes) -> List[str]:
+        """Render several :class:`InterfaceChange` edits — only the fields each
+        one sets — as one payload for a single transaction.
+
+        There is no generic way to touch only some fields of an interface, so
+        renderers that back ``InterfaceEditor`` override this (Arista and
+        OcNOS do); the rest stay instantiable and raise here.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not render partial interface edits"
+        )
+
+    def render_evpn_many(self, circuits) -> List[str]:
+        """Render many ``(interface, evpn, routing_instance)`` circuits, VRFs
+        included, as one payload that can be pushed in a single transaction.
+
+        This default concatenates each VRF's ``render_routing_instance`` (once
+        per VRF, first) and each circuit's ``render_evpn`` /
+        ``render_azure_evpn`` payload. Arista and OcNOS override it to build
+        one coalesced block.
+        """
+        payload: List[str] = []
+        for asn, vrf in _unique_routing_instances(circuits):
+            payload += _as_list(self.render_routing_instance(asn, vrf))
+        for interface, evpn, _ in circuits:
+            rendered = (
+                self.render_azure_evpn(interface, evpn)
+                if isinstance(evpn, AzureEvpn)
+                else self.render_evpn(interface, evpn)
+            )
+            payload += _as_list(rendered)
+        return payload
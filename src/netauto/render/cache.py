@@ -0,0 +1,126 @@
+"""Opt-in memoisation of rendered payloads.
+
+A reconcile loop re-renders the same intended circuits on every pass. Rendering
+is a pure function of the models passed in, so a renderer with a
+:class:`RenderCache` attached (``renderer.enable_render_cache()``) returns the
+stored payload for a repeat call instead of running Jinja / ElementTree again.
+
+Entries are keyed by ``(method, platform, canonical model hash)``: the
+arguments are dumped to canonical JSON (model class name + field values), so two
+equal models hit the same entry regardless of object identity.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from pydantic import BaseModel
+
+from ..timing import phase
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+def _canonical(value: Any) -> Any:
+    """A JSON-able, type-tagged view of a render argument."""
+    if isinstance(value, BaseModel):
+        # Interface/Lag and Evpn/AzureEvpn share fields; tag the class too.
+        return [type(value).__name__, value.model_dump(mode="json")]
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    return value
+
+
+def model_key(args: tuple, kwargs: dict) -> str:
+    """Hash of the canonical form of a call's arguments."""
+    payload = json.dumps(
+        [_canonical(args), _canonical(kwargs)], sort_keys=True, default=repr
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class RenderCache:
+    """Bounded, thread-safe LRU of rendered payloads with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_render(self, key: tuple, render: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy(self._entries[key])
+            self.misses += 1
+
+        # Render outside the lock; a concurrent miss on the same key just
+        # renders twice and stores the same value.
+        value = render()
+        with self._lock:
+            self._entries[key] = _copy(value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self.hits,
+                self.misses,
+                self.evictions,
+                self.maxsize,
+                len(self._entries),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+def _copy(value: Any) -> Any:
+    # Arista renders are line lists the caller may extend; never hand out the
+    # stored list itself. OcNOS payloads are immutable strings.
+    return list(value) if isinstance(value, list) else value
+
+
+def cached_render(method: Callable) -> Callable:
+    """Serve ``method`` from the renderer's :class:`RenderCache`, if enabled.
+
+    Every call is timed as the ``render`` phase of the current operation trace
+    (see :mod:`netauto.timing`), cache hits included.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with phase("render"):
+            cache = self.render_cache
+            if cache is None:
+                return method(self, *args, **kwargs)
+            key = (method.__name__, self.platform, model_key(args, kwargs))
+            return cache.get_or_render(key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
@@ -1,11 +1,22 @@
-from .base import DeviceRenderer
+from .base import DeviceRenderer, _unique_routing_instances
+from .cache import cached_render
 import xml.etree.ElementTree as ET
-import xml.dom.minidom
-from typing import List, Optional
-from netauto.models import Interface, Lag, Vlan, Evpn, Asn, RoutingInstance, AzureEvpn
+from typing import List, Optional, Sequence
+from netauto.models import (
+    Asn,
+    AzureEvpn,
+    Evpn,
+    Interface,
+    InterfaceChange,
+    Lag,
+    RoutingInstance,
+    Vlan,
+)
 
 
 class OcnosDeviceRenderer(DeviceRenderer):
+    platform = "ipinfusion_ocnos"
+
     NS = {
         "nc": "urn:ietf:params:xml:ns:netconf:base:1.0",
         "if": "http://www.ipinfusion.com/yang/ocnos/ipi-interface",
@@ -29,11 +40,17 @@ class OcnosDeviceRenderer(DeviceRenderer):
         return f"{{{self.NS[prefix]}}}{tag}"
 
     def _tostring(self, element: ET.Element) -> str:
-        """Converts an Element to a string."""
+        """Serialise a finished Element tree to the pretty-printed payload.
+
+        This is the only place a document becomes text: the ``_append_*``
+        helpers compose on Element trees and ``render_*`` serialises once, in
+        the same layout minidom's ``toprettyxml`` produced (no parse/re-dump).
+        """
+        ET.indent(element, space="  ")
         raw = ET.tostring(element, encoding="unicode")
-        # this is not the most efficient approach ;)
-        parsed = xml.dom.minidom.parseString(raw)
-        return parsed.toprettyxml(indent="  ")
+        # ElementTree writes empty elements as "<a />"; minidom wrote "<a/>".
+        # Text and attribute values are escaped, so " />" only closes a tag.
+        return '<?xml version="1.0" ?>\n' + raw.replace(" />", "/>") + "\n"
 
     def _config_root(self) -> ET.Element:
         """Create the root <config> element for OcNOS XML configuration."""
@@ -77,6 +94,30 @@ class OcnosDeviceRenderer(DeviceRenderer):
         create_parent_agg: bool = False,
         skip_interfaces=False,
     ) -> ET.Element:
+        self._interface_element(
+            root,
+            interface,
+            port_channel_id=port_channel_id,
+            lacp_mode=lacp_mode,
+            create_parent_agg=create_parent_agg,
+            skip_interfaces=skip_interfaces,
+        )
+        return root
+
+    def _interface_element(
+        self,
+        root: ET.Element,
+        interface: Interface | Lag,
+        port_channel_id: int | None = None,
+        lacp_mode: str | None = None,
+        create_parent_agg: bool = False,
+        skip_interfaces=False,
+    ) -> ET.Element:
+        """Build one ``<if:interface>`` under ``root`` and return *it*.
+
+        Callers that decorate the entry further (sub-interface encapsulation)
+        keep the handle instead of searching the growing tree for it again.
+        """
         if not skip_interfaces:
             interfaces = ET.SubElement(root, self._tag("if", "interfaces"))
             intf = ET.SubElement(interfaces, self._tag("if", "interface"))
@@ -114,8 +155,9 @@ class OcnosDeviceRenderer(DeviceRenderer):
             )
             ET.SubElement(agg_config, self._tag("ifagg", "lacp-mode")).text = lacp_mode
 
-        return root
+        return intf
 
+    @cached_render
     def render_interface(self, interface) -> List[str]:
         """Render interface configuration."""
         # Implementation for OcNOS interface rendering
@@ -123,10 +165,46 @@ class OcnosDeviceRenderer(DeviceRenderer):
         if_config = self._append_interface(config, interface)
         return self._tostring(if_config)
 
+    @cached_render
+    def render_interface_changes(self, changes: Sequence[InterfaceChange]) -> str:
+        """Render bulk interface edits as one ``<if:interfaces>`` document.
+
+        Only the fields each change sets are emitted. Clearing a description
+        (``""``) and enabling a port remove the leaf with ``operation="remove"``,
+        which is a no-op when it is already absent.
+        """
+        config = self._config_root()
+        interfaces = ET.SubElement(config, self._tag("if", "interfaces"))
+        for change in changes:
+            intf = ET.SubElement(interfaces, self._tag("if", "interface"))
+            ET.SubElement(intf, self._tag("if", "name")).text = change.name
+            intf_config = ET.SubElement(intf, self._tag("if", "config"))
+            if change.mtu is not None:
+                ET.SubElement(intf_config, self._tag("if", "mtu")).text = str(
+                    change.mtu
+                )
+            if change.description:
+                ET.SubElement(
+                    intf_config, self._tag("if", "description")
+                ).text = change.description
+            elif change.description == "":
+                ET.SubElement(intf_config, self._tag("if", "description")).set(
+                    self._tag("nc", "operation"), "remove"
+                )
+            if change.enabled is False:
+                ET.SubElement(intf_config, self._tag("if", "shutdown"))
+            elif change.enabled:
+                ET.SubElement(intf_config, self._tag("if", "shutdown")).set(
+                    self._tag("nc", "operation"), "remove"
+                )
+        return self._tostring(config)
+
+    @cached_render
     def render_interface_delete(self, interface: Interface) -> List[str]:
         """Render interface configuration commands for the given platform."""
         pass
 
+    @cached_render
     def render_lag(
         self, lag: Lag, create_parent_agg: bool = False
     ) -> List[str]:
@@ -159,6 +237,7 @@ class OcnosDeviceRenderer(DeviceRenderer):
 
         return self._tostring(config)
 
+    @cached_render
     def render_lag_delete(self, lag: Lag) -> str:
         """Render an OcNOS edit-config payload that tears a LAG apart.
 
@@ -182,6 +261,7 @@ class OcnosDeviceRenderer(DeviceRenderer):
 
         return self._tostring(config)
 
+    @cached_render
     def render_lag_add_members(self, lag: Lag) -> str:
         """Render an edit-config that binds new members to an existing po."""
         port_channel_id = int(lag.name.replace("po", ""))
@@ -201,6 +281,7 @@ class OcnosDeviceRenderer(DeviceRenderer):
             )
         return self._tostring(config)
 
+    @cached_render
     def render_lag_remove_members(self, lag: Lag) -> str:
         """Render an edit-config that detaches members from a po (po kept).
 
@@ -225,7 +306,7 @@ class OcnosDeviceRenderer(DeviceRenderer):
         evpn: Optional[Evpn] = None,
         include_rewrite: bool = True,
     ) -> ET.Element:
-        interfaces = self._append_interface(
+        intf = self._interface_element(
             root,
             Interface(
                 name=f"{interface.name}.{vlan.vlan_id}",
@@ -233,10 +314,6 @@ class OcnosDeviceRenderer(DeviceRenderer):
                 description=vlan.name,
             ),
         )
-
-        intf = interfaces.find(
-            f".//if:interface[if:name='{interface.name}.{vlan.vlan_id}']", self.NS
-        )
         intf_config = intf.find(self._tag("if", "config"))
         ET.SubElement(
             intf_config, self._tag("if", "name")
@@ -294,6 +371,7 @@ class OcnosDeviceRenderer(DeviceRenderer):
 
         return root
 
+    @cached_render
     def render_vlan(
         self, interface: Interface, vlan: Vlan, from_azure: Optional[bool] = False
     ) -> List[str]:
@@ -392,6 +470,7 @@ class OcnosDeviceRenderer(DeviceRenderer):
 
     # this should only be needed if it didnt exist,
     # naturally in my testing it didnt exist
+    @cached_render
     def render_evpn_mpls_tenant(self, evpn: Evpn) -> str:
         config = self._config_root()
         config = self._append_evpn_mpls_tenant(config, evpn)
@@ -408,12 +487,14 @@ class OcnosDeviceRenderer(DeviceRenderer):
         return root
 
     # mostly helpers due to exclusivity between evpn mpls and vxlan stuff
+    @cached_render
     def render_evpn_mpls_enable(self) -> str:
         config = self._config_root()
         config = self._append_evpn_mpls_global(config, delete=False)
         return self._tostring(config)
 
     # mostly helpers due to exclusivity between evpn mpls and vxlan stuff
+    @cached_render
     def render_evpn_mpls_disable(self) -> str:
         config = self._config_root()
         config = self._append_evpn_mpls_global(config, delete=True)
@@ -433,6 +514,7 @@ class OcnosDeviceRenderer(DeviceRenderer):
 
         return root
 
+    @cached_render
     def render_evpn_mpls_tenant_delete(self, evpn: Evpn) -> str:
         config = self._config_root()
         config = self._append_evpn_mpls_tenant_delete(config, evpn)
@@ -460,6 +542,7 @@ class OcnosDeviceRenderer(DeviceRenderer):
 
     # this should only be needed if it didnt exist,
     # naturally in my testing it didnt exist
+    @cached_render
     def render_ethernet_vpn_vrf_service(
         self, evpn: Evpn, service_type: str = "vlan-aware-bundle"
     ) -> str:
@@ -477,6 +560,7 @@ class OcnosDeviceRenderer(DeviceRenderer):
         ET.SubElement(vrf, self._tag("ethvpn", "vrf-name")).text = vrf_name
         return root
 
+    @cached_render
     def render_ethernet_vpn_vrf_service_delete(self, vrf_name: str) -> str:
         config = self._config_root()
         config = self._append_ethernet_vpn_vrf_service_delete(config, vrf_name)
@@ -528,6 +612,7 @@ class OcnosDeviceRenderer(DeviceRenderer):
 
     # this should only be needed if it didnt exist,
     # naturally in my testing it didnt exist
+    @cached_render
     def render_ethernet_vpn_access(
         self,
         interface_name: str,
@@ -567,6 +652,7 @@ class OcnosDeviceRenderer(DeviceRenderer):
         #        ).text = "access-if-evpn"
         return root
 
+    @cached_render
     def render_ethernet_vpn_access_delete(self, interface_name: str) -> str:
         config = self._config_root()
         config = self._append_ethernet_vpn_access_delete(config, interface_name)
@@ -584,6 +670,7 @@ class OcnosDeviceRenderer(DeviceRenderer):
         ).text = f"{interface.name}.{vlan.vlan_id}"
         return config
 
+    @cached_render
     def render_vlan_delete(self, interface: Interface, vlan: Vlan) -> List[str]:
         """Render LAG configuration commands for the given platform."""
         config = self._config_root()
@@ -602,12 +689,14 @@ class OcnosDeviceRenderer(DeviceRenderer):
         return root
 
     # mostly helpers due to exclusivity between evpn mpls and vxlan stuff
+    @cached_render
     def render_vxlan_enable(self) -> str:
         config = self._config_root()
         config = self._append_vxlan_global(config, delete=False)
         return self._tostring(config)
 
     # mostly helpers due to exclusivity between evpn mpls and vxlan stuff
+    @cached_render
     def render_vxlan_disable(self) -> str:
         config = self._config_root()
         config = self._append_vxlan_global(config, delete=True)
@@ -685,6 +774,7 @@ class OcnosDeviceRenderer(DeviceRenderer):
 
         return root
 
+    @cached_render
     def render_evpn(
         self, interface: Interface, evpn: Evpn, from_azure: Optional[bool] = None
     ) -> str:  # ty is really unhappy about this we should look at a signature clean up once functions verified
@@ -696,39 +786,25 @@ class OcnosDeviceRenderer(DeviceRenderer):
             root = self._config_root()
             is_cni = interface.arp_cache is False or interface.nd_cache is False
 
-            # will this always evaluate true\/
+            # Every part is appended to the same tree and serialised once.
             if is_cni:
-                interface_xml = self._tostring(
-                    self._append_azure_cni_interface(
-                        self._config_root(), interface, evpn
-                    )
-                )
+                self._append_azure_cni_interface(root, interface, evpn)
             else:
-                interface_xml = self._tostring(
-                    self._append_azure_customer_interface(
-                        self._config_root(), interface, evpn
-                    )
-                )
-
-            azure_xml = [
-                interface_xml,
-                self.render_evpn_mpls_tenant(evpn),
-                self.render_ethernet_vpn_vrf_service(evpn),
-            ]
-
-            for xml in azure_xml:
-                parsed = ET.fromstring(xml)
-                for child in list(parsed):
-                    root.append(child)
-
+                self._append_azure_customer_interface(root, interface, evpn)
+            self._append_evpn_mpls_tenant(root, evpn)
+            self._append_ethernet_vpn_vrf_service(root, evpn)
             return self._tostring(root)
 
-        config = self._config_root()
+        config = self._append_evpn(self._config_root(), interface, evpn)
+        return self._tostring(config)
+
+    def _append_evpn(
+        self, config: ET.Element, interface: Interface, evpn: Evpn
+    ) -> ET.Element:
         config = self._append_vlan(
             config,
             interface,
             evpn.vlan,
-            from_azure=from_azure,
             evpn=evpn,
             # Basic single-tag EVPN circuit: plain `encapsulation dot1q`, no
             # tag rewrite (QinQ/Azure adds rewrite via the from_azure path).
@@ -737,10 +813,36 @@ class OcnosDeviceRenderer(DeviceRenderer):
         config = self._append_ethernet_vpn_access(
             config, f"{interface.name}.{evpn.vlan.vlan_id}", evpn.vni
         )
-        config = self._append_vxlan_tenant(config, evpn.vni, evpn.description)
+        return self._append_vxlan_tenant(config, evpn.vni, evpn.description)
 
+    @cached_render
+    def render_evpn_many(
+        self,
+        circuits: Sequence[
+            tuple[Interface, Evpn | AzureEvpn, Optional[RoutingInstance]]
+        ],
+    ) -> str:
+        """Render several circuits (and their mac-vrfs) as one ``<config>``.
+
+        Each item is ``(interface, evpn, routing_instance)``; ``evpn`` may be an
+        :class:`AzureEvpn`, and ``routing_instance=None`` skips the VRF. The
+        network-instances come first in document order (each once) so the
+        mac-vrfs precede the circuits that reference them, then every circuit
+        is appended to the same tree and the containers are coalesced -- one
+        edit-config, one commit for the whole batch.
+        """
+        config = self._config_root()
+        for asn, vrf in _unique_routing_instances(circuits):
+            self._append_vrf(config, asn, vrf)
+        for interface, evpn, _ in circuits:
+            if isinstance(evpn, AzureEvpn):
+                self._append_azure_evpn(config, interface, evpn)
+            else:
+                self._append_evpn(config, interface, evpn)
+        self._coalesce_evpn_containers(config)
         return self._tostring(config)
 
+    @cached_render
     def render_azure_evpn(self, interface: Interface, azure: AzureEvpn) -> str:
         """Render an Azure Q-in-Q EVPN circuit endpoint (VXLAN, NETCONF).
 
@@ -750,8 +852,13 @@ class OcnosDeviceRenderer(DeviceRenderer):
         S-TAG and disables arp/nd caching. ``_append_vlan`` already emits the
         push (when the Vlan carries an s_tag) / pop (no s_tag) / plain encap.
         """
-        config = self._config_root()
+        config = self._append_azure_evpn(self._config_root(), interface, azure)
+        self._coalesce_evpn_containers(config)
+        return self._tostring(config)
 
+    def _append_azure_evpn(
+        self, config: ET.Element, interface: Interface, azure: AzureEvpn
+    ) -> ET.Element:
         if azure.role == "customer":
             for c_tag in azure.c_tags:
                 sub_vlan = Vlan(
@@ -778,19 +885,29 @@ class OcnosDeviceRenderer(DeviceRenderer):
                 include_nd_cache_disable=azure.rewrite,
             )
 
-        config = self._append_vxlan_tenant(config, azure.vni, azure.description)
-        self._coalesce_evpn_containers(config)
-        return self._tostring(config)
+        return self._append_vxlan_tenant(config, azure.vni, azure.description)
 
     def _coalesce_evpn_containers(self, config: ET.Element) -> None:
         """Fold the per-sub-interface containers into one each (see
-        _merge_containers). Multiple C-TAGs would otherwise emit a separate
-        <if:interfaces>/<ethvpn:evpn> per tag."""
-        self._merge_containers(config, ("if", "interfaces"), ("ethvpn", "evpn"))
-        evpn = config.find(self._tag("ethvpn", "evpn"))
-        if evpn is not None:
-            self._merge_containers(evpn, ("ethvpn", "interfaces"))
-
+        _merge_containers). Multiple C-TAGs -- or several circuits in one
+        render_evpn_many batch -- would otherwise emit a separate
+        <if:interfaces>/<ethvpn:evpn>/<vxlan:vxlan> per entry."""
+        self._merge_containers(
+            config,
+            ("netinst", "network-instances"),
+            ("if", "interfaces"),
+            ("ethvpn", "evpn"),
+            ("vxlan", "vxlan"),
+        )
+        for container, inner in (
+            (("ethvpn", "evpn"), ("ethvpn", "interfaces")),
+            (("vxlan", "vxlan"), ("vxlan", "vxlan-tenants")),
+        ):
+            found = config.find(self._tag(*container))
+            if found is not None:
+                self._merge_containers(found, inner)
+
+    @cached_render
     def render_azure_evpn_delete(
         self, interface: Interface, azure: AzureEvpn
     ) -> str:
@@ -818,7 +935,7 @@ class OcnosDeviceRenderer(DeviceRenderer):
         if evpn.vlan.s_tag is None:
             raise ValueError("Azure CNI rendering requires vlan.s_tag")
 
-        root = self._append_interface(
+        intf = self._interface_element(
             root,
             Interface(
                 name=f"{interface.name}.{evpn.vlan.s_tag}",
@@ -826,10 +943,6 @@ class OcnosDeviceRenderer(DeviceRenderer):
                 description=evpn.vlan.name,
             ),
         )
-
-        intf = root.find(
-            f".//if:interface[if:name='{interface.name}.{evpn.vlan.s_tag}']", self.NS
-        )
         intf_config = intf.find(self._tag("if", "config"))
         ET.SubElement(
             intf_config, self._tag("if", "name")
@@ -878,7 +991,7 @@ class OcnosDeviceRenderer(DeviceRenderer):
         if evpn.vlan.s_tag is None:
             raise ValueError("Azure customer rendering requires vlan.s_tag")
 
-        root = self._append_interface(
+        intf = self._interface_element(
             root,
             Interface(
                 name=f"{interface.name}.{evpn.vlan.vlan_id}",
@@ -886,10 +999,6 @@ class OcnosDeviceRenderer(DeviceRenderer):
                 description=evpn.vlan.name,
             ),
         )
-
-        intf = root.find(
-            f".//if:interface[if:name='{interface.name}.{evpn.vlan.vlan_id}']", self.NS
-        )
         intf_config = intf.find(self._tag("if", "config"))
         ET.SubElement(
             intf_config, self._tag("if", "name")
@@ -975,6 +1084,7 @@ class OcnosDeviceRenderer(DeviceRenderer):
 
         return root
 
+    @cached_render
     def render_evpn_delete(
         self, interface: Interface, evpn: Evpn, from_azure: Optional[bool] = None
     ) -> List[str]:
@@ -997,17 +1107,11 @@ class OcnosDeviceRenderer(DeviceRenderer):
                 interface_name = f"{interface.name}.{evpn.vlan.vlan_id}"
                 vlan_for_delete = evpn.vlan
 
-            azure_delete_xml = [
-                self.render_ethernet_vpn_access_delete(interface_name),
-                self.render_evpn_mpls_tenant_delete(evpn),
-                self.render_ethernet_vpn_vrf_service_delete(evpn.description),
-                # self._tostring(self._append_vrf_delete(self._config_root(), evpn)),
-                self.render_vlan_delete(interface, vlan_for_delete),
-            ]
-            for xml in azure_delete_xml:
-                parsed = ET.fromstring(xml)
-                for child in list(parsed):
-                    root.append(child)
+            self._append_ethernet_vpn_access_delete(root, interface_name)
+            self._append_evpn_mpls_tenant_delete(root, evpn)
+            self._append_ethernet_vpn_vrf_service_delete(root, evpn.description)
+            # self._append_vrf_delete(root, asn, vrf)
+            self._append_vlan_delete(root, interface, vlan_for_delete)
             return self._tostring(root)
 
         config = self._config_root()
@@ -1020,6 +1124,7 @@ class OcnosDeviceRenderer(DeviceRenderer):
 
         return self._tostring(config)
 
+    @cached_render
     def render_routing_instance(self, asn: Asn, vrf: RoutingInstance) -> List[str]:
         """Render routing instance configuration commands for the given platform."""
 
@@ -1028,6 +1133,7 @@ class OcnosDeviceRenderer(DeviceRenderer):
 
         return self._tostring(config)
 
+    @cached_render
     def render_routing_instance_delete(
         self, asn: Asn, vrf: RoutingInstance
     ) -> List[str]:
@@ -0,0 +1,168 @@
+"""Synthetic fabrics of :class:`~netauto.drivers.SimulatedDevice` switches.
+
+:func:`build_fabric` spins up a fleet of simulated leaves with a realistic
+circuit load — every service a p2p circuit with a fabric-unique VNI and RT and
+an endpoint on two different devices — and records the intended circuits per
+device. The result plugs straight into the fleet tooling::
+
+    fabric = build_fabric(devices=300, circuits=(50, 400), latency=(0.02, 0.2))
+    FabricAuditor(fabric.devices).audit()
+    FabricReconciler(fabric.devices, fabric.intended).plan()
+
+Each device is seeded the way a real one would be: its ports and circuits are
+rendered with the platform's own renderer and pushed to it, so what the tooling
+reads back is exactly what the managers would have configured.
+"""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Sequence
+
+from .drivers import SimulatedDevice
+from .models import Evpn, EvpnCircuit, Interface, RoutingInstance, Vlan
+
+ASN = 65001
+RT_ASN = 37195
+BASE_VNI = 10000
+FIRST_VLAN = 100
+MAX_CIRCUITS = 4094 - FIRST_VLAN + 1  # per device: one VLAN each
+
+
+class SimulatedFabric:
+    """``devices`` maps a name to its :class:`SimulatedDevice`; ``intended``
+    maps the same names to the circuits each one carries (and should)."""
+
+    def __init__(
+        self,
+        devices: dict[str, SimulatedDevice],
+        intended: dict[str, list[EvpnCircuit]],
+    ):
+        self.devices = devices
+        self.intended = intended
+
+    @property
+    def circuit_count(self) -> int:
+        return sum(len(c) for c in self.intended.values())
+
+    def drift(self, fraction: float, seed: int = 0) -> dict[str, list[int]]:
+        """Delete ``fraction`` of every device's circuits behind the intent's
+        back (as an out-of-band change would); returns the removed VNIs per
+        device, which a reconcile should then report ``to_create``."""
+        rng = random.Random(seed)
+        removed: dict[str, list[int]] = {}
+        for name, device in self.devices.items():
+            circuits = self.intended[name]
+            picked = rng.sample(circuits, int(len(circuits) * fraction))
+            if not picked:
+                continue
+            payload: list[str] = []
+            for c in picked:
+                rendered = device.renderer.render_evpn_delete(
+                    Interface(name=c.interface), c.evpn
+                )
+                payload += rendered if isinstance(rendered, list) else [rendered]
+            device.push_config(payload)
+            removed[name] = sorted(c.evpn.vni for c in picked)
+        return removed
+
+
+def _ports(platform: str, count: int) -> list[str]:
+    prefix = "eth" if platform == "ipinfusion_ocnos" else "Ethernet"
+    return [f"{prefix}{p}" for p in range(1, count + 1)]
+
+
+def _endpoints(
+    load: dict[str, int], rng: random.Random
+) -> list[tuple[str, str | None]]:
+    """Pair circuit slots into services across two distinct devices; a slot
+    left without a partner becomes a single-ended service."""
+    slots = [name for name, count in load.items() for _ in range(count)]
+    rng.shuffle(slots)
+    pairs: list[tuple[str, str | None]] = []
+    while slots:
+        a = slots.pop()
+        partner = next(
+            (i for i in range(len(slots) - 1, -1, -1) if slots[i] != a), None
+        )
+        pairs.append((a, None if partner is None else slots.pop(partner)))
+    return pairs
+
+
+def build_fabric(
+    devices: int = 100,
+    circuits: tuple[int, int] = (20, 200),
+    platforms: Sequence[str] = ("arista_eos", "ipinfusion_ocnos"),
+    ports: int = 48,
+    latency: float | tuple[float, float] = 0.0,
+    push_latency: float | tuple[float, float] | None = None,
+    seed: int = 0,
+) -> SimulatedFabric:
+    """Build ``devices`` simulated leaves, each carrying between ``circuits[0]``
+    and ``circuits[1]`` circuit endpoints spread over ``ports`` ports.
+
+    Platforms are assigned round-robin from ``platforms``. Services are keyed
+    ``SO<number>`` with VNI ``BASE_VNI + number``, RD ``ASN:number`` and RT
+    ``RT_ASN:number``; VLANs are allocated per device from ``FIRST_VLAN``.
+    ``latency`` / ``push_latency`` are passed to every device (after seeding, so
+    building stays fast). Deterministic for a given ``seed``.
+    """
+    low, high = circuits
+    if not 0 <= low <= high <= MAX_CIRCUITS:
+        raise ValueError(f"circuits must satisfy 0 <= low <= high <= {MAX_CIRCUITS}")
+    rng = random.Random(seed)
+    names = [f"leaf{i + 1:03d}" for i in range(devices)]
+    load = {name: rng.randint(low, high) for name in names}
+
+    fleet: dict[str, SimulatedDevice] = {}
+    intended: dict[str, list[EvpnCircuit]] = {name: [] for name in names}
+    for i, name in enumerate(names):
+        fleet[name] = SimulatedDevice(
+            name, platforms[i % len(platforms)], seed=seed + i
+        )
+
+    port_names = {name: _ports(d.platform, ports) for name, d in fleet.items()}
+    next_vlan = {name: FIRST_VLAN for name in names}
+    for number, ends in enumerate(_endpoints(load, rng), start=1):
+        key = f"SO{number}"
+        for name in filter(None, ends):
+            vlan_id = next_vlan[name]
+            next_vlan[name] += 1
+            intended[name].append(
+                EvpnCircuit(
+                    interface=port_names[name][vlan_id % ports],
+                    evpn=Evpn(
+                        vlan=Vlan(vlan_id=vlan_id, name=key),
+                        asn=ASN,
+                        vni=BASE_VNI + number,
+                        description=key,
+                    ),
+                    routing_instance=RoutingInstance(
+                        instance_name=key,
+                        instance_type="mac-vrf",
+                        rd=f"{ASN}:{number}",
+                        rt_rd=f"{RT_ASN}:{number}",
+                    ),
+                )
+            )
+
+    for name, device in fleet.items():
+        renderer = device.renderer
+        payload: list[str] = []
+        for port in port_names[name]:
+            rendered = renderer.render_interface(
+                Interface(name=port, description=f"{name} {port}", mtu=9214)
+            )
+            payload += rendered if isinstance(rendered, list) else [rendered]
+        if intended[name]:
+            rendered = renderer.render_evpn_many(
+                [
+                    (Interface(name=c.interface), c.evpn, c.routing_instance)
+                    for c in intended[name]
+                ]
+            )
+            payload += rendered if isinstance(rendered, list) else [rendered]
+        device.push_config(payload)
+        device.latency = latency
+        device.push_latency = latency if push_latency is None else push_latency
+    return SimulatedFabric(fleet, intended)
@@ -0,0 +1,150 @@
+"""Per-operation phase timing for the managers.
+
+A slow provisioning call can spend its time in inventory reads, ``get_vnis``,
+rendering, the edit RPC, the diff fetch, the commit or the startup save. Each
+manager operation (``create_circuit``, ``ensure_circuit``, ``apply_many``, …)
+runs inside :func:`traced`, which collects an
+:class:`~netauto.models.OperationTrace`; :func:`phase` blocks anywhere below it
+— every driver RPC, every ``render_*`` call, the steps inside ``push_config`` —
+add a timed entry to it. Outside a traced operation :func:`phase` is a no-op,
+so the instrumentation costs nothing when nobody is looking.
+
+The finished trace is on the result object (``EnsureResult.trace``,
+``EnsureBatchResult.trace``, …) or, for methods that return a diff string, on
+the manager as ``last_trace``. It is the only timing the managers keep: a step
+worth reporting on its own gets a :func:`phase` block, not a stopwatch of its
+own. Hooks
+registered with :func:`add_trace_hook` receive every finished top-level trace,
+e.g. to ship slow operations to a log::
+
+    def log_slow(trace):
+        if trace.total > 5:
+            logger.warning("%s on %s: %s", trace.operation, trace.device,
+                           trace.by_phase())
+
+    timing.add_trace_hook(log_slow)
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .models import OperationTrace, PhaseTiming
+
+logger = logging.getLogger(__name__)
+
+TraceHook = Callable[[OperationTrace], None]
+
+_hooks: list[TraceHook] = []
+
+
+class _Recorder:
+    def __init__(self, trace: OperationTrace):
+        self.trace = trace
+        self.stack: list[str] = []
+
+
+_current: ContextVar[_Recorder | None] = ContextVar("netauto_trace", default=None)
+
+
+def add_trace_hook(hook: TraceHook) -> None:
+    """Call ``hook(trace)`` whenever a top-level operation finishes."""
+    _hooks.append(hook)
+
+
+def remove_trace_hook(hook: TraceHook) -> None:
+    _hooks.remove(hook)
+
+
+def current_trace() -> OperationTrace | None:
+    """The trace being collected in this thread / task, if any."""
+    recorder = _current.get()
+    return recorder.trace if recorder else None
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time the enclosed block as ``name`` within the current trace.
+
+    Nested phases are recorded under their parent (``push_config/edit``); a
+    phase re-entered under itself (a renderer calling another ``render_*``)
+    is counted once.
+    """
+    recorder = _current.get()
+    if recorder is None or (recorder.stack and recorder.stack[-1] == name):
+        yield
+        return
+    recorder.stack.append(name)
+    path = "/".join(recorder.stack)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.trace.phases.append(
+            PhaseTiming(name=path, seconds=time.perf_counter() - started)
+        )
+        recorder.stack.pop()
+
+
+@contextmanager
+def traced(operation: str, device: str | None = None) -> Iterator[OperationTrace]:
+    """Collect a trace for ``operation``.
+
+    Inside another traced operation (``ensure_circuit`` calling
+    ``create_circuit``) this is just a :func:`phase` of the outer one and
+    yields the outer trace; only the top-level trace is finished and handed to
+    the hooks.
+    """
+    outer = _current.get()
+    if outer is not None:
+        with phase(operation):
+            yield outer.trace
+        return
+    recorder = _Recorder(OperationTrace(operation=operation, device=device))
+    token = _current.set(recorder)
+    started = time.perf_counter()
+    try:
+        yield recorder.trace
+    finally:
+        recorder.trace.total = time.perf_counter() - started
+        _current.reset(token)
+        logger.debug(
+            "%s on %s took %.3fs: %s",
+            operation,
+            device,
+            recorder.trace.total,
+            recorder.trace.by_phase(),
+        )
+        for hook in tuple(_hooks):  # a hook may remove itself
+            try:
+                hook(recorder.trace)
+            except Exception:  # a broken hook must not fail the operation
+                logger.exception("trace hook %r failed", hook)
+
+
+def traced_operation(method: Callable) -> Callable:
+    """Run a manager method under :func:`traced`.
+
+    The trace is stored on the manager as ``last_trace`` (also when the method
+    raises) and, when the result has a ``trace`` field, on the result too.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        driver = getattr(self, "driver", None)
+        device = getattr(driver, "host", None) or getattr(driver, "platform", None)
+        with traced(method.__name__, device=device) as trace:
+            try:
+                result = method(self, *args, **kwargs)
+            finally:
+                self.last_trace = trace  # kept on failure too
+        if hasattr(result, "trace") and result.trace is None:
+            result.trace = trace
+        return result
+
+    return wrapper
@@ -0,0 +1,38 @@
+"""Helpers shared by the test modules."""
+
+from netauto.models import Evpn, EvpnCircuit, RoutingInstance, Vlan
+
+
+def circuit(vni=5000, vlan=100, key="SO101010", rt=None, interface="Ethernet6"):
+    """A mac-vrf circuit for service ``key`` on ASN 65001. The VLAN is named
+    after the service; RD and RT default to ``65001:<number>`` /
+    ``37195:<number>``."""
+    number = key[2:]
+    return EvpnCircuit(
+        evpn=Evpn(
+            vlan=Vlan(vlan_id=vlan, name=key), asn=65001, vni=vni, description=key
+        ),
+        routing_instance=RoutingInstance(
+            instance_name=key,
+            instance_type="mac-vrf",
+            rd=f"65001:{number}",
+            rt_rd=rt or f"37195:{number}",
+        ),
+        interface=interface,
+    )
+
+
+def count_calls(obj, *names):
+    """Wrap the methods ``names`` of ``obj`` to count calls — device round
+    trips, for the batching tests. Returns the live ``{name: count}`` dict,
+    also kept as ``obj.calls``."""
+    obj.calls = dict.fromkeys(names, 0)
+    for name in names:
+        original = getattr(obj, name)
+
+        def counted(*args, _name=name, _original=original, **kwargs):
+            obj.calls[_name] += 1
+            return _original(*args, **kwargs)
+
+        setattr(obj, name, counted)
+    return obj.calls
@@ -1,22 +1,30 @@
+import os
+import stat
+import threading
+
 import pytest
 
 from netauto.allocation import (
+    ConflictAccumulator,
+    JournalRegistry,
     JsonFileRegistry,
+    PooledRegistry,
+    SqliteRegistry,
+    VniRegistry,
     find_conflicts,
     make_routing_instance,
     service_number,
 )
-from netauto.exceptions import RtCollision, VniInUse
+from netauto.exceptions import (
+    ContiguousUnsupported,
+    RtCollision,
+    SeedConflict,
+    VniExhausted,
+    VniInUse,
+)
 from netauto.models import AzureEvpn, Evpn, EvpnCircuit, RoutingInstance, Vlan
 
-
-def _circuit(service_key, vni, rt):
-    return EvpnCircuit(
-        evpn=Evpn(vlan=Vlan(vlan_id=10), asn=1, vni=vni, description=service_key),
-        routing_instance=RoutingInstance(
-            instance_name=service_key, instance_type="mac-vrf", rd="1:1", rt_rd=rt
-        ),
-    )
+from .conftest import circuit
 
 
 class TestIdentifiers:
@@ -32,18 +40,21 @@ class TestIdentifiers:
 
 class TestFindConflicts:
     def test_same_service_two_ends_is_not_a_conflict(self):
-        circuits = [_circuit("SOA", 5000, "37195:A"), _circuit("SOA", 5000, "37195:A")]
+        circuits = [circuit(5000, key="SOA"), circuit(5000, key="SOA")]
         conflicts = find_conflicts(circuits)
         assert conflicts["vni_collisions"] == {}
         assert conflicts["rt_collisions"] == {}
 
     def test_same_vni_different_service_is_a_collision(self):
-        circuits = [_circuit("SOA", 5000, "37195:A"), _circuit("SOB", 5000, "37195:B")]
+        circuits = [circuit(5000, key="SOA"), circuit(5000, key="SOB")]
         conflicts = find_conflicts(circuits)
         assert conflicts["vni_collisions"] == {5000: ["SOA", "SOB"]}
 
     def test_same_rt_different_service_is_a_collision(self):
-        circuits = [_circuit("SOA", 5000, "37195:X"), _circuit("SOB", 5001, "37195:X")]
+        circuits = [
+            circuit(5000, key="SOA", rt="37195:X"),
+            circuit(5001, key="SOB", rt="37195:X"),
+        ]
         conflicts = find_conflicts(circuits)
         assert conflicts["rt_collisions"] == {"37195:X": ["SOA", "SOB"]}
 
@@ -58,7 +69,7 @@ class TestFindConflicts:
                 rd="1:1", rt_rd="37195:1",
             ),
         )
-        named = _circuit("pve2-4002", 5000, "37195:1")
+        named = circuit(5000, key="pve2-4002", rt="37195:1")
         conflicts = find_conflicts([blank, named])
         assert conflicts["vni_collisions"] == {}
         assert conflicts["rt_collisions"] == {}
@@ -71,6 +82,27 @@ class TestFindConflicts:
         assert conflicts["vni_collisions"] == {5000: ["SOA", "SOB"]}
 
 
+class TestConflictAccumulator:
+    def test_matches_find_conflicts(self):
+        circuits = [
+            circuit(5000, key="SOA", rt="37195:X"),
+            circuit(5000, key="SOB", rt="37195:X"),
+            circuit(5001, key="SOC"),
+        ]
+        acc = ConflictAccumulator()
+        acc.add(circuits[:1], device="sw1")
+        assert acc.conflicts() == {"vni_collisions": {}, "rt_collisions": {}}
+        acc.add(circuits[1:], device="sw2")
+        assert acc.conflicts() == find_conflicts(circuits)
+
+    def test_single_ended(self):
+        acc = ConflictAccumulator()
+        acc.add([circuit(5000, key="SOA")], device="sw1")
+        acc.add([circuit(5000, key="SOA"), circuit(5001, key="SOB")],
+                device="sw2")
+        assert acc.single_ended == {5001: "sw2"}
+
+
 class TestJsonFileRegistry:
     def _reg(self, tmp_path):
         return JsonFileRegistry(tmp_path / "vni.json", base_vni=10000)
@@ -105,7 +137,7 @@ class TestJsonFileRegistry:
     def test_seed_from_circuits(self, tmp_path):
         reg = self._reg(tmp_path)
         reg.seed_from_circuits(
-            [_circuit("SOA", 5000, "37195:A"), _circuit("SOB", 5001, "37195:B")]
+            [circuit(5000, key="SOA"), circuit(5001, key="SOB")]
         )
         assert reg.get("SOA") == 5000 and reg.get("SOB") == 5001
 
@@ -113,5 +145,399 @@ class TestJsonFileRegistry:
         reg = self._reg(tmp_path)
         with pytest.raises(VniInUse):
             reg.seed_from_circuits(
-                [_circuit("SOA", 5000, "37195:A"), _circuit("SOB", 5000, "37195:B")]
+                [circuit(5000, key="SOA"), circuit(5000, key="SOB")]
+            )
+
+    def test_seed_reports_every_conflict_and_records_nothing(self, tmp_path):
+        reg = self._reg(tmp_path)
+        reg.allocate("SOX")  # holds 10000
+        with pytest.raises(SeedConflict) as exc:
+            reg.seed_from_circuits([
+                circuit(5000, key="SOA"),
+                circuit(5000, key="SOA"),  # far end: fine
+                circuit(5000, key="SOB"),  # VNI of SOA
+                circuit(5002, key="SOC", rt="37195:A"),  # RT of SOA
+                circuit(10000, key="SOD"),  # VNI already allocated
+                circuit(5004, key="SOE"),
+            ])
+        assert len(exc.value.conflicts) == 3
+        assert set(reg.assignments()) == {"SOX"}
+
+
+class TestSqliteRegistry(TestJsonFileRegistry):
+    """Same contract as the JSON registry, plus cross-instance safety."""
+
+    def _reg(self, tmp_path):
+        return SqliteRegistry(tmp_path / "vni.db", base_vni=10000)
+
+    def test_persists_across_instances(self, tmp_path):
+        path = tmp_path / "vni.db"
+        SqliteRegistry(path).allocate("SOA")
+        assert SqliteRegistry(path).get("SOA") == 10000
+
+    def test_uses_wal(self, tmp_path):
+        reg = self._reg(tmp_path)
+        assert reg._conn().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_instances_see_each_others_writes(self, tmp_path):
+        a, b = self._reg(tmp_path), self._reg(tmp_path)
+        assert a.allocate("SOA", rt="37195:1") == 10000
+        assert b.allocate("SOB") == 10001  # b's core reloaded on the new version
+        with pytest.raises(RtCollision):
+            b.allocate("SOC", rt="37195:1")
+        a.release("SOA")
+        assert b.allocate("SOC") == 10000
+
+    def test_concurrent_allocators_never_share_a_vni(self, tmp_path):
+        path = tmp_path / "vni.db"
+        SqliteRegistry(path)  # create the schema once
+
+        def worker(n):
+            reg = SqliteRegistry(path)  # one "process" each: own core + connection
+            for i in range(25):
+                reg.allocate(f"SO{n}-{i}")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        vnis = [a["vni"] for a in SqliteRegistry(path).assignments().values()]
+        assert sorted(vnis) == list(range(10000, 10100))
+
+    def test_seed_rejects_shared_rt_and_rolls_back(self, tmp_path):
+        reg = self._reg(tmp_path)
+        with pytest.raises(RtCollision):
+            reg.seed_from_circuits(
+                [
+                    circuit(5000, key="SOA", rt="37195:X"),
+                    circuit(5001, key="SOB", rt="37195:X"),
+                ]
             )
+        assert reg.assignments() == {}
+        assert reg.allocate("SOC") == 10000
+
+
+class TestJournalRegistry(TestJsonFileRegistry):
+    """Same contract as the JSON registry, plus replay and compaction."""
+
+    def _reg(self, tmp_path, **kwargs):
+        return JournalRegistry(tmp_path / "vni", base_vni=10000, **kwargs)
+
+    def _lines(self, tmp_path):
+        return (tmp_path / "vni" / "journal.log").read_text().splitlines()
+
+    def test_persists_across_instances(self, tmp_path):
+        JournalRegistry(tmp_path / "vni").allocate("SOA")
+        assert JournalRegistry(tmp_path / "vni").get("SOA") == 10000
+
+    def test_one_line_per_mutation(self, tmp_path):
+        reg = self._reg(tmp_path)
+        reg.allocate("SOA", rt="37195:A")
+        reg.allocate("SOA")  # no-op: nothing appended
+        reg.allocate_many([("SOB", None), ("SOC", None)])
+        reg.release("SOB")
+        assert len(self._lines(tmp_path)) == 3
+
+    def test_replay_is_exact(self, tmp_path):
+        reg = self._reg(tmp_path)
+        reg.allocate_many([(f"SO{i}", f"37195:{i}") for i in range(5)])
+        reg.release_many(["SO1", "SO3"])
+        reg.record("SOX", 5000, None)
+        reopened = self._reg(tmp_path)
+        assert reopened.assignments() == reg.assignments()
+        assert reopened.allocate("SOY") == 10001  # freed hole reused after replay
+
+    def test_torn_tail_is_dropped(self, tmp_path):
+        reg = self._reg(tmp_path)
+        reg.allocate("SOA")
+        reg.close()
+        with open(tmp_path / "vni" / "journal.log", "ab") as f:
+            f.write(b'{"seq":2,"set":{"SOB":[100')  # crash mid-write
+        reopened = self._reg(tmp_path)
+        assert reopened.assignments() == {"SOA": {"vni": 10000, "rt": None}}
+        reopened.allocate("SOB")
+        assert self._reg(tmp_path).get("SOB") == 10001
+
+    def test_threshold_compaction(self, tmp_path):
+        reg = self._reg(tmp_path, compact_every=3)
+        for i in range(7):
+            reg.allocate(f"SO{i}")
+        assert len(self._lines(tmp_path)) == 1  # 6 lines compacted, 1 since
+        assert (tmp_path / "vni" / "snapshot.json").exists()
+        assert len(self._reg(tmp_path).assignments()) == 7
+
+    def test_snapshot_rename_is_durable_before_truncate(self, tmp_path, monkeypatch):
+        reg = self._reg(tmp_path)
+        reg.allocate("SO1")
+        events = []
+        fsync = os.fsync
+        monkeypatch.setattr(
+            os, "fsync",
+            lambda fd: events.append("dir" if stat.S_ISDIR(os.fstat(fd).st_mode)
+                                     else "file") or fsync(fd),
+        )
+        truncate = reg._log.truncate
+        monkeypatch.setattr(reg._log, "truncate",
+                            lambda n: events.append("truncate") or truncate(n))
+        reg.compact()
+        assert events.index("dir") < events.index("truncate")
+
+    def test_failed_commit_after_compaction(self, tmp_path, monkeypatch):
+        reg = self._reg(tmp_path)
+        for i in range(3):
+            reg.allocate(f"SO{i}")
+        reg.compact()
+        assert reg._log.tell() == 0
+        write = reg._log.write
+
+        def torn(data):
+            write(data[: len(data) // 2])
+            raise OSError("disk full")
+
+        monkeypatch.setattr(reg._log, "write", torn)
+        with pytest.raises(OSError):
+            reg.allocate("SO9")
+        monkeypatch.undo()
+        assert self._lines(tmp_path) == []  # partial line dropped, no hole
+        assert reg.allocate("SO9") == 10003
+        assert len(self._lines(tmp_path)) == 1
+        assert self._reg(tmp_path).get("SO9") == 10003
+
+    def test_crash_between_snapshot_and_truncate(self, tmp_path):
+        reg = self._reg(tmp_path)
+        for i in range(3):
+            reg.allocate(f"SO{i}")
+        journal = (tmp_path / "vni" / "journal.log").read_bytes()
+        reg.compact()
+        # journal not yet truncated when the process died
+        (tmp_path / "vni" / "journal.log").write_bytes(journal)
+        reopened = self._reg(tmp_path)
+        assert len(reopened.assignments()) == 3
+        assert reopened.allocate("SO9") == 10003
+
+
+class TestBatchAllocation:
+    @pytest.fixture(params=["json", "sqlite", "journal"])
+    def reg(self, request, tmp_path):
+        if request.param == "json":
+            return JsonFileRegistry(tmp_path / "vni.json", base_vni=10000)
+        if request.param == "journal":
+            return JournalRegistry(tmp_path / "vni", base_vni=10000)
+        return SqliteRegistry(tmp_path / "vni.db", base_vni=10000)
+
+    def test_allocate_many_persists_in_one_write(self, reg):
+        writes = []
+        if isinstance(reg, JsonFileRegistry):
+            write = reg._write
+            reg._write = lambda data: writes.append(1) or write(data)
+        vnis = reg.allocate_many([("SOA", "37195:A"), ("SOB", "37195:B"), ("SOC", None)])
+        assert vnis == [10000, 10001, 10002]
+        assert reg.get("SOB") == 10001
+        if isinstance(reg, JsonFileRegistry):
+            assert writes == [1]
+
+    def test_all_or_nothing(self, reg):
+        reg.allocate("SOA", rt="37195:A")
+        with pytest.raises(RtCollision):
+            reg.allocate_many([("SOB", None), ("SOC", "37195:A")])
+        assert set(reg.assignments()) == {"SOA"}
+        assert reg.allocate("SOB") == 10001
+
+    def test_contiguous_block(self, reg):
+        reg.allocate_many([(f"SO{i}", None) for i in range(4)])
+        reg.release_many(["SO1", "SO2"])
+        assert set(reg.assignments()) == {"SO0", "SO3"}
+        block = reg.allocate_many([("X", None), ("Y", None), ("Z", None)], contiguous=True)
+        assert block == [10004, 10005, 10006]  # 10001-10002 too short
+
+    def test_default_allocate_many_rejects_contiguous(self, tmp_path):
+        class Custom(JsonFileRegistry):
+            allocate_many = VniRegistry.allocate_many  # no batch support of its own
+
+        reg = Custom(tmp_path / "vni.json", base_vni=10000)
+        with pytest.raises(ContiguousUnsupported):
+            reg.allocate_many([("SOA", None), ("SOB", None)], contiguous=True)
+        assert reg.assignments() == {}
+        assert reg.allocate_many([("SOA", None), ("SOB", None)]) == [10000, 10001]
+
+    def test_seed_is_one_write(self, reg):
+        writes = []
+        if isinstance(reg, JsonFileRegistry):
+            write = reg._write
+            reg._write = lambda data: writes.append(1) or write(data)
+        reg.seed_from_circuits(
+            [circuit(5000 + i, key=f"SO{i}") for i in range(500)]
+        )
+        assert len(reg.assignments()) == 500
+        if isinstance(reg, JsonFileRegistry):
+            assert writes == [1]
+
+    def test_survives_reopen(self, reg):
+        reg.allocate_many([("SOA", None), ("SOB", None)])
+        reopened = type(reg)(reg.path, base_vni=10000)
+        assert reopened.allocate("SOC") == 10002
+
+
+class TestCachedReads:
+    def test_json_get_does_not_reparse(self, tmp_path):
+        reg = JsonFileRegistry(tmp_path / "vni.json")
+        reg.allocate("SOA")
+        reads = []
+        read = reg._read
+        reg._read = lambda: reads.append(1) or read()
+        for _ in range(100):
+            assert reg.get("SOA") == 10000
+        reg.assignments()
+        assert reads == []
+
+    def test_json_sees_another_writer(self, tmp_path):
+        path = tmp_path / "vni.json"
+        reader, writer = JsonFileRegistry(path), JsonFileRegistry(path)
+        assert reader.get("SOA") is None
+        writer.allocate("SOA")
+        assert reader.get("SOA") == 10000
+        assert reader.allocate("SOB") == 10001  # allocates against the new image
+
+    def test_sqlite_get_is_served_from_memory(self, tmp_path):
+        reg = SqliteRegistry(tmp_path / "vni.db")
+        reg.allocate("SOA")
+        reg.get("SOA")
+        statements = []
+        reg._conn().set_trace_callback(statements.append)
+        for _ in range(100):
+            assert reg.get("SOA") == 10000
+        assert not [s for s in statements if "vni_assignments" in s]
+
+    def test_sqlite_sees_another_writer(self, tmp_path):
+        path = tmp_path / "vni.db"
+        reader, writer = SqliteRegistry(path), SqliteRegistry(path)
+        assert reader.get("SOA") is None
+        writer.allocate("SOA", rt="37195:1")
+        assert reader.get("SOA") == 10000
+        assert reader.assignments() == {"SOA": {"vni": 10000, "rt": "37195:1"}}
+
+
+POOL_RANGES = {"cloud_vc/eu": (100000, 100002), "p2p_vc/eu": (200000, 200999)}
+
+
+class TestPooledRegistry:
+    def _reg(self, tmp_path, default_pool="p2p_vc/eu"):
+        return PooledRegistry.from_ranges(
+            POOL_RANGES,
+            lambda name, lo, hi: JsonFileRegistry(
+                tmp_path / f"{name.replace('/', '-')}.json", base_vni=lo, max_vni=hi
+            ),
+            default_pool=default_pool,
+        )
+
+    def test_allocates_from_the_named_pool(self, tmp_path):
+        reg = self._reg(tmp_path)
+        assert reg.allocate("SOA", pool="cloud_vc/eu") == 100000
+        assert reg.allocate("SOB") == 200000  # default pool
+        assert reg.allocate("SOA", pool="p2p_vc/eu") == 100000  # already held
+        assert reg.pool_of("SOA") == "cloud_vc/eu"
+        assert reg.assignments().keys() == {"SOA", "SOB"}
+        reg.release("SOA")
+        assert reg.get("SOA") is None
+
+    def test_pools_are_separate_shards(self, tmp_path):
+        reg = self._reg(tmp_path)
+        a, b = reg.pools["cloud_vc/eu"], reg.pools["p2p_vc/eu"]
+        assert a._lock is not b._lock and a.path != b.path
+
+    def test_overlapping_ranges_rejected(self, tmp_path):
+        with pytest.raises(ValueError, match="overlap"):
+            PooledRegistry({
+                "a": JsonFileRegistry(tmp_path / "a.json", base_vni=100, max_vni=200),
+                "b": JsonFileRegistry(tmp_path / "b.json", base_vni=200, max_vni=300),
+            })
+
+    def test_unknown_pool(self, tmp_path):
+        with pytest.raises(ValueError, match="unknown VNI pool"):
+            self._reg(tmp_path).allocate("SOA", pool="azure/us")
+
+    def test_stats_and_exhaustion(self, tmp_path):
+        reg = self._reg(tmp_path)
+        reg.allocate_many([(f"SO{i}", None) for i in range(3)], pool="cloud_vc/eu")
+        with pytest.raises(VniExhausted):
+            reg.allocate("SO9", pool="cloud_vc/eu")
+        stats = reg.stats()["cloud_vc/eu"]
+        assert (stats.allocated, stats.free, stats.exhaustions) == (3, 0, 1)
+        assert stats.utilization == 1.0 and stats.exhausted
+        assert reg.stats()["p2p_vc/eu"].utilization == 0.0
+
+    def test_seed_routes_by_vni(self, tmp_path):
+        reg = self._reg(tmp_path)
+        reg.seed_from_circuits([
+            circuit(100001, key="SOA"),
+            circuit(200500, key="SOB"),
+            circuit(5000, key="SOC"),  # outside every range -> default pool
+        ])
+        assert reg.pool_of("SOA") == "cloud_vc/eu"
+        assert reg.pool_of("SOB") == "p2p_vc/eu"
+        assert reg.pool_of("SOC") == "p2p_vc/eu"
+        assert reg.stats()["p2p_vc/eu"].allocated == 1  # SOC is outside the range
+
+    def test_route_targets_are_unique_across_pools(self, tmp_path):
+        reg = self._reg(tmp_path)
+        reg.allocate("SOA", rt="37195:1", pool="cloud_vc/eu")
+        with pytest.raises(RtCollision):
+            reg.allocate("SOB", rt="37195:1")
+        with pytest.raises(RtCollision):
+            reg.allocate_many([("SOB", "37195:2"), ("SOC", "37195:2")])
+        with pytest.raises(SeedConflict, match="already assigned to SOA"):
+            reg.seed_from_circuits([circuit(200500, key="SOD", rt="37195:1")])
+        assert reg.pool_of("SOB") is None and reg.get("SOD") is None
+        reg.release("SOA")
+        assert reg.allocate("SOB", rt="37195:1") == 200000
+
+    def test_seed_refuses_a_service_held_in_another_pool(self, tmp_path):
+        reg = self._reg(tmp_path)
+        assert reg.allocate("SOA", pool="cloud_vc/eu") == 100000
+        with pytest.raises(SeedConflict, match="already allocated in pool cloud_vc/eu"):
+            reg.seed_from_circuits([circuit(200005, key="SOA")])
+        assert reg.pools["p2p_vc/eu"].get("SOA") is None
+        assert reg.get("SOA") == 100000
+
+    def test_seed_is_all_or_nothing_across_pools(self, tmp_path):
+        reg = self._reg(tmp_path)
+        reg.allocate("SOB", pool="p2p_vc/eu")  # holds 200000
+        with pytest.raises(SeedConflict) as exc:
+            reg.seed_from_circuits([
+                circuit(100001, key="SOA"),  # cloud_vc/eu: fine on its own
+                circuit(200000, key="SOC"),  # p2p_vc/eu: VNI taken by SOB
+            ])
+        assert len(exc.value.conflicts) == 1
+        assert reg.pools["cloud_vc/eu"].assignments() == {}
+        assert reg.pool_of("SOA") is None
+
+    def test_allocate_many_keeps_vnis_held_in_another_pool(self, tmp_path):
+        reg = self._reg(tmp_path)
+        reg.allocate("SOA", pool="cloud_vc/eu")
+        assert reg.allocate_many([("SOB", None), ("SOA", None)]) == [200000, 100000]
+        assert reg.allocate_many([("SOA", None)]) == [100000]
+        assert reg.pools["p2p_vc/eu"].get("SOA") is None
+
+    def test_exposes_the_overall_range(self, tmp_path):
+        reg = self._reg(tmp_path)
+        assert (reg.base_vni, reg.max_vni) == (100000, 200999)
+
+    def test_owner_map_survives_reopen(self, tmp_path):
+        self._reg(tmp_path).allocate("SOA", rt="37195:1", pool="cloud_vc/eu")
+        reg = self._reg(tmp_path)
+        assert reg.pool_of("SOA") == "cloud_vc/eu"
+        with pytest.raises(RtCollision):
+            reg.allocate("SOB", rt="37195:1")
+
+    def test_lookups_touch_only_the_owning_pool(self, tmp_path, monkeypatch):
+        reg = self._reg(tmp_path)
+        reg.allocate("SOA", pool="cloud_vc/eu")
+
+        def untouched(*args):
+            raise AssertionError("non-owning pool was queried")
+
+        monkeypatch.setattr(reg.pools["p2p_vc/eu"], "get", untouched)
+        assert reg.get("SOA") == 100000
+        assert reg.get("SOX") is None
+        assert reg.pool_of("SOA") == "cloud_vc/eu"
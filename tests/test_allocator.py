@@ -0,0 +1,153 @@
+import random
+
+import pytest
+
+from netauto.allocator import FreeRanges, VniAllocator
+from netauto.exceptions import RtCollision, SeedConflict, VniExhausted, VniInUse
+
+
+class TestFreeRanges:
+    def test_take_splits_and_give_merges(self):
+        free = FreeRanges(10, 19)
+        assert free.take(15)
+        assert list(free) == [(10, 14), (16, 19)]
+        assert not free.take(15)  # already used
+        assert free.take(10) and free.take(19)
+        assert list(free) == [(11, 14), (16, 18)]
+
+        assert free.give(15)
+        assert list(free) == [(11, 18)]
+        assert free.give(10) and free.give(19)
+        assert list(free) == [(10, 19)]
+        assert not free.give(12)  # already free
+        assert not free.give(25)  # out of range
+
+    def test_first_and_len(self):
+        free = FreeRanges(1, 3)
+        assert free.first() == 1 and len(free) == 3
+        for vni in (1, 2, 3):
+            free.take(vni)
+        assert free.first() is None and len(free) == 0
+        assert 2 not in free
+
+    def test_matches_a_set_model(self):
+        rng = random.Random(7)
+        free = FreeRanges(0, 199)
+        model = set(range(200))
+        for _ in range(2000):
+            vni = rng.randrange(-5, 205)
+            if rng.random() < 0.5:
+                assert free.take(vni) == (vni in model)
+                model.discard(vni)
+            else:
+                assert free.give(vni) == (0 <= vni < 200 and vni not in model)
+                if 0 <= vni < 200:
+                    model.add(vni)
+            assert free.first() == (min(model) if model else None)
+        assert {v for s, e in free for v in range(s, e + 1)} == model
+
+
+class TestVniAllocator:
+    def test_lowest_free_vni_and_reuse(self):
+        alloc = VniAllocator(base_vni=100)
+        assert [alloc.allocate(k) for k in ("A", "B", "C")] == [100, 101, 102]
+        assert alloc.allocate("B") == 101  # idempotent
+        assert alloc.release("B") == 101
+        assert alloc.allocate("D") == 101  # hole reused
+        assert alloc.owner(101) == "D"
+        assert alloc.release("missing") is None
+
+    def test_rt_index(self):
+        alloc = VniAllocator(base_vni=100)
+        alloc.allocate("A", rt="37195:1")
+        with pytest.raises(RtCollision):
+            alloc.allocate("B", rt="37195:1")
+        alloc.release("A")
+        assert alloc.allocate("B", rt="37195:1") == 100
+
+    def test_record_guards_and_out_of_range(self):
+        alloc = VniAllocator(base_vni=100)
+        alloc.record("SEEDED", 5000, None)  # below base: owned, never handed out
+        assert alloc.allocate("A") == 100
+        with pytest.raises(VniInUse):
+            alloc.record("B", 5000, None)
+        with pytest.raises(VniInUse):
+            alloc.record("A", 101, None)
+        alloc.record("B", 101, None)  # recorded inside the range -> taken
+        assert alloc.allocate("C") == 102
+
+    def test_exhaustion(self):
+        alloc = VniAllocator(base_vni=1, max_vni=2)
+        alloc.allocate("A")
+        alloc.allocate("B")
+        with pytest.raises(VniExhausted):
+            alloc.allocate("C")
+
+    def test_load_round_trips(self):
+        alloc = VniAllocator(base_vni=100)
+        for key in ("A", "B", "C"):
+            alloc.allocate(key, rt=f"rt:{key}")
+        alloc.release("B")
+        copy = VniAllocator(base_vni=100, assignments=alloc.assignments())
+        assert copy.assignments() == alloc.assignments()
+        assert copy.allocate("D") == 101
+
+
+class TestAllocateMany:
+    def test_batch_in_request_order_with_existing(self):
+        alloc = VniAllocator(base_vni=100)
+        alloc.allocate("B")
+        assert alloc.allocate_many(
+            [("A", None), ("B", None), ("C", None), ("A", None)]
+        ) == [101, 100, 102, 101]
+
+    def test_contiguous_skips_short_holes(self):
+        alloc = VniAllocator(base_vni=100)
+        alloc.allocate_many([(k, None) for k in "ABCDE"])
+        alloc.release_many(["B", "D"])  # holes at 101 and 103
+        assert alloc.allocate_many([("X", None), ("Y", None)], contiguous=True) == [
+            105,
+            106,
+        ]
+        assert alloc.allocate_many([("P", None), ("Q", None)]) == [101, 103]
+
+    def test_failure_leaves_state_untouched(self):
+        alloc = VniAllocator(base_vni=100, max_vni=104)
+        alloc.allocate("A", rt="rt:A")
+        alloc.record("H", 102, None)  # free: 101, 103-104
+        before = alloc.assignments()
+        with pytest.raises(RtCollision):
+            alloc.allocate_many([("B", None), ("C", "rt:A")])
+        with pytest.raises(RtCollision):
+            alloc.allocate_many([("B", "rt:X"), ("C", "rt:X")])  # within the batch
+        with pytest.raises(VniExhausted):
+            alloc.allocate_many([(k, None) for k in "BCDE"])
+        with pytest.raises(VniExhausted):
+            alloc.allocate_many([(k, None) for k in "BCD"], contiguous=True)
+        assert alloc.assignments() == before
+        assert list(alloc.free_ranges()) == [(101, 101), (103, 104)]
+
+
+class TestSeed:
+    def test_applies_all_rows_in_one_pass(self):
+        alloc = VniAllocator(base_vni=100)
+        staged = alloc.seed([("A", 100, "rt:A"), ("A", 100, "rt:A"), ("B", 7, None)])
+        assert staged == {"A": (100, "rt:A"), "B": (7, None)}
+        assert alloc.allocate("C") == 101
+
+    def test_collects_every_conflict(self):
+        alloc = VniAllocator(base_vni=100)
+        alloc.allocate("A", rt="rt:A")  # 100
+        with pytest.raises(SeedConflict) as exc:
+            alloc.seed(
+                [
+                    ("A", 200, None),  # A moving VNI
+                    ("B", 100, None),  # VNI held by A
+                    ("C", 300, "rt:A"),  # RT held by A
+                    ("D", 400, None),
+                    ("E", 400, None),  # VNI of D, earlier in the batch
+                ]
+            )
+        assert len(exc.value.conflicts) == 4
+        assert isinstance(exc.value, VniInUse) and isinstance(exc.value, RtCollision)
+        assert set(alloc.assignments()) == {"A"}
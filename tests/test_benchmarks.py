@@ -0,0 +1,95 @@
+"""Guards for the benchmark suite (benchmarks/): the synthetic configs parse
+back to the circuits they claim to carry, and baseline comparison flags
+regressions. The benchmarks themselves are run by hand, not in CI."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+from netauto.evpn import plan_reconcile
+from netauto.parsers import AristaConfigParser, OcnosConfigXMLParser
+
+BENCHMARKS = Path(__file__).resolve().parent.parent / "benchmarks"
+sys.path.insert(0, str(BENCHMARKS))
+
+import run_benchmarks
+import synthetic
+
+
+class TestSyntheticConfigs:
+    def test_arista_carries_k_circuits(self):
+        config = synthetic.arista_running_config(8, 12, 20)
+        parsed = AristaConfigParser(config).parse_evpn_circuits()
+        want = {c.evpn.vni: c for c in synthetic.circuits(20, 8)}
+        assert {c.evpn.vni for c in parsed} == set(want)
+        for c in parsed:
+            assert c.evpn.vlan.vlan_id == want[c.evpn.vni].evpn.vlan.vlan_id
+            assert c.routing_instance.rt_rd == want[c.evpn.vni].routing_instance.rt_rd
+        cfg = AristaConfigParser(config).parse_config()
+        assert sum("." in i.name for i in cfg.interfaces) == 12
+
+    def test_ocnos_round_trips_to_the_intended_circuits(self):
+        config = synthetic.ocnos_config_xml(8, 12, 20)
+        parsed = OcnosConfigXMLParser(config).parse_evpn_circuits()
+        plan = plan_reconcile(synthetic.circuits(20, 8), parsed)
+        assert len(plan.in_sync) == 20 and not plan.to_delete
+        assert "operation" not in config  # edit-config attributes stripped
+
+    def test_deterministic(self):
+        for build in (synthetic.ocnos_config_xml, synthetic.arista_running_config):
+            assert build(4, 4, 5) == build(4, 4, 5)
+
+    def test_sizes_bounded_by_vlan_space(self):
+        with pytest.raises(ValueError):
+            synthetic.circuits(synthetic.MAX_CIRCUITS + 1)
+        with pytest.raises(ValueError):
+            synthetic.arista_running_config(2, 2 * 98 + 1, 0)
+
+
+def _report(**medians):
+    return {
+        "results": [
+            {"name": name, "scale": "small", "median": median}
+            for name, median in medians.items()
+        ]
+    }
+
+
+class TestCompare:
+    def test_flags_regressions_and_improvements(self):
+        baseline = _report(parse=0.100, render=0.100, plan=0.100)
+        current = _report(parse=0.150, render=0.050, plan=0.110, new=0.1)
+        status = {
+            v["name"]: v["status"]
+            for v in run_benchmarks.compare(current, baseline, threshold=0.2)
+        }
+        assert status == {
+            "parse": "regression",
+            "render": "improvement",
+            "plan": "ok",
+            "new": "new",
+        }
+
+    def test_ignores_noise_on_tiny_cases(self):
+        verdicts = run_benchmarks.compare(
+            _report(plan=0.0004), _report(plan=0.0001), min_delta=0.001
+        )
+        assert verdicts[0]["status"] == "ok"
+
+    def test_run_reports_each_case(self):
+        report = run_benchmarks.run(
+            ["small"], ["plan_reconcile"], repeat=2, log=lambda line: None
+        )
+        (result,) = report["results"]
+        assert result["runs"] == 2 and result["k"] == run_benchmarks.SCALES["small"][2]
+        assert result["min"] <= result["median"]
+
+    def test_fabric_cases_run_on_a_simulated_fleet(self):
+        report = run_benchmarks.run(
+            ["small"],
+            ["fabric.audit", "fabric.reconcile"],
+            repeat=1,
+            log=lambda line: None,
+        )
+        assert [r["ops"] > 0 for r in report["results"]] == [True, True]
@@ -0,0 +1,96 @@
+from netauto.allocation import find_conflicts
+from netauto.drivers import MockDriver
+from netauto.evpn import EvpnManager, plan_reconcile
+from netauto.index import CircuitIndex, circuit_bindings
+from netauto.models import AzureEvpn, Interface
+
+from .conftest import circuit
+
+
+class TestCircuitIndex:
+    def test_lookups(self):
+        a = circuit(5000, 100, "SOA")
+        b = circuit(5001, 101, "SOB", interface="Ethernet7")
+        index = CircuitIndex([a, b])
+
+        assert len(index) == 2
+        assert index.by_vni(5000) == [a]
+        assert index.by_binding("Ethernet7", 101) == [b]
+        assert index.by_rt("37195:A") == [a]
+        assert index.by_service("SOB") == [b]
+        assert index.by_instance("SOA") == [a]
+        assert index.by_vni(9999) == []
+        assert index.vnis() == {5000, 5001}
+
+    def test_find_prefers_intended_interface(self):
+        far = circuit(5000, 100, interface="Ethernet1")
+        near = circuit(5000, 100, interface="Ethernet6")
+        index = CircuitIndex([far, near])
+        assert index.find(5000, "Ethernet6") is near
+        assert index.find(5000, "Ethernet9") is far  # no binding match -> first
+        assert index.find(4000) is None
+
+    def test_add_and_remove(self):
+        a = circuit(5000, 100)
+        index = CircuitIndex()
+        index.add(a)
+        assert index.by_binding("Ethernet6", 100) == [a]
+
+        index.remove(a)
+        assert len(index) == 0
+        assert index.by_vni(5000) == []
+        assert index.by_rt("37195:101010") == []
+        assert index.vnis() == set()
+
+    def test_azure_bindings(self):
+        customer = AzureEvpn(
+            description="SO1",
+            asn=1,
+            vni=6000,
+            s_tag=500,
+            role="customer",
+            c_tags=[10, 20],
+        )
+        cni = AzureEvpn(description="SO1", asn=1, vni=6001, s_tag=500, role="cni")
+        assert circuit_bindings("eth4", customer) == [("eth4", 10), ("eth4", 20)]
+        assert circuit_bindings("eth5", cni) == [("eth5", 500)]
+        assert circuit_bindings(None, cni) == []
+
+    def test_collisions_track_removal(self):
+        a = circuit(5000, 100, "SOA")
+        b = circuit(5000, 101, "SOB")
+        index = CircuitIndex([a, b])
+        assert index.vni_collisions() == {5000: ["SOA", "SOB"]}
+        index.remove(b)
+        assert index.vni_collisions() == {}
+
+
+class TestIndexConsumers:
+    def test_find_conflicts_accepts_an_index(self):
+        index = CircuitIndex(
+            [
+                circuit(5000, 100, "SOA", rt="37195:X"),
+                circuit(5001, 101, "SOB", rt="37195:X"),
+            ]
+        )
+        assert find_conflicts(index)["rt_collisions"] == {"37195:X": ["SOA", "SOB"]}
+
+    def test_plan_reconcile_accepts_an_index(self):
+        actual = CircuitIndex([circuit(5000, 100), circuit(9999, 50, "SOX")])
+        plan = plan_reconcile([circuit(5000, 100), circuit(5001, 101)], actual)
+        assert plan.in_sync == [5000]
+        assert plan.to_create == [5001]
+        assert plan.to_delete == [9999]
+
+    def test_verify_circuit_reuses_a_prebuilt_index(self):
+        driver = MockDriver(
+            platform="arista_eos", initial_interfaces=[Interface(name="Ethernet6")]
+        )
+        reads = []
+        driver.get_config = lambda: reads.append(1) or ""
+        mgr = EvpnManager(driver)
+        index = CircuitIndex([circuit(5000, 100)])
+
+        diff = mgr.verify_circuit("Ethernet6", circuit(5000, 100).evpn, index=index)
+        assert diff.present and diff.matches
+        assert reads == []  # no device read-back
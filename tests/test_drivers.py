@@ -55,6 +55,34 @@ class TestOcnosDriver:
         assert OcnosDriver._extract_vnis(_FakeReply(root)) == []
 
 
+    def test_ocnos_switchports_reuse_the_last_interface_read(self, monkeypatch):
+        """LagManager reads get_interfaces() then get_switchports(): on OcNOS
+        both come from the same NETCONF subtrees, fetched once."""
+        driver = OcnosDriver.__new__(OcnosDriver)
+        gets = []
+
+        class _Conn:
+            connected = True
+
+            def get(self, filter):
+                gets.append(filter)
+                reply = _FakeReply(etree.Element("data"))
+                reply.xml = "<data/>"
+                return reply
+
+        driver.conn = _Conn()
+        monkeypatch.setattr(
+            driver, "_extract_interfaces", lambda reply: [Interface(name="eth3")]
+        )
+        monkeypatch.setattr(driver, "_extract_system_macs", lambda reply: {})
+
+        driver.get_interfaces()
+        assert list(driver.get_switchports()) == ["eth3"]
+        assert len(gets) == 2  # interfaces + evpn, once
+        driver.get_switchports()  # used up: a fresh read
+        assert len(gets) == 4
+
+
 class TestMockDriver:
     """Test suite for MockDriver functionality."""
 
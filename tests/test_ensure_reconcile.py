@@ -1,8 +1,20 @@
 """Declarative ensure (idempotency) + plan_reconcile tests."""
 
+import pytest
+
 from netauto.drivers import MockDriver
-from netauto.evpn import EvpnManager, plan_reconcile
-from netauto.models import Evpn, EvpnCircuit, Interface, RoutingInstance, Vlan
+from netauto.evpn import EvpnManager, apply_plan, apply_plans, plan_reconcile
+from netauto.exceptions import CircuitConflict, InterfaceNotFound, PushFailed
+from netauto.models import (
+    CircuitSpec,
+    Evpn,
+    Interface,
+    ReconcilePlan,
+    RoutingInstance,
+    Vlan,
+)
+
+from .conftest import circuit, count_calls
 
 
 def _rc(vlan, vni):
@@ -59,19 +71,71 @@ class TestEnsureCircuit:
         assert d.pushed_commands  # re-applied to converge
 
 
-def _circuit(vni, vlan, key="SO1", rt="37195:1", interface="eth4"):
-    return EvpnCircuit(
-        evpn=Evpn(vlan=Vlan(vlan_id=vlan), asn=1, vni=vni, description=key),
-        routing_instance=RoutingInstance(instance_name=key, instance_type="mac-vrf",
-                                         rd="1:1", rt_rd=rt),
-        interface=interface,
+def _intent(vlan, vni, key):
+    return CircuitSpec(
+        interface="Ethernet6",
+        evpn=Evpn(vlan=Vlan(vlan_id=vlan, name=key), asn=65001, vni=vni,
+                  description=key, service_type="cloud_vc"),
+        routing_instance=RoutingInstance(
+            instance_name=key, instance_type="mac-vrf",
+            rd=f"65001:{key[2:]}", rt_rd=f"37195:{key[2:]}",
+        ),
     )
 
 
+class TestEnsureCircuits:
+    def test_one_read_and_one_push_for_mixed_batch(self):
+        d = _driver(_rc(100, 5000))
+        calls = count_calls(d, "get_config")
+        intents = [
+            _intent(100, 5000, "SO101010"),   # matches the device
+            _intent(101, 5001, "SO101011"),   # absent
+            _intent(102, 5002, "SO101012"),   # absent
+        ]
+        res = EvpnManager(d).ensure_circuits(intents)
+
+        assert calls["get_config"] == 1
+        assert [r.action for r in res.results] == ["unchanged", "created", "created"]
+        pushed = "\n".join(d.pushed_commands)
+        assert "vxlan vlan 101 vni 5001" in pushed
+        assert "vni 5000" not in pushed  # unchanged circuit not re-pushed
+        assert res.config_diff
+        assert {"get_circuits", "diff", "render", "push_config"} <= set(
+            res.trace.by_phase()
+        )
+
+    def test_drifted_circuit_is_updated(self):
+        d = _driver(_rc(200, 5000))
+        res = EvpnManager(d).ensure_circuits([_intent(100, 5000, "SO101010")])
+        assert res.results[0].action == "updated"
+        assert any("vlan" in diff for diff in res.results[0].differences)
+        assert "vxlan vlan 100 vni 5000" in "\n".join(d.pushed_commands)
+
+    def test_all_in_sync_pushes_nothing(self):
+        d = _driver(_rc(100, 5000))
+        res = EvpnManager(d).ensure_circuits([_intent(100, 5000, "SO101010")])
+        assert res.results[0].action == "unchanged"
+        assert d.pushed_commands == [] and res.config_diff == ""
+        assert "push_config" not in res.trace.by_phase()
+
+    def test_duplicate_vni_in_intents_raises(self):
+        with pytest.raises(CircuitConflict):
+            EvpnManager(_driver("")).ensure_circuits(
+                [_intent(100, 5000, "SO1"), _intent(101, 5000, "SO2")]
+            )
+
+    def test_missing_interface_raises_before_push(self):
+        d = _driver("")
+        intent = _intent(100, 5000, "SO1").model_copy(update={"interface": "Ethernet9"})
+        with pytest.raises(InterfaceNotFound):
+            EvpnManager(d).ensure_circuits([intent])
+        assert d.pushed_commands == []
+
+
 class TestPlanReconcile:
     def test_to_create_and_in_sync_and_delete(self):
-        intended = [_circuit(5000, 100), _circuit(5001, 101, key="SO2")]
-        actual = [_circuit(5001, 101, key="SO2"), _circuit(9999, 50, key="SOX")]
+        intended = [circuit(5000, 100), circuit(5001, 101, "SO2")]
+        actual = [circuit(5001, 101, "SO2"), circuit(9999, 50, "SOX")]
         plan = plan_reconcile(intended, actual)
         assert plan.to_create == [5000]      # intended, not on device
         assert plan.in_sync == [5001]        # present and matching
@@ -79,9 +143,130 @@ class TestPlanReconcile:
         assert plan.to_update == {}
 
     def test_to_update_reports_drift(self):
-        intended = [_circuit(5000, 100, rt="37195:1")]
-        actual = [_circuit(5000, 200, rt="37195:999")]  # vlan + rt drifted
+        intended = [circuit(5000, 100, rt="37195:1")]
+        actual = [circuit(5000, 200, rt="37195:999")]  # vlan + rt drifted
         plan = plan_reconcile(intended, actual)
         assert 5000 in plan.to_update
         joined = " ".join(plan.to_update[5000])
         assert "vlan" in joined and "rt" in joined
+
+
+def _arista(fail_on=None):
+    """MockDriver recording each push; raises PushFailed on a payload containing
+    ``fail_on``."""
+    d = MockDriver(platform="arista_eos")
+    d.pushes = []
+    push = d.push_config
+
+    def recording_push(commands, dry_run=False):
+        if fail_on and any(fail_on in c for c in commands):
+            raise PushFailed("commit rejected")
+        d.pushes.append(list(commands))
+        return push(commands, dry_run=dry_run)
+
+    d.push_config = recording_push
+    return d
+
+
+class TestApplyPlan:
+    def _fixture(self):
+        intended = [
+            circuit(5000, 100, "SO1"),    # in sync
+            circuit(5001, 101, "SO2"),    # absent -> create
+            circuit(5002, 102, "SO3"),    # drifted -> update
+        ]
+        actual = [
+            circuit(5000, 100, "SO1"),
+            circuit(5002, 202, "SO3"),
+            circuit(9000, 900, "SO9"),    # orphan -> delete
+        ]
+        return intended, actual, plan_reconcile(intended, actual)
+
+    def test_grouped_transactions_in_order(self):
+        intended, actual, plan = self._fixture()
+        d = _arista()
+        res = apply_plan(plan, intended, d, actual=actual)
+
+        assert res.ok
+        assert res.created == [5001] and res.updated == [5002]
+        assert res.deleted == [9000]
+        assert len(d.pushes) == 3  # upserts, circuit deletes, VRF deletes
+        upsert, circuit_delete, vrf_delete = ("\n".join(p) for p in d.pushes)
+        assert "vni 5001" in upsert and "vni 5002" in upsert
+        assert "vni 5000" not in upsert  # in sync, untouched
+        assert "no vxlan vlan 900 vni 9000" in circuit_delete
+        assert "no vlan-aware-bundle SO9" in vrf_delete
+
+    def test_vrf_still_intended_is_kept(self):
+        intended = [circuit(5000, 100, "SO1")]
+        actual = [circuit(5000, 100, "SO1"),
+                  circuit(5005, 105, "SO1", interface="eth5")]
+        d = _arista()
+        res = apply_plan(plan_reconcile(intended, actual), intended, d, actual=actual)
+        assert res.deleted == [5005]
+        assert len(d.pushes) == 1  # circuit only; SO1 VRF still in use
+
+    def test_stop_on_error_skips_remaining(self):
+        intended, actual, plan = self._fixture()
+        d = _arista(fail_on="vni 5001")
+        res = apply_plan(plan, intended, d, actual=actual)
+        assert set(res.failed) == {5001, 5002}
+        assert res.failed[5001] == "PushFailed: commit rejected"
+        assert res.skipped == [9000]
+        assert d.pushes == []
+
+    def test_stop_on_error_leaves_the_device_alone(self):
+        intended, _, plan = self._fixture()
+        d = _arista(fail_on="vni 5001")
+        reads = []
+        d.get_config = lambda: reads.append(1) or ""
+        res = apply_plan(plan, intended, d)  # no read-back given
+        assert res.skipped == [9000] and 9000 not in res.failed
+        assert reads == [] and d.pushes == []
+
+    def test_continue_and_report(self):
+        intended, actual, plan = self._fixture()
+        d = _arista(fail_on="vni 5001")
+        res = apply_plan(plan, intended, d, actual=actual, stop_on_error=False)
+        assert set(res.failed) == {5001, 5002}
+        assert res.deleted == [9000]
+        assert not res.ok
+
+    def test_dry_run_commits_nothing(self):
+        intended, actual, plan = self._fixture()
+        d = _arista()
+        res = apply_plan(plan, intended, d, actual=actual, dry_run=True)
+        assert d.pushed_commands == []
+        assert len(res.config_diffs) == 3
+
+    def test_reads_device_once_when_actual_not_given(self):
+        d = _arista()
+        reads = []
+        d.get_config = lambda: reads.append(1) or ""
+        plan = ReconcilePlan(to_delete=[9000])
+        res = apply_plan(plan, [], d)
+        assert reads == [1]
+        assert 9000 in res.failed  # nothing on the device to delete
+
+
+class TestApplyPlans:
+    def test_results_in_job_order(self):
+        intended = [circuit(5001, 101, "SO2")]
+        plan = plan_reconcile(intended, [])
+        drivers = [_arista() for _ in range(4)]
+        results = apply_plans(
+            [(plan, intended, d, []) for d in drivers], concurrency=2
+        )
+        assert [r.created for r in results] == [[5001]] * 4
+        assert all(len(d.pushes) == 1 for d in drivers)
+
+    def test_stop_on_error_skips_devices_not_started(self):
+        intended = [circuit(5001, 101, "SO2")]
+        plan = plan_reconcile(intended, [])
+        bad, good = _arista(fail_on="vni 5001"), _arista()
+        results = apply_plans(
+            [(plan, intended, bad, []), (plan, intended, good, [])], concurrency=1
+        )
+        assert 5001 in results[0].failed
+        assert results[1].skipped == [5001]
+        assert good.pushes == []
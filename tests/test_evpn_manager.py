@@ -6,9 +6,20 @@ from netauto.evpn import EvpnManager
 from netauto.exceptions import (
     InterfaceNotFound,
     NetAutoException,
+    PushFailed,
     VniInUse,
 )
-from netauto.models import AzureEvpn, Asn, Evpn, Interface, RoutingInstance, Vlan
+from netauto.models import (
+    AzureEvpn,
+    Asn,
+    CircuitSpec,
+    Evpn,
+    Interface,
+    RoutingInstance,
+    Vlan,
+)
+
+from .conftest import count_calls
 
 
 def _arista_driver(vnis=None):
@@ -254,3 +265,107 @@ class TestEvpnManagerAzure:
             "Ethernet6", _azure(), routing_instance=_ri(), dry_run=True
         )
         assert driver.pushed_commands == []
+
+
+def _spec(interface="Ethernet6", vni=5000, vlan_id=100, service_key="SO555", vrf=True):
+    return CircuitSpec(
+        interface=interface,
+        evpn=_evpn(vni=vni, vlan_id=vlan_id, service_key=service_key),
+        routing_instance=_ri(service_key) if vrf else None,
+    )
+
+
+class TestCreateCircuits:
+    def test_batch_is_one_read_and_one_push(self):
+        driver = _arista_driver()
+        calls = count_calls(driver, "push_config", "get_vnis")
+        specs = [
+            _spec(vni=5000 + i, vlan_id=100 + i, service_key=f"SO{500 + i}")
+            for i in range(10)
+        ]
+        result = EvpnManager(driver).create_circuits(specs)
+
+        assert calls == {"push_config": 1, "get_vnis": 1}
+        assert [r.action for r in result.circuits] == ["created"] * 10
+        assert {r.transaction for r in result.circuits} == {0}
+        pushed = "\n".join(driver.pushed_commands)
+        assert "vlan-aware-bundle SO509" in pushed
+        assert "vxlan vlan 109 vni 5009" in pushed
+
+    def test_max_per_push_bounds_transactions(self):
+        driver = _arista_driver()
+        calls = count_calls(driver, "push_config", "get_vnis")
+        specs = [
+            _spec(vni=5000 + i, vlan_id=100 + i, service_key=f"SO{500 + i}")
+            for i in range(5)
+        ]
+        result = EvpnManager(driver).create_circuits(specs, max_per_push=2)
+        assert calls["push_config"] == 3
+        assert len(result.config_diffs) == 3
+        assert [r.transaction for r in result.circuits] == [0, 0, 1, 1, 2]
+
+    def test_rejects_conflicts_and_pushes_the_rest(self):
+        driver = _arista_driver(vnis={5000: {"vlan_id": 100}})
+        specs = [
+            _spec(vni=5000),                                   # on device
+            _spec(vni=5001, vlan_id=101, service_key="SO501"),
+            _spec(vni=5001, vlan_id=102, service_key="SO502"),  # dup VNI
+            _spec(vni=5003, vlan_id=101, service_key="SO503"),  # dup binding
+            _spec(interface="Ethernet99", vni=5004, vlan_id=104),
+        ]
+        result = EvpnManager(driver).create_circuits(specs)
+
+        actions = [r.action for r in result.circuits]
+        assert actions == ["rejected", "created", "rejected", "rejected", "rejected"]
+        errors = [r.error or "" for r in result.circuits]
+        assert errors[0].startswith("VniInUse")
+        assert errors[2].startswith("VniInUse")
+        assert errors[3].startswith("CircuitConflict")
+        assert errors[4].startswith("InterfaceNotFound")
+        pushed = "\n".join(driver.pushed_commands)
+        assert "vni 5001" in pushed
+        assert "SO502" not in pushed and "SO503" not in pushed
+
+    def test_vrf_name_mismatch_is_rejected(self):
+        spec = CircuitSpec(
+            interface="Ethernet6", evpn=_evpn(), routing_instance=_ri("SO999")
+        )
+        result = EvpnManager(_arista_driver()).create_circuits([spec])
+        assert result.circuits[0].action == "rejected"
+        assert "must match" in result.circuits[0].error
+
+    def test_failed_transaction_marks_its_circuits(self):
+        driver = _arista_driver()
+        push = driver.push_config
+
+        def flaky(commands, dry_run=False):
+            if any("SO500" in c for c in commands):
+                raise PushFailed("session rejected")
+            return push(commands, dry_run=dry_run)
+
+        driver.push_config = flaky
+        specs = [
+            _spec(vni=5000 + i, vlan_id=100 + i, service_key=f"SO{500 + i}")
+            for i in range(2)
+        ]
+        result = EvpnManager(driver).create_circuits(specs, max_per_push=1)
+        assert [r.action for r in result.circuits] == ["failed", "created"]
+        assert result.circuits[0].error == "PushFailed: session rejected"
+        assert result.circuits[1].transaction == 0
+
+    def test_dry_run_pushes_nothing(self):
+        driver = _arista_driver()
+        result = EvpnManager(driver).create_circuits([_spec()], dry_run=True)
+        assert driver.pushed_commands == []
+        assert "vxlan vlan 100 vni 5000" in result.config_diffs[0]
+
+    def test_ocnos_batch_is_one_document(self):
+        driver = _ocnos_driver()
+        specs = [
+            _spec("eth4", vni=5000 + i, vlan_id=100 + i, service_key=f"SO{500 + i}")
+            for i in range(3)
+        ]
+        result = EvpnManager(driver).create_circuits(specs)
+        assert len(driver.pushed_commands) == 1
+        assert all(r.action == "created" for r in result.circuits)
+        assert driver.pushed_commands[0].count("<netinst:network-instances") == 1
@@ -0,0 +1,247 @@
+"""Fabric-wide concurrent reconcile and audit (FabricReconciler, FabricAuditor)."""
+
+import time
+
+import pytest
+
+from netauto.drivers import MockDriver
+from netauto.fabric import FabricAuditor, FabricReconciler, fan_out
+
+from .conftest import circuit, count_calls
+
+
+def _rcs(*circuits):
+    """Arista running-config carrying ``(vlan, vni, key)`` circuits."""
+    vlans = "".join(f"vlan {v}\n   name {k}\n!\n" for v, _, k in circuits)
+    vxlan = "".join(f"   vxlan vlan {v} vni {n}\n" for v, n, _ in circuits)
+    bundles = "".join(
+        f"   vlan-aware-bundle {k}\n"
+        f"      rd 65001:{k[2:]}\n"
+        f"      route-target both 37195:{k[2:]}\n"
+        f"      vlan {v}\n"
+        for v, _, k in circuits
+    )
+    return f"!\n{vlans}interface Vxlan1\n{vxlan}!\nrouter bgp 65001\n{bundles}!\n"
+
+
+def _rc(vlan, vni, key="SO101010"):
+    return _rcs((vlan, vni, key))
+
+
+def _driver(running_config, delay=0.0):
+    d = MockDriver(platform="arista_eos")
+
+    def get_config():
+        time.sleep(delay)
+        return running_config
+
+    d.get_config = get_config
+    return d
+
+
+class TestFanOut:
+    def test_runs_concurrently(self):
+        names = [f"sw{i}" for i in range(8)]
+        started = time.perf_counter()
+        out = list(fan_out(names, lambda n: time.sleep(0.2) or n, 8, None))
+        assert time.perf_counter() - started < 0.8  # ~slowest, not the sum
+        assert sorted(name for name, *_ in out) == sorted(names)
+        assert all(error is None for _, _, error, _ in out)
+
+    def test_bounded_parallelism(self):
+        live, peak = [0], [0]
+
+        def work(name):
+            live[0] += 1
+            peak[0] = max(peak[0], live[0])
+            time.sleep(0.05)
+            live[0] -= 1
+
+        list(fan_out([f"sw{i}" for i in range(6)], work, 2, None))
+        assert peak[0] <= 2
+
+    def test_timeout_frees_the_slot(self):
+        def work(name):
+            time.sleep(5 if name == "hung" else 0.01)
+            return name
+
+        started = time.perf_counter()
+        out = {n: (v, e) for n, v, e, _ in fan_out(["hung", "a", "b"], work, 1, 0.2)}
+        assert time.perf_counter() - started < 2
+        assert isinstance(out["hung"][1], TimeoutError)
+        assert out["a"] == ("a", None) and out["b"] == ("b", None)
+
+    def test_errors_are_reported_not_raised(self):
+        def work(name):
+            raise ConnectionError("refused")
+
+        [(name, value, error, _)] = fan_out(["sw1"], work, 1, None)
+        assert (name, value) == ("sw1", None)
+        assert isinstance(error, ConnectionError)
+
+
+class TestFabricReconciler:
+    def test_plans_every_device(self):
+        devices = {
+            "sw1": _driver(_rc(100, 5000)),
+            "sw2": _driver(""),
+        }
+        intended = {"sw1": [circuit(5000, 100)], "sw2": [circuit(5000, 100)]}
+        fabric = FabricReconciler(devices, intended).plan()
+
+        assert list(fabric.devices) == ["sw1", "sw2"]
+        assert fabric.devices["sw1"].plan.in_sync == [5000]
+        assert fabric.devices["sw2"].plan.to_create == [5000]
+        assert fabric.failed == {}
+        assert fabric.seconds > 0
+
+    def test_wall_time_tracks_slowest_device(self):
+        devices = {f"sw{i}": _driver("", delay=0.2) for i in range(10)}
+        fabric = FabricReconciler(devices, {}, max_workers=10).plan()
+        assert fabric.seconds < 1.0
+        assert all(dev.read_seconds >= 0.2 for dev in fabric.devices.values())
+
+    def test_hung_and_failing_devices_are_reported(self):
+        def refuse():
+            raise ConnectionError("refused")
+
+        devices = {
+            "ok": _driver(""),
+            "hung": _driver("", delay=5),
+            "down": refuse,
+        }
+        fabric = FabricReconciler(devices, {}, timeout=0.3).plan()
+        assert fabric.devices["ok"].plan is not None
+        assert fabric.failed["hung"].startswith("TimeoutError")
+        assert fabric.failed["down"] == "ConnectionError: refused"
+
+    def test_connect_callable_is_disconnected(self):
+        driver = _driver(_rc(100, 5000))
+        closed = []
+        driver.disconnect = lambda: closed.append(True)
+        FabricReconciler({"sw1": lambda: driver}, {}).plan()
+        assert closed == [True]
+
+    def test_intent_for_unknown_device_raises(self):
+        with pytest.raises(ValueError):
+            FabricReconciler({}, {"ghost": []})
+
+
+class TestIncrementalReconcile:
+    def test_quiet_device_reuses_plan(self):
+        d = _driver(_rc(100, 5000))
+        rec = FabricReconciler(
+            {"sw1": d}, {"sw1": [circuit(5000, 100)]}, incremental=True
+        )
+        first = rec.plan().devices["sw1"]
+        second = rec.plan().devices["sw1"]
+
+        assert first.rediffed == 1 and not first.cached
+        assert second.cached and second.rediffed == 0
+        assert second.plan == first.plan
+
+    def test_cheap_fingerprint_skips_config_pull(self):
+        d = _driver(_rc(100, 5000))
+        calls = count_calls(d, "get_config")
+        d.get_config_fingerprint = lambda: "rev-1"
+        rec = FabricReconciler(
+            {"sw1": d}, {"sw1": [circuit(5000, 100)]}, incremental=True
+        )
+        rec.plan()
+        rec.plan()
+        assert calls["get_config"] == 1  # second pass: fingerprint only
+
+    def test_intent_change_rediffs_only_changed_vnis(self):
+        config = _rcs((100, 5000, "SO101010"), (101, 5001, "SO101011"))
+        d = _driver(config)
+        intent = [circuit(5000, 100), circuit(5001, 101, "SO101011")]
+        rec = FabricReconciler({"sw1": d}, {"sw1": intent}, incremental=True)
+        assert rec.plan().devices["sw1"].rediffed == 2
+
+        rec.set_intent("sw1", intent + [circuit(5002, 102, "SO101012")])
+        dev = rec.plan().devices["sw1"]
+        assert dev.rediffed == 1
+        assert dev.plan.to_create == [5002]
+        assert dev.plan.in_sync == [5000, 5001]
+
+    def test_config_change_rediffs_only_changed_vnis(self):
+        state = {"config": _rcs((100, 5000, "SO101010"), (101, 5001, "SO101011"))}
+        d = _driver("")
+        d.get_config = lambda: state["config"]
+        intent = [circuit(5000, 100), circuit(5001, 101, "SO101011")]
+        rec = FabricReconciler({"sw1": d}, {"sw1": intent}, incremental=True)
+        rec.plan()
+
+        # VNI 5001 drifts to another VLAN; 5000 untouched
+        state["config"] = _rcs((100, 5000, "SO101010"), (201, 5001, "SO101011"))
+        dev = rec.plan().devices["sw1"]
+        assert dev.rediffed == 1
+        assert list(dev.plan.to_update) == [5001]
+        assert dev.plan.in_sync == [5000]
+
+    def test_returned_plan_is_not_the_cache(self):
+        d = _driver(_rc(100, 5000))
+        rec = FabricReconciler(
+            {"sw1": d}, {"sw1": [circuit(5000, 100)]}, incremental=True
+        )
+        rec.plan().devices["sw1"].plan.in_sync.clear()
+        cached = rec.plan().devices["sw1"]
+        cached.plan.to_create.append(1)
+        assert cached.cached and cached.plan.in_sync == [5000]
+        assert rec.plan().devices["sw1"].plan.to_create == []
+
+    def test_diffs_per_vni_without_full_reconciles(self, monkeypatch):
+        def full(*args):
+            raise AssertionError("plan_reconcile per VNI")
+
+        monkeypatch.setattr("netauto.fabric.plan_reconcile", full)
+        config = _rcs(*((100 + i, 5000 + i, f"SO{i}") for i in range(20)))
+        intent = [circuit(5000 + i, 100 + i, f"SO{i}") for i in range(19)]
+        dev = (
+            FabricReconciler(
+                {"sw1": _driver(config)}, {"sw1": intent}, incremental=True
+            )
+            .plan()
+            .devices["sw1"]
+        )
+        assert dev.error is None
+        assert dev.plan.in_sync == [5000 + i for i in range(19)]
+        assert dev.plan.to_delete == [5019]
+
+    def test_matches_full_reconcile(self):
+        config = _rcs((100, 5000, "SO101010"), (300, 7000, "SO999"))
+        intent = {"sw1": [circuit(5000, 100), circuit(5001, 101, "SO2")]}
+        full = FabricReconciler({"sw1": _driver(config)}, intent).plan()
+        incr = FabricReconciler(
+            {"sw1": _driver(config)}, intent, incremental=True
+        ).plan()
+        assert incr.devices["sw1"].plan == full.devices["sw1"].plan
+
+
+class TestFabricAuditor:
+    def test_streams_devices_and_reports_collisions(self):
+        devices = {
+            "sw1": _driver(_rc(100, 5000, key="SO101010")),
+            "sw2": _driver(_rc(100, 5000, key="SO202020")),  # same VNI, other service
+            "sw3": _driver(_rc(200, 6000, key="SO303030")),
+        }
+        seen = []
+        audit = FabricAuditor(devices).audit(
+            on_device=lambda name, circuits: seen.append((name, len(circuits)))
+        )
+        assert sorted(seen) == [("sw1", 1), ("sw2", 1), ("sw3", 1)]
+        assert audit.vni_collisions == {5000: ["SO101010", "SO202020"]}
+        assert audit.single_ended == {6000: "sw3"}
+        assert audit.errors == {}
+
+    def test_partial_results_when_a_device_hangs(self):
+        devices = {
+            "sw1": _driver(_rc(100, 5000)),
+            "hung": _driver(_rc(100, 5000), delay=5),
+        }
+        started = time.perf_counter()
+        audit = FabricAuditor(devices, timeout=0.3).audit()
+        assert time.perf_counter() - started < 2
+        assert list(audit.circuits) == ["sw1"]
+        assert audit.errors["hung"].startswith("TimeoutError")
+        assert audit.single_ended == {5000: "sw1"}
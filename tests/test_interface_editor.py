@@ -0,0 +1,153 @@
+import pytest
+from pydantic import ValidationError
+
+from netauto.drivers import AristaDriver, MockDriver
+from netauto.exceptions import InterfaceNotFound
+from netauto.logic import InterfaceEditor
+from netauto.models import Interface, InterfaceChange
+
+from .conftest import count_calls
+
+
+def _driver(platform="arista_eos"):
+    prefix = "Ethernet" if platform == "arista_eos" else "eth"
+    d = MockDriver(
+        platform=platform,
+        initial_interfaces=[
+            Interface(name=f"{prefix}1", description="SO1", mtu=1500),
+            Interface(name=f"{prefix}2", mtu=9214),
+            Interface(name=f"{prefix}3", enabled=False),
+        ],
+    )
+    count_calls(d, "get_interfaces")
+    return d
+
+
+class TestInterfaceEditor:
+    def test_plan_keeps_only_real_changes(self):
+        editor = InterfaceEditor(_driver())
+        planned = editor.plan(
+            {
+                "Ethernet1": {
+                    "description": "SO1",
+                    "mtu": 9214,
+                },  # description unchanged
+                "Ethernet2": {"mtu": 9214},  # nothing to do
+                "Ethernet3": {
+                    "enabled": True,
+                    "description": "",
+                },  # "" == no description
+            }
+        )
+        assert planned == [
+            InterfaceChange(name="Ethernet1", mtu=9214),
+            InterfaceChange(name="Ethernet3", enabled=True),
+        ]
+
+    def test_apply_reads_once_and_pushes_once(self):
+        d = _driver()
+        pushes = []
+        push = d.push_config
+        d.push_config = lambda cmds, dry_run=False: (
+            pushes.append(cmds) or push(cmds, dry_run)
+        )
+
+        InterfaceEditor(d).apply(
+            {
+                "Ethernet1": {"description": "SO99"},
+                "Ethernet2": {"mtu": 9214},
+                "Ethernet3": {"enabled": True},
+            }
+        )
+        assert d.calls["get_interfaces"] == 1
+        assert len(pushes) == 1
+        assert pushes[0] == [
+            "interface Ethernet1",
+            "   description SO99",
+            "interface Ethernet3",
+            "   no shutdown",
+        ]
+
+    def test_no_change_no_push(self):
+        d = _driver()
+        assert InterfaceEditor(d).apply({"Ethernet2": {"mtu": 9214}}) == ""
+        assert d.pushed_commands == []
+
+    def test_ocnos_coalesces_one_document(self):
+        d = _driver("ipinfusion_ocnos")
+        InterfaceEditor(d).apply(
+            {
+                "eth1": {"description": ""},
+                "eth2": {"mtu": 1500},
+            }
+        )
+        [xml] = d.pushed_commands
+        assert xml.count("<if:interfaces>") == 1
+        assert '<if:description nc:operation="remove"/>' in xml
+        assert "<if:mtu>1500</if:mtu>" in xml
+
+    def test_unknown_interface_raises_before_push(self):
+        d = _driver()
+        with pytest.raises(InterfaceNotFound, match="Ethernet9"):
+            InterfaceEditor(d).apply(
+                {"Ethernet1": {"mtu": 9000}, "Ethernet9": {"mtu": 9000}}
+            )
+        assert d.pushed_commands == []
+
+    def test_unknown_field_rejected(self):
+        with pytest.raises(ValidationError):
+            InterfaceEditor(_driver()).plan({"Ethernet1": {"speed": "100g"}})
+
+
+class _ShowInterfacesNode:
+    """eAPI stub answering ``show interfaces`` for AristaDriver.get_interfaces."""
+
+    def enable(self, commands, **kwargs):
+        return [
+            {
+                "result": {
+                    "interfaces": {
+                        "Ethernet1": {
+                            "description": "SO1",
+                            "mtu": 1500,
+                            "interfaceStatus": "disabled",
+                        },
+                        "Ethernet2": {
+                            "description": "",
+                            "mtu": 9214,
+                            "interfaceStatus": "connected",
+                        },
+                    }
+                }
+            }
+        ]
+
+
+class TestReadBackFields:
+    def test_arista_admin_down_and_jumbo_ports_are_edited(self):
+        d = AristaDriver("sw1", "admin", "secret")
+        d.node = _ShowInterfacesNode()
+        planned = InterfaceEditor(d).plan(
+            {
+                "Ethernet1": {"enabled": True, "description": "SO1"},
+                "Ethernet2": {"mtu": 1500, "description": ""},
+            }
+        )
+        assert planned == [
+            InterfaceChange(name="Ethernet1", enabled=True),
+            InterfaceChange(name="Ethernet2", mtu=1500),
+        ]
+
+    def test_fields_the_driver_cannot_read_are_always_pushed(self):
+        d = _driver("ipinfusion_ocnos")
+        d.interface_fields = ("description",)  # as OcnosDriver
+        planned = InterfaceEditor(d).plan(
+            {
+                "eth1": {"description": "SO1", "mtu": 1500},
+                "eth2": {"enabled": True},
+            }
+        )
+        assert planned == [
+            InterfaceChange(name="eth1", mtu=1500),
+            InterfaceChange(name="eth2", enabled=True),
+        ]
@@ -1,9 +1,11 @@
 import pytest
-from netauto.models import Interface, Vlan, Lag
+from netauto.models import Interface, LagOperation, Vlan, Lag
 from netauto.drivers import MockDriver
 from netauto.logic import LagManager
 from netauto.exceptions import NetAutoException
 
+from .conftest import count_calls
+
 
 class TestLagManagerArista:
     def _driver(self):
@@ -203,3 +205,90 @@ class TestLagManagerOcnos:
         joined = "\n".join(driver.pushed_commands)
         assert 'nc:operation="remove"' in joined
         assert "<if:name>po10</if:name>" in joined
+
+
+def _op(action, lag_name, ports, **kw):
+    return LagOperation(action=action, lag_name=lag_name, member_ports=ports, **kw)
+
+
+class TestLagManagerApplyMany:
+    def _driver(self, platform="arista_eos"):
+        prefix, port = (
+            ("po", "eth")
+            if platform == "ipinfusion_ocnos"
+            else ("Port-Channel", "Ethernet")
+        )
+        d = MockDriver(
+            platform=platform,
+            initial_interfaces=[
+                Lag(name=f"{prefix}1", members=[Interface(name=f"{port}1")]),
+                Interface(name=f"{port}1", lag_member_of=f"{prefix}1"),
+            ]
+            + [Interface(name=f"{port}{i}") for i in range(2, 9)],
+            initial_switchports=[Interface(name=f"{port}{i}") for i in range(2, 9)],
+        )
+        count_calls(d, "get_interfaces", "get_switchports", "push_config")
+        return d
+
+    def test_batch_is_one_read_and_one_push(self):
+        d = self._driver()
+        LagManager(d).apply_many(
+            [
+                _op("create", "Port-Channel10", ["Ethernet2", "Ethernet3"]),
+                _op("create", "Port-Channel11", ["Ethernet4", "Ethernet5"]),
+                _op("add_members", "Port-Channel1", ["Ethernet6"]),
+                _op("remove_members", "Port-Channel1", ["Ethernet1"]),
+            ]
+        )
+        assert d.calls == {"get_interfaces": 1, "get_switchports": 1, "push_config": 1}
+        pushed = "\n".join(d.pushed_commands)
+        assert "interface Port-Channel10" in pushed
+        assert "interface Port-Channel11" in pushed
+        assert "channel-group 1 mode active" in pushed
+        assert "no channel-group" in pushed
+
+    def test_same_port_in_two_lags_is_refused(self):
+        d = self._driver()
+        with pytest.raises(NetAutoException, match="used by both"):
+            LagManager(d).apply_many(
+                [
+                    _op("create", "Port-Channel10", ["Ethernet2", "Ethernet3"]),
+                    _op("create", "Port-Channel11", ["Ethernet3", "Ethernet4"]),
+                ]
+            )
+        assert d.calls["push_config"] == 0  # nothing pushed on a bad batch
+
+    def test_lag_created_in_batch_can_be_grown(self):
+        d = self._driver()
+        LagManager(d).apply_many(
+            [
+                _op("create", "Port-Channel10", ["Ethernet2"]),
+                _op("add_members", "Port-Channel10", ["Ethernet3"]),
+            ]
+        )
+        assert d.calls["push_config"] == 1
+
+    def test_port_can_move_between_lags(self):
+        d = self._driver()
+        LagManager(d).apply_many(
+            [
+                _op("remove_members", "Port-Channel1", ["Ethernet1"]),
+                _op("create", "Port-Channel10", ["Ethernet1", "Ethernet2"]),
+            ]
+        )
+        assert d.calls["push_config"] == 1
+
+    def test_remove_only_batch_skips_switchports(self):
+        d = self._driver()
+        LagManager(d).apply_many(
+            [_op("remove_members", "Port-Channel1", ["Ethernet1"])]
+        )
+        assert d.calls["get_switchports"] == 0
+
+    def test_ocnos_batch_is_one_transaction(self):
+        d = self._driver("ipinfusion_ocnos")
+        LagManager(d).apply_many(
+            [_op("create", f"po{10 + i}", [f"eth{2 + i}"]) for i in range(4)]
+        )
+        assert d.calls["push_config"] == 1
+        assert len(d.pushed_commands) == 4  # one payload per LAG, one commit
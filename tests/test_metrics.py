@@ -0,0 +1,171 @@
+"""Driver RPC metrics and the Prometheus exporter (netauto.metrics)."""
+
+import urllib.request
+
+import pytest
+
+from netauto import metrics
+from netauto.drivers import AristaDriver, DeviceDriver, MockDriver
+from netauto.evpn import EvpnManager
+from netauto.models import Evpn, Interface, Vlan
+
+
+@pytest.fixture
+def rpc():
+    instrumented = metrics.instrument()
+    yield instrumented
+    metrics.uninstrument()
+
+
+def _labels(device="arista_eos", rpc="get_vnis", platform="arista_eos"):
+    return {"device": device, "platform": platform, "rpc": rpc}
+
+
+class _FakeNode:
+    _session_name = "s1"
+
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def enable(self, commands, **kwargs):
+        if self.fail:
+            raise ConnectionError("eAPI down")
+        return [{"result": {"output": "!\nvlan 100\n!\n"}}]
+
+    def configure_session(self):
+        pass
+
+    def config(self, commands):
+        pass
+
+    def diff(self):
+        return "+vlan 100"
+
+    def commit(self):
+        pass
+
+
+class TestHistogram:
+    def test_cumulative_buckets_sum_and_count(self):
+        reg = metrics.MetricsRegistry()
+        h = reg.histogram("x_seconds", "X.", ("rpc",), buckets=(0.1, 1.0))
+        for v in (0.05, 0.1, 0.5, 3.0):
+            h.observe(v, rpc="get")
+        text = reg.render()
+        assert 'x_seconds_bucket{rpc="get",le="0.1"} 2' in text  # le is inclusive
+        assert 'x_seconds_bucket{rpc="get",le="1"} 3' in text
+        assert 'x_seconds_bucket{rpc="get",le="+Inf"} 4' in text
+        assert 'x_seconds_count{rpc="get"} 4' in text
+        assert h.snapshot(rpc="get") == (4, pytest.approx(3.65))
+
+    def test_counter_render_and_label_escaping(self):
+        reg = metrics.MetricsRegistry()
+        c = reg.counter("hits_total", "Hits.", ("device",))
+        c.inc(device='pop"1')
+        c.inc(2, device='pop"1')
+        assert "# TYPE hits_total counter" in reg.render()
+        assert 'hits_total{device="pop\\"1"} 3' in reg.render()
+
+    def test_label_and_registration_guards(self):
+        reg = metrics.MetricsRegistry()
+        c = reg.counter("a_total", "A.", ("device",))
+        with pytest.raises(ValueError):
+            c.inc(rpc="x")
+        with pytest.raises(ValueError):
+            c.inc(-1, device="sw1")
+        assert reg.counter("a_total", "A.", ("device",)) is c
+        with pytest.raises(ValueError):
+            reg.histogram("a_total", "A.", ("device",))
+
+
+class TestDriverInstrumentation:
+    def test_off_by_default(self):
+        assert DeviceDriver.metrics is None
+        MockDriver().get_vnis()  # nothing to record into
+
+    def test_rpc_latency_and_fallback_sizes(self, rpc):
+        d = MockDriver()
+        d.get_vnis()
+        d.push_config(["vlan 100", "   name SO1"])
+        assert rpc.duration.snapshot(**_labels())[0] == 1
+        push = _labels(rpc="push_config")
+        assert rpc.request_bytes.value(**push) == len("vlan 100\n   name SO1\n")
+        assert rpc.response_bytes.value(**push) == len("vlan 100\n   name SO1")
+
+    def test_manager_operation_records_each_rpc(self, rpc):
+        d = MockDriver(
+            initial_interfaces=[Interface(name="Ethernet6")],
+            initial_switchports=[Interface(name="Ethernet6", mode="trunk")],
+        )
+        evpn = Evpn(
+            vlan=Vlan(vlan_id=100, name="SO1"), asn=65001, vni=5000, description="SO1"
+        )
+        EvpnManager(d).create_circuit("Ethernet6", evpn, create_vrf=False)
+        for name in ("get_interfaces", "get_switchports", "get_vnis", "push_config"):
+            assert rpc.duration.snapshot(**_labels(rpc=name))[0] == 1
+
+    def test_per_driver_override(self, rpc):
+        own = metrics.DriverMetrics()
+        d = MockDriver()
+        d.metrics = own
+        d.get_vnis()
+        assert own.duration.snapshot(**_labels())[0] == 1
+        assert rpc.duration.snapshot(**_labels())[0] == 0
+
+    def test_arista_reports_wire_sizes(self, rpc):
+        d = AristaDriver("sw1", "admin", "secret")
+        d.node = _FakeNode()
+        assert d.get_config() == "!\nvlan 100\n!\n"
+        labels = _labels(device="sw1", rpc="get_config")
+        assert rpc.request_bytes.value(**labels) == len("show running-config")
+        assert rpc.response_bytes.value(**labels) > len("!\nvlan 100\n!\n")  # JSON
+
+        d.push_config(["vlan 100"])
+        push = _labels(device="sw1", rpc="push_config")
+        assert rpc.response_bytes.value(**push) >= len("+vlan 100")
+
+    def test_raised_and_swallowed_errors_are_counted(self, rpc):
+        d = AristaDriver("sw1", "admin", "secret")
+        d.node = _FakeNode(fail=True)
+        assert d.get_vnis() == {}  # swallowed by the driver
+        with pytest.raises(ConnectionError):
+            d.get_config()
+        assert rpc.errors.value(**_labels(device="sw1", rpc="get_vnis")) == 1
+        assert rpc.errors.value(**_labels(device="sw1", rpc="get_config")) == 1
+
+    def test_lock_wait(self, rpc):
+        class Locking(MockDriver):
+            def push_config(self, commands, dry_run=False):
+                with metrics.lock_wait():
+                    pass
+                return super().push_config(commands, dry_run)
+
+        Locking().push_config(["vlan 1"])
+        # counted once although the subclass calls the wrapped base method
+        assert rpc.duration.snapshot(**_labels(rpc="push_config"))[0] == 1
+        assert (
+            rpc.lock_wait.snapshot(device="arista_eos", platform="arista_eos")[0] == 1
+        )
+
+
+class TestExport:
+    def test_write_textfile(self, rpc, tmp_path):
+        MockDriver().get_vnis()
+        out = tmp_path / "netauto.prom"
+        metrics.write_textfile(rpc.registry, out)
+        text = out.read_text()
+        assert "# TYPE netauto_rpc_duration_seconds histogram" in text
+        assert 'rpc="get_vnis"' in text
+        assert list(tmp_path.iterdir()) == [out]  # no temp file left behind
+
+    def test_http_server(self, rpc):
+        MockDriver().get_vnis()
+        server = metrics.MetricsServer(rpc.registry)
+        host, port = server.start()
+        try:
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics") as resp:
+                body = resp.read().decode()
+                assert resp.headers["Content-Type"].startswith("text/plain")
+        finally:
+            server.stop()
+        assert "netauto_rpc_duration_seconds_count" in body
@@ -0,0 +1,270 @@
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from netauto import registry_service
+from netauto.allocation import (
+    JournalRegistry,
+    JsonFileRegistry,
+    PooledRegistry,
+    SqliteRegistry,
+)
+from netauto.exceptions import NetAutoException, RtCollision, SeedConflict, VniExhausted
+from netauto.models import AzureEvpn, EvpnCircuit
+from netauto.registry_service import RegistryServer, RemoteRegistry
+
+from .conftest import circuit
+
+
+@pytest.fixture
+def served(tmp_path):
+    server = RegistryServer(
+        JsonFileRegistry(tmp_path / "vni.json", base_vni=10000),
+        socket_path=tmp_path / "vni.sock",
+    )
+    server.start()
+    clients = []
+
+    def connect():
+        client = RemoteRegistry(socket_path=server.address)
+        clients.append(client)
+        return client
+
+    yield server, connect
+    for client in clients:
+        client.close()
+    server.stop()
+
+
+class TestRemoteRegistry:
+    def test_registry_contract(self, served):
+        server, connect = served
+        reg = connect()
+        assert reg.allocate("SOA", rt="37195:A") == 10000
+        assert reg.allocate("SOA") == 10000
+        assert reg.allocate_many([("SOB", None), ("SOC", None)]) == [10001, 10002]
+        assert reg.get("SOB") == 10001
+        reg.release_many(["SOB", "SOC"])
+        reg.record("SOD", 5000, "37195:D")
+        assert reg.assignments() == {
+            "SOA": {"vni": 10000, "rt": "37195:A"},
+            "SOD": {"vni": 5000, "rt": "37195:D"},
+        }
+        assert server.registry.get("SOD") == 5000  # one authoritative copy
+
+    def test_errors_keep_their_type(self, served):
+        _, connect = served
+        reg = connect()
+        reg.allocate("SOA", rt="37195:A")
+        with pytest.raises(RtCollision):
+            reg.allocate("SOB", rt="37195:A")
+        with pytest.raises(SeedConflict) as exc:
+            reg.seed_from_circuits(
+                [circuit(10000, key="SOX"), circuit(10000, key="SOY")]
+            )
+        assert len(exc.value.conflicts) == 2
+        with pytest.raises(ValueError, match="unknown method"):
+            reg.call("delete_everything")
+
+    def test_seed_round_trips_circuits(self, served):
+        _, connect = served
+        reg = connect()
+        azure = EvpnCircuit(
+            evpn=AzureEvpn(description="SOZ", asn=1, vni=6000, s_tag=500, role="cni"),
+        )
+        reg.seed_from_circuits([circuit(5000, key="SOA"), azure])
+        assert reg.get("SOA") == 5000 and reg.get("SOZ") == 6000
+
+    def test_pipelined_submits(self, served):
+        _, connect = served
+        reg = connect()
+        futures = [reg.submit("allocate", service_key=f"SO{i}") for i in range(300)]
+        assert [f.result(timeout=10) for f in futures] == list(range(10000, 10300))
+
+    def test_concurrent_clients_share_one_allocator(self, served):
+        _, connect = served
+        clients = [connect() for _ in range(4)]
+
+        def worker(n):
+            for i in range(50):
+                clients[n].allocate(f"SO{n}-{i}")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        vnis = sorted(a["vni"] for a in clients[0].assignments().values())
+        assert vnis == list(range(10000, 10200))
+
+    def test_tcp_and_sqlite_backend(self, tmp_path):
+        server = RegistryServer(
+            SqliteRegistry(tmp_path / "vni.db", base_vni=1, max_vni=2)
+        )
+        host, port = server.start()
+        reg = RemoteRegistry(host=host, port=port)
+        try:
+            assert reg.allocate_many([("A", None), ("B", None)]) == [1, 2]
+            with pytest.raises(VniExhausted):
+                reg.allocate("C")
+        finally:
+            reg.close()
+            server.stop()
+
+    def test_pending_calls_fail_when_the_server_goes_away(self, served):
+        server, connect = served
+        reg = connect()
+        reg.allocate("SOA")
+        server.stop()
+        with pytest.raises((ConnectionError, OSError)):
+            reg.allocate("SOB")
+
+    def test_registry_calls_run_off_the_event_loop(self, tmp_path):
+        threads = []
+
+        class Recording(JsonFileRegistry):
+            def allocate(self, service_key, rt=None):
+                threads.append(threading.current_thread().name)
+                return super().allocate(service_key, rt)
+
+        server = RegistryServer(
+            Recording(tmp_path / "vni.json"), socket_path=tmp_path / "vni.sock"
+        )
+        server.start()
+        reg = RemoteRegistry(socket_path=server.address)
+        try:
+            reg.allocate("SOA")
+            assert threads[0].startswith("netauto-registry-call")
+            assert server._thread.name not in threads
+        finally:
+            reg.close()
+            server.stop()
+
+    def test_timed_out_call_is_forgotten(self, tmp_path):
+        class Slow(JsonFileRegistry):
+            def get(self, service_key):
+                time.sleep(0.3)
+                return super().get(service_key)
+
+        server = RegistryServer(
+            Slow(tmp_path / "vni.json"), socket_path=tmp_path / "vni.sock"
+        )
+        server.start()
+        reg = RemoteRegistry(socket_path=server.address, timeout=0.05)
+        try:
+            with pytest.raises(TimeoutError):
+                reg.get("SOA")
+            assert not reg._pending
+            reg.timeout = 5
+            assert reg.allocate("SOA") == 10000  # late reply was dropped
+        finally:
+            reg.close()
+            server.stop()
+
+
+def test_malformed_reply_fails_the_call_but_not_the_client(tmp_path):
+    path = str(tmp_path / "fake.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen()
+
+    def fake_server():
+        conn, _ = listener.accept()
+        with conn, conn.makefile("rb") as lines:
+            request = json.loads(lines.readline())  # vni_range on connect
+            conn.sendall(
+                json.dumps({"id": request["id"], "result": [1, 9]}).encode() + b"\n"
+            )
+            lines.readline()
+            conn.sendall(b"not json\n")
+            request = json.loads(lines.readline())
+            conn.sendall(
+                json.dumps({"id": request["id"], "result": 7}).encode() + b"\n"
+            )
+            lines.readline()  # until the client hangs up
+
+    thread = threading.Thread(target=fake_server, daemon=True)
+    thread.start()
+    reg = RemoteRegistry(socket_path=path, timeout=5)
+    try:
+        with pytest.raises(NetAutoException, match="malformed reply"):
+            reg.get("SOA")
+        assert reg.get("SOA") == 7
+    finally:
+        reg.close()
+        listener.close()
+
+
+def test_cli_serves_a_journal_registry(tmp_path, monkeypatch):
+    served = []
+    monkeypatch.setattr(
+        RegistryServer, "serve_forever", lambda self: served.append(self)
+    )
+    registry_service.main(
+        ["--journal", str(tmp_path / "vni"), "--max-vni", "10999", "--port", "0"]
+    )
+    registry = served[0].registry
+    assert isinstance(registry, JournalRegistry)
+    assert (registry.base_vni, registry.max_vni) == (10000, 10999)
+
+
+class TestSocketPath:
+    def test_refuses_to_take_over_a_live_server(self, served):
+        server, connect = served
+        second = RegistryServer(server.registry, socket_path=server.address)
+        with pytest.raises(NetAutoException, match="already listening"):
+            second.start()
+        assert connect().allocate("SOA") == 10000  # the first one still answers
+
+    def test_replaces_a_stale_socket(self, tmp_path):
+        path = str(tmp_path / "vni.sock")
+        dead = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        dead.bind(path)
+        dead.close()  # the file stays, nobody listens
+        server = RegistryServer(
+            JsonFileRegistry(tmp_path / "vni.json"), socket_path=path
+        )
+        server.start()
+        reg = RemoteRegistry(socket_path=path)
+        try:
+            assert reg.allocate("SOA") == 10000
+        finally:
+            reg.close()
+            server.stop()
+
+    def test_refuses_a_regular_file(self, tmp_path):
+        path = tmp_path / "vni.sock"
+        path.write_text("not a socket")
+        server = RegistryServer(
+            JsonFileRegistry(tmp_path / "vni.json"), socket_path=path
+        )
+        with pytest.raises(NetAutoException, match="not a socket"):
+            server.start()
+        assert path.read_text() == "not a socket"
+
+
+def test_remote_registry_as_a_pool(tmp_path):
+    server = RegistryServer(
+        JsonFileRegistry(tmp_path / "vni.json", base_vni=20000, max_vni=20999),
+        socket_path=tmp_path / "vni.sock",
+    )
+    server.start()
+    remote = RemoteRegistry(socket_path=server.address)
+    try:
+        assert (remote.base_vni, remote.max_vni) == (20000, 20999)
+        reg = PooledRegistry(
+            {
+                "local": JsonFileRegistry(tmp_path / "local.json", 10000, 10999),
+                "remote": remote,
+            },
+            default_pool="remote",
+        )
+        assert reg.allocate("SOA") == 20000
+        reg.record("SOB", 10005, None)
+        assert reg.pool_of("SOB") == "local"
+    finally:
+        remote.close()
+        server.stop()
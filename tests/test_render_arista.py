@@ -1,6 +1,7 @@
 import pytest
+from netauto.render import arista as arista_render
 from netauto.render.arista import AristaDeviceRenderer
-from netauto.models import Evpn, Vlan, Interface, Lag, RoutingInstance, Asn, AzureEvpn
+from netauto.models import Evpn, Vlan, Interface, InterfaceChange, Lag, RoutingInstance, Asn, AzureEvpn
 
 
 class TestAristaDeviceRenderer:
@@ -384,3 +385,87 @@ no vlan 30"""
         == """router bgp 65511
    no vlan-aware-bundle SO9999"""
     )
+
+
+class TestAristaTemplateCache:
+    def test_renderers_share_one_environment(self):
+        a, b = AristaDeviceRenderer(), AristaDeviceRenderer()
+        assert a.env is b.env
+        # every shipped template is compiled once, up front
+        assert a._template("arista_eos/evpn.j2") is b._template("arista_eos/evpn.j2")
+        assert "arista_eos/lag.j2" in arista_render._TEMPLATES
+
+    def test_bytecode_cache_directory_from_env(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NETAUTO_JINJA_CACHE", str(tmp_path / "jinja"))
+        cache = arista_render._bytecode_cache()
+        assert cache is not None and cache.directory == str(tmp_path / "jinja")
+
+    def test_bytecode_cache_can_be_disabled(self, monkeypatch):
+        monkeypatch.setenv("NETAUTO_JINJA_CACHE", "")
+        assert arista_render._bytecode_cache() is None
+
+
+class TestAristaRenderEvpnMany:
+    def setup_method(self):
+        self.renderer = AristaDeviceRenderer()
+
+    @staticmethod
+    def _item(key, vlan, vni, interface="Ethernet6"):
+        return (
+            Interface(name=interface),
+            Evpn(vlan=Vlan(vlan_id=vlan, name=key), asn=65001, vni=vni,
+                 description=key),
+            RoutingInstance(instance_name=key, instance_type="mac-vrf",
+                            rd=f"65001:{key[2:]}", rt_rd=f"37195:{key[2:]}"),
+        )
+
+    def test_bundle_sub_mode_is_closed_before_next_vlan(self):
+        """Each block returns to global config, so `vlan 200` can't land in the
+        previous vlan-aware-bundle."""
+        cfg = self.renderer.render_evpn_many(
+            [self._item("SO1", 100, 5000), self._item("SO2", 200, 5001)]
+        )
+        assert cfg[cfg.index("      vlan add 100") + 1 :][:3] == [
+            "      exit", "   exit", "vlan 200"
+        ]
+        # VRFs first, then circuits
+        assert cfg.index("   vlan-aware-bundle SO2") < cfg.index("vlan 100")
+
+    def test_shared_vrf_rendered_once(self):
+        a = self._item("SO1", 100, 5000)
+        b = self._item("SO1", 101, 5000, interface="Ethernet7")
+        cfg = "\n".join(self.renderer.render_evpn_many([a, b]))
+        assert cfg.count("rd 65001:1") == 1
+        assert "switchport trunk allowed vlan add 101" in cfg
+
+    def test_conflicting_vrf_definitions_raise(self):
+        a = self._item("SO1", 100, 5000)
+        b = (a[0], a[1], a[2].model_copy(update={"rd": "65001:999"}))
+        with pytest.raises(ValueError):
+            self.renderer.render_evpn_many([a, b])
+
+    def test_azure_and_no_vrf(self):
+        azure = AzureEvpn(description="SO3", asn=65001, vni=6000, s_tag=500,
+                          role="cni")
+        cfg = self.renderer.render_evpn_many([(Interface(name="Ethernet7"), azure, None)])
+        assert "   vxlan vlan 500 vni 6000" in cfg
+        assert not any(line.strip().startswith("rd ") for line in cfg)
+
+
+class TestAristaRenderInterfaceChanges:
+    def test_only_set_fields_are_rendered(self):
+        cfg = AristaDeviceRenderer().render_interface_changes([
+            InterfaceChange(name="Ethernet1", mtu=9214, description="SO1 <core>"),
+            InterfaceChange(name="Ethernet2", description="", enabled=False),
+            InterfaceChange(name="Ethernet3", enabled=True),
+        ])
+        assert cfg == [
+            "interface Ethernet1",
+            "   mtu 9214",
+            "   description SO1 <core>",
+            "interface Ethernet2",
+            "   no description",
+            "   shutdown",
+            "interface Ethernet3",
+            "   no shutdown",
+        ]
@@ -0,0 +1,56 @@
+"""Defaults on the DeviceRenderer ABC that third-party renderers inherit."""
+
+import pytest
+
+from netauto.models import Evpn, Interface, InterfaceChange, RoutingInstance, Vlan
+from netauto.render.base import DeviceRenderer
+
+
+class _MinimalRenderer(DeviceRenderer):
+    """Implements only the abstract methods, as an out-of-tree renderer would."""
+
+    def render_interface(self, interface):
+        return []
+
+    render_interface_delete = render_lag = render_lag_delete = render_interface
+    render_lag_add_members = render_lag_remove_members = render_interface
+    render_vlan = render_vlan_delete = render_evpn_delete = render_interface
+
+    def render_evpn(self, interface, evpn):
+        return [f"{interface.name} vni {evpn.vni}"]
+
+    def render_routing_instance(self, asn, vrf):
+        return f"vrf {vrf.instance_name} asn {asn.asn}"
+
+
+def _evpn(vni):
+    return Evpn(vlan=Vlan(vlan_id=vni - 4900), asn=65001, vni=vni, description="SO1")
+
+
+RI = RoutingInstance(
+    instance_name="SO1", instance_type="mac-vrf", rd="65001:1", rt_rd="37195:1"
+)
+
+
+def test_render_evpn_many_default_concatenates_per_circuit_payloads():
+    renderer = _MinimalRenderer()  # instantiable without overriding it
+    payload = renderer.render_evpn_many(
+        [
+            (Interface(name="eth1"), _evpn(5000), RI),
+            (Interface(name="eth2"), _evpn(5001), RI),
+            (Interface(name="eth3"), _evpn(5002), None),
+        ]
+    )
+    assert payload == [
+        "vrf SO1 asn 65001",  # shared VRF rendered once, first
+        "eth1 vni 5000",
+        "eth2 vni 5001",
+        "eth3 vni 5002",
+    ]
+
+
+def test_interface_changes_are_optional():
+    with pytest.raises(NotImplementedError, match="_MinimalRenderer"):
+        _MinimalRenderer().render_interface_changes(
+            [InterfaceChange(name="eth1", mtu=9000)]
+        )
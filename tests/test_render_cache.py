@@ -0,0 +1,96 @@
+"""Opt-in render memoisation (RenderCache on DeviceRenderer)."""
+
+import pytest
+
+from netauto.drivers import MockDriver
+from netauto.evpn import EvpnManager
+from netauto.models import AzureEvpn, Evpn, Interface, RoutingInstance, Vlan
+from netauto.render import AristaDeviceRenderer, OcnosDeviceRenderer, RenderCache
+
+
+def _evpn(vlan=100, vni=5000):
+    return Evpn(
+        vlan=Vlan(vlan_id=vlan, name="SO555"), asn=65001, vni=vni, description="SO555"
+    )
+
+
+RI = RoutingInstance(
+    instance_name="SO555", instance_type="mac-vrf", rd="65001:555", rt_rd="37195:555"
+)
+
+
+class TestRenderCache:
+    def test_disabled_by_default(self):
+        assert AristaDeviceRenderer().render_cache is None
+
+    @pytest.mark.parametrize(
+        "renderer_cls", [AristaDeviceRenderer, OcnosDeviceRenderer]
+    )
+    def test_equal_models_hit(self, renderer_cls):
+        renderer = renderer_cls()
+        cache = renderer.enable_render_cache()
+        first = renderer.render_evpn(Interface(name="eth4"), _evpn())
+        # a different but equal model instance is a hit
+        second = renderer.render_evpn(Interface(name="eth4"), _evpn())
+        assert first == second
+        assert cache.cache_info()[:2] == (1, 1)
+        renderer.render_evpn(Interface(name="eth4"), _evpn(vni=5001))
+        assert cache.cache_info().misses == 2
+
+    def test_model_type_is_part_of_the_key(self):
+        renderer = AristaDeviceRenderer()
+        cache = renderer.enable_render_cache()
+        renderer.render_evpn_many([(Interface(name="Ethernet6"), _evpn(), None)])
+        renderer.render_evpn_many(
+            [
+                (
+                    Interface(name="Ethernet6"),
+                    AzureEvpn(
+                        description="SO555", asn=65001, vni=5000, s_tag=100, role="cni"
+                    ),
+                    None,
+                )
+            ]
+        )
+        assert cache.cache_info().hits == 0
+
+    def test_cached_line_list_is_not_shared(self):
+        renderer = AristaDeviceRenderer()
+        renderer.enable_render_cache()
+        lines = renderer.render_evpn(Interface(name="Ethernet6"), _evpn())
+        lines.append("end")
+        assert "end" not in renderer.render_evpn(Interface(name="Ethernet6"), _evpn())
+
+    def test_lru_eviction(self):
+        renderer = AristaDeviceRenderer()
+        cache = renderer.enable_render_cache(maxsize=2)
+        for vni in (1, 2, 3):
+            renderer.render_evpn(Interface(name="Ethernet6"), _evpn(vni=vni))
+        info = cache.cache_info()
+        assert info.evictions == 1 and info.currsize == 2
+        renderer.render_evpn(Interface(name="Ethernet6"), _evpn(vni=1))  # evicted
+        assert cache.cache_info().hits == 0
+
+    def test_shared_cache_keys_on_platform(self):
+        cache = RenderCache()
+        arista, ocnos = AristaDeviceRenderer(), OcnosDeviceRenderer()
+        arista.enable_render_cache(cache=cache)
+        ocnos.enable_render_cache(cache=cache)
+        cli = arista.render_evpn(Interface(name="eth4"), _evpn())
+        xml = ocnos.render_evpn(Interface(name="eth4"), _evpn())
+        assert isinstance(cli, list) and isinstance(xml, str)
+        assert cache.cache_info()[:2] == (0, 2)
+
+    def test_repeat_create_circuit_renders_once(self):
+        driver = MockDriver(
+            platform="arista_eos",
+            initial_interfaces=[Interface(name="Ethernet6")],
+        )
+        cache = driver.renderer.enable_render_cache()
+        for _ in range(3):
+            EvpnManager(driver).create_circuit(
+                "Ethernet6", _evpn(), routing_instance=RI, dry_run=True
+            )
+        info = cache.cache_info()
+        assert info.misses == 2  # VRF + circuit
+        assert info.hits == 4
@@ -1,6 +1,6 @@
 import pytest
 from netauto.render.ocnos import OcnosDeviceRenderer
-from netauto.models import Evpn, Vlan, Interface, Lag, RoutingInstance, Asn, AzureEvpn
+from netauto.models import Evpn, Vlan, Interface, InterfaceChange, Lag, RoutingInstance, Asn, AzureEvpn
 
 
 class TestOcnosDeviceRenderer:
@@ -463,6 +463,22 @@ class TestOcnosDeviceRenderer:
         assert "<ethvpn:arp-cache-disable" in xml
         assert "<ethvpn:nd-cache-disable" in xml
 
+    def test_render_evpn_from_azure_is_one_document(self):
+        """The legacy from_azure path composes every part on one tree: a single
+        <config> root and no whitespace-only lines left over from re-parsing
+        pretty-printed fragments."""
+        evpn = Evpn(vlan=Vlan(vlan_id=10, name="SO555", s_tag=500), asn=65001,
+                    vni=6000, description="SO555")
+        for interface in (Interface(name="eth4"),
+                          Interface(name="eth4", arp_cache=False)):
+            for xml in (
+                self.renderer.render_evpn(interface, evpn, from_azure=True),
+                self.renderer.render_evpn_delete(interface, evpn, from_azure=True),
+            ):
+                assert xml.count("<config") == 1
+                assert all(line.strip() for line in xml.splitlines())
+                assert xml.count("<evpnmpls:evpn-mpls>") == 1
+
     def test_render_evpn_delete(self):
         """Test rendering evpn config"""
         xml = self.renderer.render_evpn_delete(
@@ -508,3 +524,56 @@ class TestOcnosDeviceRenderer:
 </config>
 """
         )
+
+
+class TestOcnosRenderEvpnMany:
+    def setup_method(self):
+        self.renderer = OcnosDeviceRenderer()
+
+    @staticmethod
+    def _item(key, vlan, vni):
+        return (
+            Interface(name="eth4"),
+            Evpn(vlan=Vlan(vlan_id=vlan, name=key), asn=65001, vni=vni,
+                 description=key),
+            RoutingInstance(instance_name=key, instance_type="mac-vrf",
+                            rd=f"65001:{key[2:]}", rt_rd=f"37195:{key[2:]}"),
+        )
+
+    def test_one_coalesced_document(self):
+        azure = AzureEvpn(description="SO3", asn=65001, vni=6000, s_tag=500,
+                          role="customer", c_tags=[10, 20])
+        xml = self.renderer.render_evpn_many(
+            [self._item("SO1", 100, 5000), self._item("SO2", 200, 5001),
+             (Interface(name="eth5"), azure, None)]
+        )
+        for container in ("<netinst:network-instances>", "<if:interfaces>",
+                          "<ethvpn:evpn>", "<ethvpn:interfaces>", "<vxlan:vxlan>",
+                          "<vxlan:vxlan-tenants>"):
+            assert xml.count(container) == 1, container
+        assert xml.count("<netinst:network-instance>") == 2
+        assert xml.count("<if:interface>") == 4  # eth4.100, eth4.200, eth5.10/20
+        assert xml.count("<vxlan:vxlan-tenant>") == 3
+        # mac-vrfs precede the circuits that reference them
+        assert xml.index("<netinst:network-instances>") < xml.index("<if:interfaces>")
+
+    def test_single_item_matches_render_evpn_body(self):
+        interface, evpn, _ = self._item("SO1", 100, 5000)
+        assert self.renderer.render_evpn_many([(interface, evpn, None)]) == (
+            self.renderer.render_evpn(interface, evpn)
+        )
+
+
+class TestOcnosRenderInterfaceChanges:
+    def test_one_document_for_all_interfaces(self):
+        xml = OcnosDeviceRenderer().render_interface_changes([
+            InterfaceChange(name="eth1", mtu=9000),
+            InterfaceChange(name="eth2", enabled=False),
+            InterfaceChange(name="eth3", enabled=True, description=""),
+        ])
+        assert xml.count("<if:interfaces>") == 1
+        assert xml.count("<if:interface>") == 3
+        assert "<if:mtu>9000</if:mtu>" in xml
+        assert "<if:shutdown/>" in xml
+        assert '<if:shutdown nc:operation="remove"/>' in xml
+        assert '<if:description nc:operation="remove"/>' in xml
@@ -0,0 +1,181 @@
+"""Stateful simulated devices and synthetic fabrics (SimulatedDevice,
+netauto.simulation)."""
+
+import time
+
+import pytest
+
+from netauto.drivers import SimulatedDevice
+from netauto.evpn import EvpnManager, plan_reconcile
+from netauto.fabric import FabricAuditor, FabricReconciler
+from netauto.models import Interface
+from netauto.simulation import MAX_CIRCUITS, build_fabric
+
+from .conftest import circuit
+
+PORT = {"arista_eos": "Ethernet4", "ipinfusion_ocnos": "eth4"}
+
+
+def _device(platform, **kwargs):
+    d = SimulatedDevice("leaf1", platform, **kwargs)
+    rendered = d.renderer.render_interface(
+        Interface(name=PORT[platform], description="uplink", mtu=9214)
+    )
+    d.push_config(rendered if isinstance(rendered, list) else [rendered])
+    return d
+
+
+class TestAristaState:
+    def test_seed_and_edit_running_config(self):
+        d = SimulatedDevice(
+            "leaf1",
+            running_config=(
+                "!\nhostname leaf1\n!\ninterface Ethernet1\n   description old\n"
+                "   switchport mode trunk\n   switchport trunk allowed vlan 10,20-22\n!\nend\n"
+            ),
+        )
+        d.push_config(
+            [
+                "interface Ethernet1",
+                "   description new",
+                "   switchport trunk allowed vlan add 30",
+                "   switchport trunk allowed vlan remove 21",
+            ]
+        )
+        config = d.get_config()
+        assert "   description new" in config and "description old" not in config
+        assert "   switchport trunk allowed vlan 10,20,22,30" in config
+        assert d.get_interfaces()["Ethernet1"].description == "new"
+
+        d.push_config(["interface Ethernet1", "   no description"])
+        assert d.get_interfaces()["Ethernet1"].description is None
+
+    def test_exit_closes_modes(self):
+        d = SimulatedDevice("leaf1")
+        d.push_config(
+            [
+                "router bgp 65001",
+                "   vlan-aware-bundle SO1",
+                "      vlan add 100",
+                "      exit",
+                "   exit",
+                "vlan 100",
+                "   name SO1",
+            ]
+        )
+        config = d.get_config()
+        assert "\nvlan 100\n   name SO1\n" in config  # not swallowed by the bundle
+        assert "      vlan 100\n" in config
+
+
+class TestOcnosState:
+    def test_merge_is_keyed_and_idempotent(self):
+        d = _device("ipinfusion_ocnos")
+        payload = d.renderer.render_evpn(Interface(name="eth4"), circuit().evpn)
+        d.push_config([payload])
+        assert d.push_config([payload]) == ""  # nothing left to change
+        assert d.get_vnis() == [5000]
+        assert [v.vlan_id for v in d.get_interfaces()["eth4"].trunk_vlans] == [100]
+
+    def test_remove_operation_deletes_the_entry(self):
+        d = _device("ipinfusion_ocnos")
+        c = circuit()
+        d.push_config([d.renderer.render_evpn(Interface(name="eth4"), c.evpn)])
+        d.push_config([d.renderer.render_evpn_delete(Interface(name="eth4"), c.evpn)])
+        assert d.get_vnis() == []
+        assert "operation" not in d.get_config()
+
+
+@pytest.mark.parametrize("platform", ["arista_eos", "ipinfusion_ocnos"])
+class TestManagersAgainstState:
+    def test_create_read_back_delete(self, platform):
+        d = _device(platform)
+        manager = EvpnManager(d)
+        c = circuit(interface=PORT[platform])
+        manager.create_circuit(
+            PORT[platform], c.evpn, routing_instance=c.routing_instance
+        )
+        assert plan_reconcile([c], manager.get_circuits()).in_sync == [5000]
+        assert 5000 in d.get_vnis()
+
+        manager.delete_circuit(
+            PORT[platform], c.evpn, routing_instance=c.routing_instance
+        )
+        assert not d.get_vnis()
+
+    def test_dry_run_leaves_state_untouched(self, platform):
+        d = _device(platform)
+        before, fingerprint = d.get_config(), d.get_config_fingerprint()
+        rendered = d.renderer.render_evpn(
+            Interface(name=PORT[platform]), circuit().evpn
+        )
+        diff = d.push_config(
+            rendered if isinstance(rendered, list) else [rendered], dry_run=True
+        )
+        assert "5000" in diff
+        assert d.get_config() == before
+        assert d.get_config_fingerprint() == fingerprint
+
+
+def test_latency_per_rpc():
+    d = SimulatedDevice("leaf1", latency=(0.02, 0.03), push_latency=0.0, seed=1)
+    started = time.perf_counter()
+    d.get_vnis()
+    assert time.perf_counter() - started >= 0.02
+    started = time.perf_counter()
+    d.push_config(["vlan 100"])
+    assert time.perf_counter() - started < 0.02
+
+
+class TestFabric:
+    def test_generated_fabric_is_consistent(self):
+        fabric = build_fabric(devices=6, circuits=(3, 8), ports=8, seed=3)
+        assert len(fabric.devices) == 6
+        assert {d.platform for d in fabric.devices.values()} == {
+            "arista_eos",
+            "ipinfusion_ocnos",
+        }
+        for name, circuits in fabric.intended.items():
+            assert 3 <= len(circuits) <= 8
+            assert len({c.evpn.vlan.vlan_id for c in circuits}) == len(circuits)
+
+        audit = FabricAuditor(fabric.devices).audit()
+        assert not audit.errors and not audit.vni_collisions and not audit.rt_collisions
+        assert sum(len(c) for c in audit.circuits.values()) == fabric.circuit_count
+        ends = {}
+        for name, circuits in fabric.intended.items():
+            for c in circuits:
+                ends.setdefault(c.evpn.vni, []).append(name)
+        assert audit.single_ended == {  # slots left over with no other device
+            vni: names[0] for vni, names in ends.items() if len(names) == 1
+        }
+        assert all(len(names) <= 2 for names in ends.values())
+
+    def test_reconcile_sees_exactly_the_drift(self):
+        fabric = build_fabric(devices=4, circuits=(5, 10), ports=8, seed=7)
+        plan = FabricReconciler(fabric.devices, fabric.intended).plan()
+        assert all(
+            p.plan.in_sync and not p.plan.to_create for p in plan.devices.values()
+        )
+
+        removed = fabric.drift(0.3, seed=1)
+        plan = FabricReconciler(fabric.devices, fabric.intended).plan()
+        assert {
+            name: p.plan.to_create
+            for name, p in plan.devices.items()
+            if p.plan.to_create
+        } == removed
+
+    def test_deterministic_and_bounded(self):
+        a = build_fabric(devices=3, circuits=(2, 4), seed=5)
+        b = build_fabric(devices=3, circuits=(2, 4), seed=5)
+        assert {n: d.get_config() for n, d in a.devices.items()} == {
+            n: d.get_config() for n, d in b.devices.items()
+        }
+        with pytest.raises(ValueError):
+            build_fabric(devices=1, circuits=(0, MAX_CIRCUITS + 1))
+
+    def test_slow_devices_time_out_in_the_audit(self):
+        fabric = build_fabric(devices=2, circuits=(1, 2), latency=0.5)
+        audit = FabricAuditor(fabric.devices, timeout=0.05).audit()
+        assert set(audit.errors) == set(fabric.devices)
@@ -0,0 +1,184 @@
+"""Per-operation phase timing traces (netauto.timing)."""
+
+import logging
+
+import pytest
+
+from netauto import timing
+from netauto.drivers import AristaDriver, MockDriver
+from netauto.evpn import EvpnManager
+from netauto.exceptions import InterfaceNotFound
+from netauto.logic import LagManager
+from netauto.models import Evpn, Interface, Vlan
+
+INTENT = Evpn(
+    vlan=Vlan(vlan_id=100, name="SO101010"),
+    asn=65001,
+    vni=5000,
+    description="SO101010",
+    service_type="cloud_vc",
+)
+
+
+def _driver():
+    return MockDriver(
+        platform="arista_eos",
+        initial_interfaces=[Interface(name="Ethernet6")],
+        initial_switchports=[Interface(name="Ethernet6", mode="trunk")],
+    )
+
+
+class _FakeNode:
+    _session_name = "s1"
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def call(*args):
+            self.calls.append(name)
+            return "+vlan 100" if name == "diff" else None
+
+        return call
+
+
+class TestPhase:
+    def test_noop_outside_a_trace(self):
+        with timing.phase("read"):
+            pass
+        assert timing.current_trace() is None
+
+    def test_nested_phases_are_path_named(self):
+        with timing.traced("op") as trace, timing.phase("push_config"):
+            with timing.phase("edit"):
+                pass
+            with timing.phase("edit"):
+                pass
+        assert [p.name for p in trace.phases] == [
+            "push_config/edit",
+            "push_config/edit",
+            "push_config",
+        ]
+        assert trace.total >= trace.by_phase()["push_config"]
+        assert set(trace.by_phase()) == {"push_config", "push_config/edit"}
+
+    def test_reentrant_phase_counted_once(self):
+        with (
+            timing.traced("op") as trace,
+            timing.phase("render"),
+            timing.phase("render"),
+        ):
+            pass
+        assert [p.name for p in trace.phases] == ["render"]
+
+    def test_nested_operation_is_a_phase_of_the_outer(self):
+        with (
+            timing.traced("outer") as outer,
+            timing.traced("inner") as inner,
+            timing.phase("get_vnis"),
+        ):
+            pass
+        assert inner is outer
+        assert [p.name for p in outer.phases] == ["inner/get_vnis", "inner"]
+
+
+class TestHooks:
+    def test_hook_sees_each_top_level_trace_once(self):
+        seen = []
+        timing.add_trace_hook(seen.append)
+        try:
+            EvpnManager(_driver()).ensure_circuit("Ethernet6", INTENT)
+        finally:
+            timing.remove_trace_hook(seen.append)
+        assert [t.operation for t in seen] == ["ensure_circuit"]
+
+    def test_broken_hook_does_not_fail_the_operation(self, caplog):
+        def broken(trace):
+            raise RuntimeError("boom")
+
+        timing.add_trace_hook(broken)
+        try:
+            with caplog.at_level(logging.ERROR, logger="netauto.timing"):
+                EvpnManager(_driver()).create_circuit(
+                    "Ethernet6", INTENT, create_vrf=False
+                )
+        finally:
+            timing.remove_trace_hook(broken)
+        assert "trace hook" in caplog.text
+
+
+class TestManagerTraces:
+    def test_create_circuit_records_rpcs_and_render(self):
+        mgr = EvpnManager(_driver())
+        mgr.create_circuit("Ethernet6", INTENT, create_vrf=False)
+        trace = mgr.last_trace
+        assert trace.operation == "create_circuit"
+        assert trace.device == "arista_eos"
+        assert {
+            "get_interfaces",
+            "get_switchports",
+            "get_vnis",
+            "render",
+            "push_config",
+        } <= set(trace.by_phase())
+
+    def test_ensure_result_carries_nested_trace(self):
+        res = EvpnManager(_driver()).ensure_circuit("Ethernet6", INTENT)
+        phases = res.trace.by_phase()
+        assert res.trace.operation == "ensure_circuit"
+        assert "verify_circuit/get_circuits/get_config" in phases
+        assert "create_circuit/push_config" in phases
+
+    def test_ensure_circuits_trace(self):
+        from netauto.models import CircuitSpec
+
+        res = EvpnManager(_driver()).ensure_circuits(
+            [CircuitSpec(interface="Ethernet6", evpn=INTENT)]
+        )
+        assert res.trace.operation == "ensure_circuits"
+        assert {"get_circuits", "diff", "render", "push_config"} <= set(
+            res.trace.by_phase()
+        )
+
+    def test_last_trace_kept_when_operation_fails(self):
+        mgr = EvpnManager(_driver())
+        with pytest.raises(InterfaceNotFound):
+            mgr.create_circuit("Ethernet99", INTENT, create_vrf=False)
+        assert mgr.last_trace.operation == "create_circuit"
+        assert "get_interfaces" in mgr.last_trace.by_phase()
+
+    def test_lag_manager(self):
+        mgr = LagManager(
+            MockDriver(
+                initial_switchports=[
+                    Interface(name="Ethernet3", mode="access", access_vlan=10),
+                ]
+            )
+        )
+        mgr.create_lag("Port-Channel10", ["Ethernet3"])
+        assert mgr.last_trace.operation == "create_lag"
+        assert "apply_many/push_config" in mgr.last_trace.by_phase()
+
+
+class TestDriverPhases:
+    def test_arista_push_sub_phases(self):
+        driver = AristaDriver("sw1", "admin", "secret")
+        driver.node = _FakeNode()
+        with timing.traced("push", device="sw1") as trace:
+            driver.push_config(["vlan 100"])
+        assert [p.name for p in trace.phases] == [
+            "push_config/session",
+            "push_config/edit",
+            "push_config/diff",
+            "push_config/commit",
+            "push_config/save",
+            "push_config",
+        ]
+
+    def test_arista_dry_run_aborts(self):
+        driver = AristaDriver("sw1", "admin", "secret")
+        driver.node = _FakeNode()
+        with timing.traced("push") as trace:
+            driver.push_config(["vlan 100"], dry_run=True)
+        assert "push_config/abort" in trace.by_phase()
+        assert "push_config/commit" not in trace.by_phase()